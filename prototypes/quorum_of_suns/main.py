@@ -6,9 +6,16 @@ Combines the depth of Master of Orion with real-time ship combat like FTL.
 Features multiple civilizations, tech trees, and story-driven gameplay.
 """
 
+import os
 import pygame
 import sys
 from enum import Enum
+
+# Make the repository-level shared/ package importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+from shared.game_loop import FixedStepLoop
+from shared.profiler import FrameProfiler
 from src.game_state import GameStateManager
 from src.main_menu import MainMenu
 from src.galaxy_view import GalaxyView
@@ -28,7 +35,9 @@ class QuorumOfSuns:
         # Game constants
         self.SCREEN_WIDTH = 1200
         self.SCREEN_HEIGHT = 800
-        self.FPS = 60
+        self.FPS = 60                 # render rate
+        self.SIM_HZ = 60              # fixed update rate
+        self.MAX_STEPS_PER_FRAME = 4
         
         # Display state
         self.is_fullscreen = False
@@ -36,7 +45,12 @@ class QuorumOfSuns:
         # Initialize display
         self.screen = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT), pygame.RESIZABLE)
         pygame.display.set_caption("Quorum of Suns")
-        self.clock = pygame.time.Clock()
+        # F3 toggles the profiler overlay, F9 starts/stops a Chrome trace
+        self.profiler = FrameProfiler()
+        self.loop = FixedStepLoop(self.update, self.render, self.handle_events,
+                                  sim_hz=self.SIM_HZ, render_fps=self.FPS,
+                                  max_steps=self.MAX_STEPS_PER_FRAME,
+                                  profiler=self.profiler)
         
         # Game state management
         self.state_manager = GameStateManager()
@@ -44,7 +58,7 @@ class QuorumOfSuns:
         
         # Initialize subsystems
         self.main_menu = MainMenu(self.screen, self.state_manager)
-        self.galaxy_view = GalaxyView(self.screen, self.state_manager)
+        self.galaxy_view = GalaxyView(self.screen, self.state_manager, self.profiler)
         
         self.running = True
         
@@ -58,6 +72,10 @@ class QuorumOfSuns:
                 elif event.key == pygame.K_F11:
                     # Toggle fullscreen
                     self.toggle_fullscreen()
+                elif event.key == pygame.K_F3:
+                    self.profiler.toggle()
+                elif event.key == pygame.K_F9:
+                    self.profiler.toggle_trace(lambda path: print(f"Trace written to {path}"))
             elif event.type == pygame.VIDEORESIZE:
                 # Handle window resize
                 self.handle_resize(event.w, event.h)
@@ -88,7 +106,8 @@ class QuorumOfSuns:
         elif self.current_state == GameStates.GALAXY_VIEW:
             self.galaxy_view.update(dt)
         
-    def render(self):
+    def render(self, alpha=1.0):
+        # alpha is the fixed-step interpolation factor; views animate by time only
         # Clear screen
         self.screen.fill((10, 10, 20))  # Dark space background
         
@@ -98,20 +117,20 @@ class QuorumOfSuns:
         elif self.current_state == GameStates.GALAXY_VIEW:
             self.galaxy_view.render()
         
+        self.profiler.draw_overlay(self.screen)
         pygame.display.flip()
     
     def run(self):
         print("🌟 Quorum of Suns - Starting...")
         print("Escape key returns to main menu from any screen")
         print("F11 toggles fullscreen mode")
+        print("F3 toggles the profiler overlay, F9 records a Chrome trace")
         
-        while self.running:
-            dt = self.clock.tick(self.FPS) / 1000.0
-            
-            self.handle_events()
-            self.update(dt)
-            self.render()
+        self.loop.run(lambda: self.running)
         
+        # Let a background autosave finish before exiting
+        if not self.state_manager.wait_for_saves(timeout=5.0):
+            print("Autosave still running at exit; the save keeps its last complete record")
         pygame.quit()
         sys.exit()
     
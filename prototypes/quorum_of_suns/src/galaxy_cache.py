@@ -0,0 +1,285 @@
+"""
+Galaxy Cache for Quorum of Suns
+
+Keeps generated galaxies and the bright-spot analysis of the galaxy image on
+disk, so relaunching a save or returning to a window size it has seen before
+skips image loading and star generation entirely.
+
+Entries are content-addressed: the file name is a digest of everything that
+affects the result (the galaxy image's bytes, map size, seed, star count and
+the format version), so a changed image or setting simply misses and stale
+entries age out. Files are small zlib-compressed binary records. The cache
+directory is kept under ``max_bytes`` by deleting the least recently used
+entries.
+"""
+
+import hashlib
+import os
+import struct
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from .galaxy_map import GalaxyMap
+from .star_table import HAS_PLANETS, HAS_STARBASE, IS_EXPLORED, STAR_TYPES, StarTable
+
+# Bump whenever the record layout or galaxy generation changes, so old entries miss
+FORMAT_VERSION = 4
+
+GALAXY_MAGIC = b"QGAL"
+SPOTS_MAGIC = b"QSPT"
+GALAXY_HEADER = struct.Struct("<4sBIII")    # magic, version, width, height, star count
+STAR_RECORD = struct.Struct("<ddB3BdB")     # x, y, type, r, g, b, size, flags
+SPOTS_HEADER = struct.Struct("<4sBI")       # magic, version, count
+SPOT = struct.Struct("<ii")
+STRING_LEN = struct.Struct("<H")
+
+NO_STRING = 0xFFFF
+
+
+class GalaxyCache:
+    """Bounded on-disk cache of generated galaxies and image bright spots"""
+
+    def __init__(self, cache_dir: str = "data/cache/galaxies", max_bytes: int = 4 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._image_digests: Dict[Tuple[str, int, int], str] = {}
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+    def image_digest(self, image_path: Optional[str]) -> str:
+        """Digest of the image file's contents, remembered while the file is unchanged"""
+        if not image_path:
+            return "none"
+        st = os.stat(image_path)
+        stamp = (image_path, st.st_mtime_ns, st.st_size)
+        digest = self._image_digests.get(stamp)
+        if digest is None:
+            with open(image_path, "rb") as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+            self._image_digests[stamp] = digest
+        return digest
+
+    @staticmethod
+    def _key(*parts) -> str:
+        text = "|".join(str(p) for p in (FORMAT_VERSION,) + parts)
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def galaxy_key(self, image_path: Optional[str], width: int, height: int, seed: int, num_stars: int) -> str:
+        return self._key("galaxy", self.image_digest(image_path), width, height, seed, num_stars)
+
+    def spots_key(self, image_path: str, width: int, height: int, num_stars: int) -> str:
+        return self._key("spots", self.image_digest(image_path), width, height, num_stars)
+
+    # ------------------------------------------------------------------
+    # Entries
+    # ------------------------------------------------------------------
+    def load_galaxy(self, key: str) -> Optional[GalaxyMap]:
+        data = self._read(key)
+        if data is not None:
+            try:
+                return decode_galaxy(data)
+            except (ValueError, IndexError, struct.error, UnicodeDecodeError) as e:
+                print(f"Discarding bad galaxy cache entry {key}: {e}")
+                self._discard(key)
+        return None
+
+    def store_galaxy(self, key: str, galaxy_map: GalaxyMap):
+        self._write(key, encode_galaxy(galaxy_map))
+
+    def load_spots(self, key: str) -> Optional[List[Tuple[int, int]]]:
+        data = self._read(key)
+        if data is not None:
+            try:
+                return decode_spots(data)
+            except (ValueError, struct.error) as e:
+                print(f"Discarding bad spot cache entry {key}: {e}")
+                self._discard(key)
+        return None
+
+    def store_spots(self, key: str, positions):
+        self._write(key, encode_spots(positions))
+
+    def clear(self):
+        """Delete every cached entry"""
+        for path, _, _ in self._entries():
+            self._remove(path)
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".bin")
+
+    def _read(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                compressed = f.read()
+            data = zlib.decompress(compressed)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, zlib.error) as e:
+            print(f"Discarding unreadable cache entry {key}: {e}")
+            self._discard(key)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # mark as recently used for eviction
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def _write(self, key: str, data: bytes):
+        path = self._path(key)
+        tmp_path = path + ".tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(data, 6))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write galaxy cache: {e}")
+            self._remove(tmp_path)
+            return
+        self._evict(keep=path)
+
+    def _discard(self, key: str):
+        self._remove(self._path(key))
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _entries(self) -> List[Tuple[str, int, float]]:
+        """(path, size, last used) for every entry on disk"""
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return []
+        entries = []
+        for name in names:
+            if not name.endswith(".bin"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def _evict(self, keep: str):
+        """Drop least recently used entries until the directory fits in ``max_bytes``"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if path == keep:
+                continue
+            self._remove(path)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+# ----------------------------------------------------------------------
+# Record encoding
+# ----------------------------------------------------------------------
+def _pack_str(out: bytearray, text: Optional[str]):
+    if text is None:
+        out += STRING_LEN.pack(NO_STRING)
+        return
+    raw = text.encode("utf-8")
+    if len(raw) >= NO_STRING:
+        raise ValueError("string too long for galaxy cache")
+    out += STRING_LEN.pack(len(raw))
+    out += raw
+
+
+def _unpack_str(data: bytes, offset: int) -> Tuple[Optional[str], int]:
+    (length,) = STRING_LEN.unpack_from(data, offset)
+    offset += STRING_LEN.size
+    if length == NO_STRING:
+        return None, offset
+    end = offset + length
+    if end > len(data):
+        raise ValueError("truncated string")
+    return data[offset:end].decode("utf-8"), end
+
+
+def encode_galaxy(galaxy_map: GalaxyMap) -> bytes:
+    out = bytearray(GALAXY_HEADER.pack(GALAXY_MAGIC, FORMAT_VERSION, galaxy_map.width,
+                                       galaxy_map.height, len(galaxy_map.stars)))
+    _pack_str(out, galaxy_map.name)
+    for star in galaxy_map.stars:
+        flags = ((HAS_PLANETS if star.has_planets else 0)
+                 | (IS_EXPLORED if star.is_explored else 0)
+                 | (HAS_STARBASE if star.has_starbase else 0))
+        out += STAR_RECORD.pack(star.x, star.y, STAR_TYPES.index(star.star_type),
+                                *star.color, star.size, flags)
+        _pack_str(out, star.name)
+        _pack_str(out, star.homeworld_species)
+        _pack_str(out, star.homeworld_planet)
+    return bytes(out)
+
+
+def decode_galaxy(data: bytes) -> GalaxyMap:
+    magic, version, width, height, count = GALAXY_HEADER.unpack_from(data, 0)
+    if magic != GALAXY_MAGIC or version != FORMAT_VERSION:
+        raise ValueError("not a galaxy cache record")
+    name, offset = _unpack_str(data, GALAXY_HEADER.size)
+    stars = StarTable(count)
+    for _ in range(count):
+        x, y, type_index, r, g, b, size, flags = STAR_RECORD.unpack_from(data, offset)
+        offset += STAR_RECORD.size
+        star_name, offset = _unpack_str(data, offset)
+        species, offset = _unpack_str(data, offset)
+        planet, offset = _unpack_str(data, offset)
+        stars.add(
+            name=star_name,
+            x=x,
+            y=y,
+            star_type=STAR_TYPES[type_index],
+            color=(r, g, b),
+            size=size,
+            has_planets=bool(flags & HAS_PLANETS),
+            is_explored=bool(flags & IS_EXPLORED),
+            has_starbase=bool(flags & HAS_STARBASE),
+            homeworld_species=species,
+            homeworld_planet=planet
+        )
+    return GalaxyMap(width=width, height=height, stars=stars, name=name)
+
+
+def encode_spots(positions) -> bytes:
+    out = bytearray(SPOTS_HEADER.pack(SPOTS_MAGIC, FORMAT_VERSION, len(positions)))
+    for x, y in positions:
+        out += SPOT.pack(int(x), int(y))
+    return bytes(out)
+
+
+def decode_spots(data: bytes) -> List[Tuple[int, int]]:
+    magic, version, count = SPOTS_HEADER.unpack_from(data, 0)
+    if magic != SPOTS_MAGIC or version != FORMAT_VERSION:
+        raise ValueError("not a bright-spot cache record")
+    if len(data) != SPOTS_HEADER.size + count * SPOT.size:
+        raise ValueError("truncated bright-spot record")
+    return [SPOT.unpack_from(data, SPOTS_HEADER.size + i * SPOT.size) for i in range(count)]
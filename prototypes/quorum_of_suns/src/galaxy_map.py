@@ -4,65 +4,83 @@ Galaxy Map System for Quorum of Suns
 Handles galactic and star system maps, including star generation and navigation.
 """
 
-import random
 import math
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
-from enum import Enum
-
-class StarType(Enum):
-    YELLOW_DWARF = "yellow_dwarf"
-    RED_GIANT = "red_giant"
-    WHITE_DWARF = "white_dwarf"
-    BLUE_GIANT = "blue_giant"
-    NEUTRON_STAR = "neutron_star"
-    BINARY_SYSTEM = "binary_system"
-
-@dataclass
-class Star:
-    """Represents a star in the galaxy"""
-    name: str
-    x: float
-    y: float
-    star_type: StarType
-    color: Tuple[int, int, int]
-    size: float
-    has_planets: bool = True
-    is_explored: bool = False
-    has_starbase: bool = False
-    homeworld_species: str = None  # Species that has their homeworld here
-    homeworld_planet: str = None   # Name of the homeworld planet
-    
-    def distance_to(self, other_star) -> float:
-        """Calculate distance to another star"""
-        dx = self.x - other_star.x
-        dy = self.y - other_star.y
-        return math.sqrt(dx * dx + dy * dy)
+import numpy as np
+from dataclasses import dataclass, field
+from typing import List, Optional
+from .spatial_index import TableIndex
+from .star_table import Star, StarTable, StarType
+from .star_lanes import StarLanes
 
 @dataclass
 class GalaxyMap:
     """Represents the entire galaxy"""
     width: int
     height: int
-    stars: List[Star]
+    stars: StarTable  # a plain list of Stars is also accepted and converted
     name: str = "Unnamed Galaxy"
+    index: TableIndex = field(init=False, repr=False, compare=False)
+    _lanes: Optional[StarLanes] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        if not isinstance(self.stars, StarTable):
+            self.stars = StarTable.from_stars(self.stars)
+        self.index = TableIndex(self.stars)
+    
+    def rebuild_index(self):
+        """Rebuild the spatial index after editing ``stars`` directly"""
+        self.index.build(self.stars)
+        self._lanes = None
+    
+    def add_star(self, star: Star):
+        """Add a star and index it"""
+        self.stars.append(star)
+        self._lanes = None
+    
+    def remove_star(self, star: Star):
+        """Remove a star from the map and the index"""
+        self.stars.remove(star)
+        self._lanes = None
+    
+    def move_star(self, star: Star, x: float, y: float):
+        """Move a star, keeping the index in step"""
+        self.index.move(star, x, y)
+        self._lanes = None
+    
+    @property
+    def lanes(self) -> StarLanes:
+        """Star-lane network, built on first use and again after stars change"""
+        if self._lanes is None:
+            self._lanes = StarLanes(self.stars, self.index)
+        return self._lanes
+    
+    def find_route(self, start: Star, goal: Star) -> List[Star]:
+        """Shortest lane route between two stars, both included; empty if unreachable"""
+        return self.lanes.route(start, goal)
+    
+    def route_distance(self, start: Star, goal: Star) -> float:
+        """Travel distance along lanes between two stars"""
+        return self.lanes.route_distance(start, goal)
     
     def get_star_at_position(self, x: float, y: float, tolerance: float = 20.0) -> Optional[Star]:
-        """Find a star near the given position"""
-        for star in self.stars:
-            distance = math.sqrt((star.x - x) ** 2 + (star.y - y) ** 2)
-            if distance <= tolerance:
-                return star
-        return None
+        """Find the star nearest the given position, within ``tolerance``"""
+        return self.index.nearest(x, y, tolerance)
     
     def get_stars_in_range(self, center_x: float, center_y: float, range_radius: float) -> List[Star]:
-        """Get all stars within a certain range of a position"""
-        stars_in_range = []
-        for star in self.stars:
-            distance = math.sqrt((star.x - center_x) ** 2 + (star.y - center_y) ** 2)
-            if distance <= range_radius:
-                stars_in_range.append(star)
-        return stars_in_range
+        """Get all stars within a certain range of a position, nearest first"""
+        return self.index.within_radius(center_x, center_y, range_radius)
+    
+    def get_nearest_star(self, x: float, y: float) -> Optional[Star]:
+        """Closest star to a position"""
+        return self.index.nearest(x, y)
+    
+    def get_nearest_stars(self, x: float, y: float, count: int) -> List[Star]:
+        """The ``count`` closest stars to a position, nearest first"""
+        return self.index.k_nearest(x, y, count)
+    
+    def get_stars_in_rect(self, left: float, top: float, right: float, bottom: float) -> List[Star]:
+        """Stars inside a world-space rectangle, e.g. the camera viewport"""
+        return self.index.in_rect(left, top, right, bottom)
 
 class GalaxyGenerator:
     """Generates procedural galaxies"""
@@ -95,33 +113,46 @@ class GalaxyGenerator:
     }
     
     @classmethod
-    def generate_galaxy(cls, width: int, height: int, num_stars: int = 50, seed: int = None, galaxy_image_path: str = None) -> GalaxyMap:
-        """Generate a new galaxy with procedurally placed stars"""
-        if seed is not None:
-            random.seed(seed)
+    def generate_galaxy(cls, width: int, height: int, num_stars: int = 50, seed: int = None,
+                        galaxy_image_path: str = None, cache=None) -> GalaxyMap:
+        """Generate a new galaxy with procedurally placed stars
+        
+        With a ``GalaxyCache`` and a seed, a galaxy generated before with the
+        same image, size, seed and star count is loaded instead of rebuilt.
+        """
+        galaxy_key = None
+        if cache is not None and seed is not None:
+            try:
+                galaxy_key = cache.galaxy_key(galaxy_image_path, width, height, seed, num_stars)
+            except OSError as e:
+                print(f"Could not key galaxy cache: {e}")
+            else:
+                cached = cache.load_galaxy(galaxy_key)
+                if cached is not None:
+                    return cached
         
-        stars = []
-        used_names = set()
+        # Private generator: the same seed always gives the same galaxy, and the
+        # global ``random`` state used by the rest of the game is left alone
+        rng = np.random.default_rng(None if seed is None else seed % (1 << 64))
         
         # Try to load galaxy image for star positioning
         star_positions = []
         if galaxy_image_path:
             try:
-                import pygame
-                galaxy_img = pygame.image.load(galaxy_image_path)
-                galaxy_img = pygame.transform.scale(galaxy_img, (width, height))
-                star_positions = cls._extract_bright_spots(galaxy_img, num_stars)
+                star_positions = cls._image_star_positions(galaxy_image_path, width, height, num_stars, cache)
             except Exception as e:
                 print(f"Could not analyze galaxy image: {e}")
         
-        # Fallback to procedural generation if no image positions
-        if not star_positions:
-            center_x, center_y = width // 2, height // 2
-        
         # First, create the human homeworld system (Ra)
-        ra_star = Star(
+        # Position Ra near galactic core but not in it (about 20% from center)
+        center_x, center_y = width // 2, height // 2
+        core_radius = min(width, height) * 0.2  # 20% from center
+        ra_angle = rng.uniform(0, 2 * math.pi)
+        stars = StarTable(max(1, num_stars))
+        stars.add(
             name="Ra",
-            x=0, y=0,  # Will be positioned below
+            x=center_x + core_radius * math.cos(ra_angle),
+            y=center_y + core_radius * math.sin(ra_angle),
             star_type=StarType.YELLOW_DWARF,
             color=cls.STAR_COLORS[StarType.YELLOW_DWARF],
             size=cls._get_star_size(StarType.YELLOW_DWARF),
@@ -131,89 +162,102 @@ class GalaxyGenerator:
             homeworld_planet="Eden"
         )
         
-        # Position Ra near galactic core but not in it (about 20% from center)
-        center_x, center_y = width // 2, height // 2
-        core_radius = min(width, height) * 0.2  # 20% from center
-        ra_angle = random.uniform(0, 2 * math.pi)
-        ra_star.x = center_x + core_radius * math.cos(ra_angle)
-        ra_star.y = center_y + core_radius * math.sin(ra_angle)
-        
-        stars.append(ra_star)
-        used_names.add("Ra")
-
-        for i in range(num_stars - 1):  # -1 because we already added Ra
-            # Choose star name
-            available_names = [name for name in cls.STAR_NAMES if name not in used_names]
-            if not available_names:
-                # Generate numbered names if we run out
-                name = f"Star-{i + 2:03d}"  # +2 because Ra is star 1
-            else:
-                name = random.choice(available_names)
-                used_names.add(name)
-            
-            # Choose star type based on weights
-            star_type = cls._weighted_choice(cls.STAR_TYPE_WEIGHTS)
-            
-            # Use image-based position if available, otherwise use procedural generation
-            if star_positions and i < len(star_positions):
-                x, y = star_positions[i]
-                # Add small random offset to avoid perfect alignment
-                x += random.uniform(-5, 5)
-                y += random.uniform(-5, 5)
-            else:
-                # Fallback to procedural generation
-                center_x, center_y = width // 2, height // 2
-                if i < 5:
-                    # First few stars closer to center (home systems)
-                    angle = random.uniform(0, 2 * math.pi)
-                    radius = random.uniform(50, 150)
-                    x = center_x + radius * math.cos(angle)
-                    y = center_y + radius * math.sin(angle)
-                else:
-                    # Distribute others more broadly with some spiral structure
-                    spiral_arm = random.randint(0, 2)  # 3 spiral arms
-                    arm_angle = (spiral_arm * 2 * math.pi / 3) + random.uniform(-0.5, 0.5)
-                    radius = random.uniform(100, min(width, height) * 0.4)
-                    spiral_factor = radius / (min(width, height) * 0.4)
-                    final_angle = arm_angle + spiral_factor * math.pi
-                    
-                    x = center_x + radius * math.cos(final_angle) + random.uniform(-50, 50)
-                    y = center_y + radius * math.sin(final_angle) + random.uniform(-50, 50)
-            
-            # Keep stars within bounds
-            x = max(30, min(width - 30, x))
-            y = max(30, min(height - 30, y))
-            
-            # Determine star properties
-            color = cls.STAR_COLORS[star_type]
-            size = cls._get_star_size(star_type)
-            has_planets = random.random() > 0.1  # 90% have planets
-            
-            star = Star(
-                name=name,
-                x=x,
-                y=y,
-                star_type=star_type,
-                color=color,
-                size=size,
-                has_planets=has_planets
+        count = max(0, num_stars - 1)  # -1 because we already added Ra
+        if count:
+            names = cls._star_names(rng, count)
+            star_types = cls._star_types(rng, count)
+            xs, ys = cls._star_positions(rng, count, width, height, star_positions)
+            stars.extend(
+                names=names,
+                xs=xs,
+                ys=ys,
+                star_types=star_types,
+                colors=[cls.STAR_COLORS[t] for t in star_types],
+                sizes=[cls._get_star_size(t) for t in star_types],
+                has_planets=rng.random(count) > 0.1  # 90% have planets
             )
-            
-            stars.append(star)
         
-        return GalaxyMap(
+        galaxy_map = GalaxyMap(
             width=width,
             height=height,
             stars=stars,
             name="Quorum Galaxy"
         )
+        if galaxy_key is not None:
+            cache.store_galaxy(galaxy_key, galaxy_map)
+        return galaxy_map
+    
+    @classmethod
+    def _image_star_positions(cls, galaxy_image_path: str, width: int, height: int, num_stars: int, cache=None):
+        """Bright spots of the galaxy image scaled to (width, height), from the cache when possible"""
+        spots_key = None
+        if cache is not None:
+            spots_key = cache.spots_key(galaxy_image_path, width, height, num_stars)
+            positions = cache.load_spots(spots_key)
+            if positions is not None:
+                return positions
+        
+        import pygame
+        galaxy_img = pygame.image.load(galaxy_image_path)
+        galaxy_img = pygame.transform.scale(galaxy_img, (width, height))
+        positions = cls._extract_bright_spots(galaxy_img, num_stars)
+        if spots_key is not None:
+            cache.store_spots(spots_key, positions)
+        return positions
+    
+    @classmethod
+    def _star_names(cls, rng, count: int) -> List[str]:
+        """Unique names: a shuffled pick from STAR_NAMES, then numbered names once they run out"""
+        order = rng.permutation(len(cls.STAR_NAMES))[:count].tolist()
+        names = [cls.STAR_NAMES[i] for i in order]
+        # +2 because Ra is star 1
+        names.extend(f"Star-{i + 2:03d}" for i in range(len(names), count))
+        return names
+    
+    @classmethod
+    def _star_types(cls, rng, count: int) -> List[StarType]:
+        """Star types drawn by STAR_TYPE_WEIGHTS in one batch"""
+        types = list(cls.STAR_TYPE_WEIGHTS)
+        weights = np.array([cls.STAR_TYPE_WEIGHTS[t] for t in types])
+        picks = rng.choice(len(types), size=count, p=weights / weights.sum())
+        return [types[i] for i in picks.tolist()]
     
     @classmethod
-    def _weighted_choice(cls, weights_dict):
-        """Choose item based on weights"""
-        items = list(weights_dict.keys())
-        weights = list(weights_dict.values())
-        return random.choices(items, weights=weights)[0]
+    def _star_positions(cls, rng, count: int, width: int, height: int, star_positions):
+        """Positions for ``count`` stars: image bright spots first, procedural spiral arms for the rest"""
+        center_x, center_y = width // 2, height // 2
+        arm_radius = min(width, height) * 0.4
+        index = np.arange(count)
+        
+        # First few stars closer to center (home systems)
+        angle = rng.uniform(0, 2 * math.pi, count)
+        radius = rng.uniform(50, 150, count)
+        near = index < 5
+        
+        # Distribute others more broadly with some spiral structure (3 spiral arms)
+        spiral_arm = rng.integers(0, 3, count)
+        arm_angle = spiral_arm * 2 * math.pi / 3 + rng.uniform(-0.5, 0.5, count)
+        arm_dist = rng.uniform(100, arm_radius, count)
+        final_angle = arm_angle + arm_dist / arm_radius * math.pi
+        scatter = rng.uniform(-50, 50, (2, count))
+        
+        radius = np.where(near, radius, arm_dist)
+        angle = np.where(near, angle, final_angle)
+        xs = center_x + radius * np.cos(angle) + np.where(near, 0.0, scatter[0])
+        ys = center_y + radius * np.sin(angle) + np.where(near, 0.0, scatter[1])
+        
+        # Image-based positions where available, with a small offset to avoid perfect alignment
+        used = min(len(star_positions), count)
+        if used:
+            spots = np.asarray(star_positions[:used], dtype=np.float64)
+            jitter = rng.uniform(-5, 5, (used, 2))
+            xs[:used] = spots[:, 0] + jitter[:, 0]
+            ys[:used] = spots[:, 1] + jitter[:, 1]
+        
+        # Keep stars within bounds
+        xs = np.clip(xs, 30, width - 30)
+        ys = np.clip(ys, 30, height - 30)
+        return xs.tolist(), ys.tolist()
     
     @classmethod
     def _get_star_size(cls, star_type: StarType) -> float:
@@ -229,55 +273,122 @@ class GalaxyGenerator:
         return size_map.get(star_type, 3.0)
     
     @classmethod
-    def _extract_bright_spots(cls, galaxy_surface, num_stars: int):
-        """Extract bright spots from galaxy image to use as star positions"""
+    def _extract_bright_spots(cls, galaxy_surface, num_stars: int, sample_step: int = 1,
+                              min_distance: float = 40.0, threshold: float = 50.0):
+        """Extract bright spots from galaxy image to use as star positions
+        
+        Luminance is computed for the whole image at once with surfarray. The
+        image is cut into tiles half ``min_distance`` wide and the brightest
+        pixel of each tile becomes a candidate, since two stars could never
+        share a tile anyway. Candidates at or above ``threshold`` are then taken
+        brightest first, skipping any closer than ``min_distance`` to one
+        already taken, using a grid so each check only looks at nearby cells.
+        When a tile's candidate is skipped the tile is rescanned for its
+        brightest sample clear of every star taken so far, which goes back in
+        line, so the result matches a greedy pass over every pixel taken
+        brightest first, ties by y then x.
+        """
+        import heapq
         import pygame
         
         width, height = galaxy_surface.get_size()
-        brightness_map = []
+        if num_stars <= 0 or width == 0 or height == 0:
+            return []
         
-        # Sample brightness at regular intervals to find bright spots
-        sample_step = 5  # Sample every 5 pixels for performance
+        # Perceptual brightness of every sampled pixel, indexed [x, y]
+        if galaxy_surface.get_bytesize() in (3, 4):
+            rgb = pygame.surfarray.pixels3d(galaxy_surface)  # view, no copy
+        else:
+            rgb = pygame.surfarray.array3d(galaxy_surface)
+        rgb = rgb[::sample_step, ::sample_step]
+        brightness = (rgb[..., 0] * np.float32(0.299) + rgb[..., 1] * np.float32(0.587)
+                      + rgb[..., 2] * np.float32(0.114))
+        del rgb  # releases the surface lock
         
-        for y in range(0, height, sample_step):
-            for x in range(0, width, sample_step):
-                try:
-                    # Get pixel color
-                    r, g, b = galaxy_surface.get_at((x, y))[:3]
-                    
-                    # Calculate brightness (weighted for visual perception)
-                    brightness = 0.299 * r + 0.587 * g + 0.114 * b
-                    
-                    # Store position and brightness
-                    brightness_map.append((brightness, x, y))
-                except:
-                    continue
+        # Brightest sample in each tile; tiles are padded out with -1 so they divide evenly.
+        # Samples within a tile are flattened row by row, so argmax breaks ties by (y, x).
+        tile = max(1, int(min_distance / (2 * sample_step)))
+        sw, sh = brightness.shape
+        tw, th = -(-sw // tile), -(-sh // tile)
+        padded = np.full((tw * tile, th * tile), -1.0, dtype=np.float32)
+        padded[:sw, :sh] = brightness
+        tiles = padded.reshape(tw, tile, th, tile).transpose(0, 2, 3, 1).reshape(tw, th, tile * tile)
+        best = tiles.argmax(axis=2)
+        values = np.take_along_axis(tiles, best[..., None], axis=2)[..., 0]
+        xs = (np.arange(tw)[:, None] * tile + best % tile) * sample_step
+        ys = (np.arange(th)[None, :] * tile + best // tile) * sample_step
         
-        # Sort by brightness (brightest first) and take top positions
-        brightness_map.sort(reverse=True, key=lambda x: x[0])
+        # Only consider reasonably bright spots, brightest first (ties by y, then x)
+        keep = values >= threshold
+        ti, tj = np.nonzero(keep)
+        queue = list(zip((-values[keep]).tolist(), ys[keep].tolist(), xs[keep].tolist(),
+                         ti.tolist(), tj.tolist()))
+        heapq.heapify(queue)
         
-        # Extract positions of brightest spots
-        star_positions = []
-        min_distance = 40  # Minimum distance between stars
+        # Offsets of each tile sample from the tile corner, in image pixels
+        local_x = (np.arange(tile * tile) % tile) * sample_step
+        local_y = (np.arange(tile * tile) // tile) * sample_step
         
-        for brightness, x, y in brightness_map:
-            # Only consider reasonably bright spots
-            if brightness < 50:  # Threshold for minimum brightness
-                break
-                
-            # Check if this position is far enough from existing stars
-            too_close = False
-            for existing_x, existing_y in star_positions:
-                distance = math.sqrt((x - existing_x)**2 + (y - existing_y)**2)
-                if distance < min_distance:
-                    too_close = True
+        # Grid cells small enough to hold at most one accepted star
+        cell = min_distance / math.sqrt(2)
+        reach = int(math.ceil(min_distance / cell))
+        min_distance_sq = min_distance * min_distance
+        grid = {}
+        star_positions = []
+        while queue:
+            _, y, x, i, j = heapq.heappop(queue)
+            gx, gy = int(x // cell), int(y // cell)
+            blocker = None
+            for nx in range(gx - reach, gx + reach + 1):
+                for ny in range(gy - reach, gy + reach + 1):
+                    other = grid.get((nx, ny))
+                    if other and (x - other[0]) ** 2 + (y - other[1]) ** 2 < min_distance_sq:
+                        blocker = other
+                        break
+                if blocker:
                     break
             
-            if not too_close:
+            if blocker is None:
+                grid[(gx, gy)] = (x, y)
                 star_positions.append((x, y))
                 
                 # Stop when we have enough stars
                 if len(star_positions) >= num_stars:
                     break
+                continue
+            
+            # Rescan the tile for its brightest sample clear of the stars near it,
+            # unless one of them (usually the one that just blocked it) covers the whole tile
+            x0, y0 = i * tile * sample_step, j * tile * sample_step
+            x1, y1 = x0 + (tile - 1) * sample_step, y0 + (tile - 1) * sample_step
+            far_x = max(abs(blocker[0] - x0), abs(blocker[0] - x1))
+            far_y = max(abs(blocker[1] - y0), abs(blocker[1] - y1))
+            if far_x * far_x + far_y * far_y < min_distance_sq:
+                continue
+            near = []
+            covered = False
+            for nx in range(int((x0 - min_distance) // cell), int((x1 + min_distance) // cell) + 1):
+                for ny in range(int((y0 - min_distance) // cell), int((y1 + min_distance) // cell) + 1):
+                    other = grid.get((nx, ny))
+                    if other:
+                        near.append(other)
+                        far_x = max(abs(other[0] - x0), abs(other[0] - x1))
+                        far_y = max(abs(other[1] - y0), abs(other[1] - y1))
+                        if far_x * far_x + far_y * far_y < min_distance_sq:
+                            covered = True
+                            break
+                if covered:
+                    break
+            if covered:
+                continue
+            
+            px, py = x0 + local_x, y0 + local_y
+            samples = tiles[i, j]
+            clear = samples >= threshold
+            for ox, oy in near:
+                clear &= (px - ox) ** 2 + (py - oy) ** 2 >= min_distance_sq
+            if clear.any():
+                k = int(np.flatnonzero(clear)[samples[clear].argmax()])
+                heapq.heappush(queue, (-float(samples[k]), int(py[k]), int(px[k]), i, j))
         
-        return star_positions
\ No newline at end of file
+        return star_positions
@@ -7,12 +7,20 @@ Main strategic interface showing the galactic map with bottom control panel.
 import pygame
 import math
 from typing import Optional
+from shared.profiler import FrameProfiler
+from shared.sprite_cache import SpriteCache
 from .galaxy_map import GalaxyMap, GalaxyGenerator, Star
+from .galaxy_cache import GalaxyCache
+from .tile_pyramid import TilePyramid
 
 class GalaxyView:
-    def __init__(self, screen, game_state_manager):
+    # Control panel text for GameStateManager.save_status
+    SAVE_STATUS_LABELS = {"saving": "Saving...", "saved": "Saved", "failed": "Save failed"}
+    
+    def __init__(self, screen, game_state_manager, profiler: Optional[FrameProfiler] = None):
         self.screen = screen
         self.game_state = game_state_manager
+        self.profiler = profiler if profiler is not None else FrameProfiler()
         
         # Display settings
         self.screen_width = screen.get_width()
@@ -20,24 +28,28 @@ class GalaxyView:
         self.control_panel_height = 120
         self.map_area_height = self.screen_height - self.control_panel_height
         
-        # Load galaxy background
-        self.galaxy_background = None
+        # Generated galaxies and image analysis, reused across launches and resizes
+        self.galaxy_cache = GalaxyCache()
+        
+        # Galaxy background as a tiled mipmap pyramid, built once per image and kept on disk
+        self.galaxy_image_path = "assets/maps/spiral_arm_galaxy.png"
+        self.background: Optional[TilePyramid] = None
         try:
-            self.galaxy_background = pygame.image.load("assets/maps/spiral_arm_galaxy.png").convert()
-            # Scale to fit the galaxy map dimensions (we'll set these to match image size)
-            self.galaxy_bg_width = 1200
-            self.galaxy_bg_height = 1200
-            self.galaxy_background = pygame.transform.scale(self.galaxy_background, 
-                                                          (self.galaxy_bg_width, self.galaxy_bg_height))
+            self.background = TilePyramid(self.galaxy_image_path,
+                                          self.galaxy_cache.image_digest(self.galaxy_image_path))
         except Exception as e:
             print(f"Could not load galaxy background: {e}")
-            self.galaxy_background = None
+            self.background = None
         
-        # Map state
+        # Map state: stars live in a fixed world of world_size x world_size units,
+        # the camera is the world point at the top-left of the map area and zoom
+        # is screen pixels per world unit
         self.galaxy_map: Optional[GalaxyMap] = None
+        self.world_size = 640
         self.camera_x = 0
         self.camera_y = 0
         self.zoom = 1.0
+        self.max_zoom = 3.0
         self.selected_star: Optional[Star] = None
         
         # UI state
@@ -60,55 +72,82 @@ class GalaxyView:
         # Animation
         self.time_pulse = 0.0
         
+        # Pre-rendered star glows and name labels, shared across frames
+        self.sprites = SpriteCache(max_entries=256)
+        self.label_cache = {}
+        # Extra screen-space border queried around the view so glows and labels at the edge still draw
+        self.cull_margin = 40
+        
         # Initialize galaxy if needed
         if not self.galaxy_map:
             self.generate_new_galaxy()
     
     def generate_new_galaxy(self):
         """Generate a new galaxy map"""
-        # Use current game time as seed for reproducible galaxies
-        seed = hash(self.game_state.current_save.save_name) if self.game_state.current_save else 42
-        
-        # Scale galaxy to fit in the available screen space with some padding
-        available_width = self.screen_width - 40  # Leave 20px padding on each side
-        available_height = self.map_area_height - 40  # Leave 20px padding top/bottom
-        
-        # Use smaller dimension to maintain aspect ratio
-        galaxy_size = min(available_width, available_height)
+        self.label_cache.clear()
+        # The save's galaxy seed gives the same galaxy on every launch
+        seed = self.game_state.current_save.galaxy_seed if self.game_state.current_save else 42
         
+        # Stars are generated in world space, independent of the window size
         self.galaxy_map = GalaxyGenerator.generate_galaxy(
-            width=galaxy_size, 
-            height=galaxy_size, 
+            width=self.world_size, 
+            height=self.world_size, 
             num_stars=45,
             seed=seed,
-            galaxy_image_path="assets/maps/spiral_arm_galaxy.png" if self.galaxy_background else None
+            galaxy_image_path=self.galaxy_image_path if self.background else None,
+            cache=self.galaxy_cache
         )
         
-        # Update background size to match
-        if self.galaxy_background:
-            self.galaxy_bg_width = galaxy_size
-            self.galaxy_bg_height = galaxy_size
-            self.galaxy_background = pygame.transform.scale(
-                pygame.image.load("assets/maps/spiral_arm_galaxy.png").convert(),
-                (galaxy_size, galaxy_size)
-            )
-        
-        # Center camera to show entire galaxy
-        self.camera_x = (self.galaxy_map.width - self.screen_width) // 2
-        self.camera_y = (self.galaxy_map.height - self.map_area_height) // 2
-        
-        # Ensure camera doesn't go negative (galaxy smaller than screen)
-        self.camera_x = max(0, self.camera_x)
-        self.camera_y = max(0, self.camera_y)
+        self.fit_view()
+    
+    def fit_zoom(self):
+        """Zoom at which the whole galaxy fits the map area"""
+        # Leave 20px padding on each side and use the smaller dimension to keep the aspect ratio
+        available = min(self.screen_width - 40, self.map_area_height - 40)
+        return max(available, 40) / self.world_size
+    
+    def snap_zoom(self, zoom, down=False):
+        """Nearest zoom (or next lower, with ``down``) at which background tiles are cached"""
+        if not self.background:
+            return zoom
+        full = self.background.size[0]
+        return self.background.quantize_scale(self.world_size * zoom / full, down) * full / self.world_size
+    
+    def fit_view(self):
+        """Zoom out to show the entire galaxy, centered"""
+        self.zoom = self.snap_zoom(self.fit_zoom(), down=True)
+        self.center_camera_on(self.world_size / 2, self.world_size / 2)
+    
+    def center_camera_on(self, world_x, world_y):
+        """Move the camera so a world point sits in the middle of the map area"""
+        self.camera_x = world_x - self.screen_width / 2 / self.zoom
+        self.camera_y = world_y - self.map_area_height / 2 / self.zoom
+    
+    def set_zoom(self, zoom, anchor=None):
+        """Change zoom, keeping the world point under ``anchor`` (screen coords) in place"""
+        fit = self.fit_zoom()
+        zoom = self.snap_zoom(max(fit * 0.5, min(max(self.max_zoom, fit), zoom)))
+        if anchor is None:
+            anchor = (self.screen_width / 2, self.map_area_height / 2)
+        world_x, world_y = self.screen_to_world(*anchor)
+        self.zoom = zoom
+        self.camera_x = world_x - anchor[0] / zoom
+        self.camera_y = world_y - anchor[1] / zoom
     
     def update_screen_size(self):
-        """Update screen dimensions and regenerate galaxy to fit new size"""
+        """Update screen dimensions; the galaxy itself is kept and only the view is refit"""
+        if not self.galaxy_map:
+            self.generate_new_galaxy()
+        center = self.screen_to_world(self.screen_width / 2, self.map_area_height / 2)
+        old_fit = self.fit_zoom()
+        
         self.screen_width = self.screen.get_width()
         self.screen_height = self.screen.get_height()
         self.map_area_height = self.screen_height - self.control_panel_height
         
-        # Regenerate galaxy to fit new screen size
-        self.generate_new_galaxy()
+        # Keep the same framing: scale zoom with the window and stay on the same spot
+        self.zoom = self.snap_zoom(self.zoom * self.fit_zoom() / old_fit)
+        self.center_camera_on(*center)
     
     def handle_event(self, event):
         """Handle input events"""
@@ -118,7 +157,7 @@ class GalaxyView:
                 if mouse_y < self.map_area_height:  # Click in map area
                     # Check for star selection
                     world_x, world_y = self.screen_to_world(mouse_x, mouse_y)
-                    clicked_star = self.galaxy_map.get_star_at_position(world_x, world_y, 15.0)
+                    clicked_star = self.galaxy_map.get_star_at_position(world_x, world_y, 15.0 / self.zoom)
                     if clicked_star:
                         self.selected_star = clicked_star
                         print(f"Selected star: {clicked_star.name}")
@@ -140,10 +179,16 @@ class GalaxyView:
                 mouse_x, mouse_y = event.pos
                 dx = mouse_x - self.last_mouse_pos[0]
                 dy = mouse_y - self.last_mouse_pos[1]
-                self.camera_x -= dx
-                self.camera_y -= dy
+                self.camera_x -= dx / self.zoom
+                self.camera_y -= dy / self.zoom
                 self.last_mouse_pos = event.pos
         
+        elif event.type == pygame.MOUSEWHEEL:
+            mouse_x, mouse_y = pygame.mouse.get_pos()
+            if mouse_y < self.map_area_height:
+                # Zoom around the cursor
+                self.set_zoom(self.zoom * 1.15 ** event.y, (mouse_x, mouse_y))
+        
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_SPACE:
                 # Advance time
@@ -151,6 +196,9 @@ class GalaxyView:
             elif event.key == pygame.K_TAB:
                 # Cycle through stars
                 self.cycle_star_selection()
+            elif event.key == pygame.K_HOME:
+                # Show the whole galaxy again
+                self.fit_view()
         
         return None
     
@@ -172,6 +220,7 @@ class GalaxyView:
         if self.game_state.current_save:
             self.game_state.current_save.game_turn += 1
             print(f"Turn advanced to: {self.game_state.current_save.game_turn}")
+            self.game_state.autosave()
     
     def cycle_star_selection(self):
         """Cycle through stars for easy navigation"""
@@ -190,19 +239,18 @@ class GalaxyView:
         
         # Center camera on selected star
         if self.selected_star:
-            self.camera_x = self.selected_star.x - self.screen_width // 2
-            self.camera_y = self.selected_star.y - self.map_area_height // 2
+            self.center_camera_on(self.selected_star.x, self.selected_star.y)
     
     def screen_to_world(self, screen_x, screen_y):
         """Convert screen coordinates to world coordinates"""
-        world_x = screen_x + self.camera_x
-        world_y = screen_y + self.camera_y
+        world_x = screen_x / self.zoom + self.camera_x
+        world_y = screen_y / self.zoom + self.camera_y
         return world_x, world_y
     
     def world_to_screen(self, world_x, world_y):
         """Convert world coordinates to screen coordinates"""
-        screen_x = world_x - self.camera_x
-        screen_y = world_y - self.camera_y
+        screen_x = (world_x - self.camera_x) * self.zoom
+        screen_y = (world_y - self.camera_y) * self.zoom
         return screen_x, screen_y
     
     def update(self, dt):
@@ -214,45 +262,54 @@ class GalaxyView:
         # Clear screen
         self.screen.fill((5, 5, 15))  # Very dark space
         
+        scope = self.profiler.scope
+        
         # Render galaxy map
-        self.render_galaxy_map()
+        with scope("render_galaxy_map"):
+            self.render_galaxy_map()
         
         # Render control panel
-        self.render_control_panel()
+        with scope("render_control_panel"):
+            self.render_control_panel()
         
         # Render UI overlays
-        self.render_star_info()
+        with scope("render_star_info"):
+            self.render_star_info()
     
     def render_galaxy_map(self):
         """Render the galactic map"""
         if not self.galaxy_map:
             return
         
-        # Create map surface (clipped to map area)
-        map_surface = pygame.Surface((self.screen_width, self.map_area_height))
-        map_surface.fill((5, 5, 15))
+        # Draw straight onto the screen, clipped to the map area
+        map_rect = pygame.Rect(0, 0, self.screen_width, self.map_area_height)
+        map_surface = self.screen
+        map_surface.set_clip(map_rect)
+        map_surface.fill((5, 5, 15), map_rect)
         
         # Draw galaxy background image if available
-        if self.galaxy_background:
-            # Calculate position to center the galaxy image
-            bg_screen_x = -self.camera_x
-            bg_screen_y = -self.camera_y
-            
-            # Only draw if any part is visible
-            if (bg_screen_x + self.galaxy_bg_width > 0 and bg_screen_x < self.screen_width and
-                bg_screen_y + self.galaxy_bg_height > 0 and bg_screen_y < self.map_area_height):
-                map_surface.blit(self.galaxy_background, (bg_screen_x, bg_screen_y))
+        if self.background:
+            # The image covers the world square, so its corner sits at world (0, 0)
+            bg_screen_x, bg_screen_y = self.world_to_screen(0, 0)
+            bg_size = self.world_size * self.zoom
+            tiles = self.background.draw(map_surface, bg_screen_x, bg_screen_y, bg_size, bg_size, map_rect)
+            if self.profiler.enabled:
+                self.profiler.count("bg_tiles", tiles)
         else:
             # Draw background grid if no galaxy image
             self.draw_background_grid(map_surface)
         
-        # Draw stars
-        for star in self.galaxy_map.stars:
-            screen_x, screen_y = self.world_to_screen(star.x, star.y)
-            
-            # Only draw if on screen
-            if -20 <= screen_x <= self.screen_width + 20 and -20 <= screen_y <= self.map_area_height + 20:
-                self.draw_star(map_surface, star, screen_x, screen_y)
+        # Ask the index for just the stars near the camera; the margin keeps
+        # glows and name labels that hang over the edge
+        margin = self.cull_margin
+        left, top = self.screen_to_world(-margin, -margin)
+        right, bottom = self.screen_to_world(self.screen_width + margin, self.map_area_height + margin)
+        visible = self.galaxy_map.index.rows_in_rect(left, top, right, bottom)
+        self.draw_stars(map_surface, self.galaxy_map.stars, visible)
+        
+        if self.profiler.enabled:
+            self.profiler.count("stars_total", len(self.galaxy_map.stars))
+            self.profiler.count("stars_drawn", len(visible))
         
         # Draw selection indicator
         if self.selected_star:
@@ -260,57 +317,67 @@ class GalaxyView:
             if 0 <= screen_x <= self.screen_width and 0 <= screen_y <= self.map_area_height:
                 self.draw_selection_indicator(map_surface, screen_x, screen_y)
         
-        self.screen.blit(map_surface, (0, 0))
+        map_surface.set_clip(None)
     
     def draw_background_grid(self, surface):
         """Draw subtle background grid"""
-        grid_size = 100
+        grid_size = max(10, 100 * self.zoom)  # 100 world units
         grid_color = (15, 15, 25)
         
         # Vertical lines
-        start_x = -(self.camera_x % grid_size)
-        for x in range(int(start_x), self.screen_width + grid_size, grid_size):
+        x = -((self.camera_x * self.zoom) % grid_size)
+        while x < self.screen_width:
             pygame.draw.line(surface, grid_color, (x, 0), (x, self.map_area_height))
+            x += grid_size
         
         # Horizontal lines
-        start_y = -(self.camera_y % grid_size)
-        for y in range(int(start_y), self.map_area_height + grid_size, grid_size):
+        y = -((self.camera_y * self.zoom) % grid_size)
+        while y < self.map_area_height:
             pygame.draw.line(surface, grid_color, (0, y), (self.screen_width, y))
+            y += grid_size
     
-    def draw_star(self, surface, star, screen_x, screen_y):
-        """Draw a star on the map"""
-        # Create a proper glow effect using filled circles with decreasing alpha
-        glow_layers = 5
-        max_glow_radius = int(star.size * 2.5)
-        
-        # Create temporary surface for glow with alpha
-        glow_surface = pygame.Surface((max_glow_radius * 2 + 10, max_glow_radius * 2 + 10), pygame.SRCALPHA)
-        
-        for i in range(glow_layers):
-            # Calculate radius and alpha for this layer
-            layer_radius = max_glow_radius * (1 - i / glow_layers)
-            alpha = int(30 * (1 - i / glow_layers))  # Fade out towards edges
+    def draw_stars(self, surface, stars, rows):
+        """Draw the given StarTable rows in three batched passes: glows, cores, then name labels"""
+        glow = self.sprites.glow
+        circle = self.sprites.circle
+        palette = stars.colors
+        names = stars.names
+        
+        # Positions follow the zoom; stars keep their on-screen size like map icons
+        xs = (stars.x[rows] - self.camera_x) * self.zoom
+        ys = (stars.y[rows] - self.camera_y) * self.zoom
+        sizes = stars.size[rows]
+        glow_radii = (sizes * 2.5).astype(int)
+        radii = sizes.astype(int)
+        
+        glows, cores, labels = [], [], []
+        for screen_x, screen_y, size, max_glow_radius, radius, color_code, name_code in zip(
+                xs.tolist(), ys.tolist(), sizes.tolist(), glow_radii.tolist(), radii.tolist(),
+                stars.color_code[rows].tolist(), stars.name_code[rows].tolist()):
+            color = palette[color_code]
+            
+            # Soft glow, rendered once per (size, color) and reused every frame
+            glows.append((glow(max_glow_radius, color),
+                          (screen_x - max_glow_radius - 5, screen_y - max_glow_radius - 5)))
             
-            # Create glow color with alpha
-            glow_color = (*star.color, alpha)
+            # Main star (solid and bright)
+            cores.append((circle(radius, color), (int(screen_x) - radius - 1, int(screen_y) - radius - 1)))
             
-            # Draw filled circle for glow layer
-            if layer_radius > 0:
-                pygame.draw.circle(glow_surface, glow_color, 
-                                 (max_glow_radius + 5, max_glow_radius + 5), 
-                                 int(layer_radius))
-        
-        # Blit glow to main surface
-        surface.blit(glow_surface, (screen_x - max_glow_radius - 5, screen_y - max_glow_radius - 5))
-        
-        # Main star (solid and bright)
-        pygame.draw.circle(surface, star.color, (int(screen_x), int(screen_y)), int(star.size))
-        
-        # Star name (if not too zoomed out)
-        if star.size > 2:
-            name_text = self.small_font.render(star.name, True, (180, 180, 200))
-            name_rect = name_text.get_rect(center=(screen_x, screen_y + star.size + 12))
-            surface.blit(name_text, name_rect)
+            # Star name (if not too zoomed out)
+            if size > 2:
+                name_text = self.star_label(names[name_code])
+                labels.append((name_text, name_text.get_rect(center=(screen_x, screen_y + size + 12))))
+        
+        surface.blits(glows, doreturn=False)
+        surface.blits(cores, doreturn=False)
+        surface.blits(labels, doreturn=False)
+    
+    def star_label(self, name):
+        """Rendered name label, cached per star name"""
+        label = self.label_cache.get(name)
+        if label is None:
+            label = self.label_cache[name] = self.small_font.render(name, True, (180, 180, 200))
+        return label
     
     def draw_selection_indicator(self, surface, screen_x, screen_y):
         """Draw selection indicator around selected star"""
@@ -340,6 +407,12 @@ class GalaxyView:
             turn_text = self.info_font.render(f"Turn: {self.game_state.current_save.game_turn}", 
                                             True, self.text_color)
             self.screen.blit(turn_text, (20, panel_y + 20))
+            
+            # Background save progress
+            save_label = self.SAVE_STATUS_LABELS.get(self.game_state.save_status)
+            if save_label:
+                save_text = self.small_font.render(save_label, True, (120, 120, 140))
+                self.screen.blit(save_text, (40 + turn_text.get_width(), panel_y + 24))
         
         # Control buttons
         self.draw_button("End Turn", 50, panel_y + 50, 100, 30)
@@ -6,8 +6,33 @@ Handles save/load functionality, game settings, and persistent data.
 
 import json
 import os
-from dataclasses import dataclass, asdict
-from typing import Dict, Any, Optional
+import threading
+from dataclasses import dataclass, asdict, field, fields
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from .save_file import SaveFile
+from .sector_galaxy import SectorGalaxy
+
+SAVE_EXTENSION = ".qsav"
+LEGACY_EXTENSION = ".json"
+
+# Called with the save result ("snapshot", "delta", "unchanged", or None on failure)
+SaveCallback = Callable[[Optional[str]], None]
+
+_LEAF_TYPES = {str, int, float, bool, type(None)}
+
+def _copy_containers(value):
+    """Copy lists and dicts all the way down, sharing the immutable leaves"""
+    if isinstance(value, list):
+        # Flat lists (explored star names, ...) are copied in one C-level call
+        if set(map(type, value)) <= _LEAF_TYPES:
+            return value.copy()
+        return [_copy_containers(v) for v in value]
+    if isinstance(value, dict):
+        if set(map(type, value.values())) <= _LEAF_TYPES:
+            return value.copy()
+        return {k: _copy_containers(v) for k, v in value.items()}
+    return value
 
 @dataclass
 class GameSettings:
@@ -29,10 +54,19 @@ class GameSave:
     difficulty: str = "normal"
     playtime_hours: float = 0.0
     galaxy_seed: int = 42
-    # TODO: Add actual game data as we build systems
-    # explored_stars: List[str] = field(default_factory=list)
-    # player_fleets: List[Dict] = field(default_factory=list)
-    # diplomatic_status: Dict[str, str] = field(default_factory=dict)
+    explored_stars: List[str] = field(default_factory=list)
+    player_fleets: List[Dict] = field(default_factory=list)
+    diplomatic_status: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GameSave":
+        """Build a save from stored fields, ignoring any this version does not know"""
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Field values detached from this save, so play can continue while they are written"""
+        return {f.name: _copy_containers(getattr(self, f.name)) for f in fields(self)}
 
 class GameStateManager:
     """Manages game state, saves, and settings"""
@@ -51,6 +85,20 @@ class GameStateManager:
         # Current game state
         self.current_save: Optional[GameSave] = None
         
+        # Open save files by save name; each remembers what it last wrote
+        self.save_files: Dict[str, SaveFile] = {}
+        
+        # Sector galaxies by save name; their changed sectors are written with each save
+        self.sector_galaxies: Dict[str, SectorGalaxy] = {}
+        
+        # Background saving: one worker thread writes queued snapshots in order
+        self.save_status = "idle"  # idle, saving, saved, failed
+        self.last_save_error: Optional[str] = None
+        self._save_lock = threading.Condition()
+        self._pending_saves: Dict[str, Tuple[Dict[str, Any], List[SaveCallback]]] = {}
+        self._saving = False
+        self._save_thread: Optional[threading.Thread] = None
+        
     def load_settings(self) -> GameSettings:
         """Load user settings from file"""
         try:
@@ -66,44 +114,159 @@ class GameStateManager:
     
     def save_settings(self):
         """Save current settings to file"""
+        tmp_path = self.settings_file + ".tmp"
         try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(asdict(self.settings), f, indent=2)
+            # Encode first and swap the file in whole, so a failure never truncates settings.json
+            payload = json.dumps(asdict(self.settings), indent=2)
+            with open(tmp_path, 'w') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.settings_file)
         except Exception as e:
             print(f"Could not save settings: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
     
     def get_save_files(self) -> list[str]:
         """Get list of available save files"""
         try:
-            saves = []
+            saves = set()
             for filename in os.listdir(self.saves_dir):
-                if filename.endswith('.json'):
-                    saves.append(filename[:-5])  # Remove .json extension
+                name, ext = os.path.splitext(filename)
+                if ext in (SAVE_EXTENSION, LEGACY_EXTENSION):
+                    saves.add(name)
             return sorted(saves)
         except Exception:
             return []
     
+    def save_file(self, save_name: str) -> SaveFile:
+        """The binary save file for ``save_name``"""
+        save_file = self.save_files.get(save_name)
+        if save_file is None:
+            save_path = os.path.join(self.saves_dir, f"{save_name}{SAVE_EXTENSION}")
+            save_file = self.save_files[save_name] = SaveFile(save_path)
+        return save_file
+    
+    def sector_galaxy(self, save_data: GameSave) -> SectorGalaxy:
+        """The sector galaxy for ``save_data``, restoring its changed sectors from disk"""
+        galaxy = self.sector_galaxies.get(save_data.save_name)
+        if galaxy is None:
+            galaxy = SectorGalaxy.for_save(save_data, self.saves_dir)
+            self.sector_galaxies[save_data.save_name] = galaxy
+        return galaxy
+    
     def load_game(self, save_name: str) -> Optional[GameSave]:
-        """Load a game save"""
+        """Load a game save, replaying its snapshot and deltas"""
+        self.wait_for_saves()
+        save_file = self.save_file(save_name)
         try:
-            save_path = os.path.join(self.saves_dir, f"{save_name}.json")
-            if os.path.exists(save_path):
-                with open(save_path, 'r') as f:
+            if save_file.exists():
+                data = save_file.load()
+                if data is not None:
+                    return GameSave.from_dict(data)
+                print(f"Save '{save_name}' has no intact snapshot")
+        except Exception as e:
+            print(f"Could not load save '{save_name}': {e}")
+        
+        # Saves from before the binary format
+        try:
+            legacy_path = os.path.join(self.saves_dir, f"{save_name}{LEGACY_EXTENSION}")
+            if os.path.exists(legacy_path):
+                with open(legacy_path, 'r') as f:
                     data = json.load(f)
-                    return GameSave(**data)
+                    return GameSave.from_dict(data)
         except Exception as e:
             print(f"Could not load save '{save_name}': {e}")
         return None
     
-    def save_game(self, save_data: GameSave):
-        """Save current game state"""
+    def save_game(self, save_data: GameSave) -> Optional[str]:
+        """Save current game state now; only the fields changed since the last save are written.
+        Returns "snapshot", "delta" or "unchanged", or None if the save failed"""
+        self.wait_for_saves()
+        self.current_save = save_data
+        self._stage_sectors(save_data.save_name)
+        result, error = self._write_save(save_data.save_name, save_data.snapshot())
+        self.save_status = "failed" if error else "saved"
+        self.last_save_error = error
+        return result
+    
+    def save_game_async(self, save_data: GameSave, on_complete: Optional[SaveCallback] = None):
+        """Queue a save on the worker thread and return immediately.
+        
+        Only the snapshot of the state is taken here; diffing, encoding,
+        compression and fsync happen on the worker. If an earlier save of the
+        same game has not started yet, this newer state replaces it.
+        Changed sectors are encoded here too and written by the worker.
+        ``on_complete`` is called on the worker thread with the result.
+        """
+        self._stage_sectors(save_data.save_name)
+        state = save_data.snapshot()
+        self.current_save = save_data
+        with self._save_lock:
+            _, callbacks = self._pending_saves.pop(save_data.save_name, (None, []))
+            if on_complete:
+                callbacks.append(on_complete)
+            self._pending_saves[save_data.save_name] = (state, callbacks)
+            self.save_status = "saving"
+            if self._save_thread is None:
+                self._save_thread = threading.Thread(target=self._save_worker, name="save-worker", daemon=True)
+                self._save_thread.start()
+            self._save_lock.notify_all()
+    
+    def autosave(self, on_complete: Optional[SaveCallback] = None) -> bool:
+        """Save the current game in the background if auto-save is enabled"""
+        if self.settings.auto_save and self.current_save:
+            self.save_game_async(self.current_save, on_complete)
+            return True
+        return False
+    
+    def is_saving(self) -> bool:
+        with self._save_lock:
+            return bool(self._pending_saves) or self._saving
+    
+    def wait_for_saves(self, timeout: Optional[float] = None) -> bool:
+        """Block until queued saves are written; False if ``timeout`` ran out first"""
+        with self._save_lock:
+            return self._save_lock.wait_for(lambda: not self._pending_saves and not self._saving, timeout)
+    
+    def _save_worker(self):
+        while True:
+            with self._save_lock:
+                self._save_lock.wait_for(lambda: self._pending_saves)
+                save_name = next(iter(self._pending_saves))
+                state, callbacks = self._pending_saves.pop(save_name)
+                self._saving = True
+            
+            result, error = self._write_save(save_name, state)
+            
+            with self._save_lock:
+                self._saving = False
+                self.last_save_error = error
+                if error:
+                    self.save_status = "failed"
+                elif not self._pending_saves:
+                    self.save_status = "saved"
+                self._save_lock.notify_all()
+            for callback in callbacks:
+                try:
+                    callback(result)
+                except Exception as e:
+                    print(f"Save callback failed: {e}")
+    
+    def _stage_sectors(self, save_name: str):
+        galaxy = self.sector_galaxies.get(save_name)
+        if galaxy is not None:
+            galaxy.stage_modified()
+    
+    def _write_save(self, save_name: str, state: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """Write staged sectors, then a snapshot taken by GameSave.snapshot; returns (result, error)"""
         try:
-            save_path = os.path.join(self.saves_dir, f"{save_data.save_name}.json")
-            with open(save_path, 'w') as f:
-                json.dump(asdict(save_data), f, indent=2)
-            self.current_save = save_data
+            galaxy = self.sector_galaxies.get(save_name)
+            if galaxy is not None:
+                galaxy.write_staged()
+            return self.save_file(save_name).write(state, owned=True), None
         except Exception as e:
             print(f"Could not save game: {e}")
+            return None, str(e)
     
     def has_continue_save(self) -> bool:
         """Check if there's a recent save to continue"""
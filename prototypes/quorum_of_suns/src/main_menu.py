@@ -6,6 +6,7 @@ Handles the main menu interface with New Game, Continue, and Settings options.
 
 import pygame
 from enum import Enum
+from shared.starfield import Starfield, StarLayer
 
 class MenuOption(Enum):
     NEW_GAME = 0
@@ -42,6 +43,14 @@ class MainMenu:
         # Animation
         self.pulse_timer = 0.0
         
+        # Twinkling background stars, built once (seeded for consistent stars)
+        self.starfield = Starfield(
+            screen.get_size(),
+            [StarLayer(100, sizes=(1, 1, 1, 2), brightness=(100 / 255, 1.0))],
+            seed=42,
+            twinkle_rate=90.0,
+        )
+        
     def handle_event(self, event):
         """Handle input events, return new game state if changing"""
         if event.type == pygame.KEYDOWN:
@@ -84,6 +93,7 @@ class MainMenu:
     def update(self, dt):
         """Update menu animations"""
         self.pulse_timer += dt * 3.0  # Pulse speed
+        self.starfield.update(dt)
     
     def render(self):
         """Render the main menu"""
@@ -149,19 +159,5 @@ class MainMenu:
     
     def render_starfield(self):
         """Render animated starfield background"""
-        # Simple starfield effect
-        import random
-        random.seed(42)  # Consistent stars
-        
-        for _ in range(100):
-            x = random.randint(0, self.screen.get_width())
-            y = random.randint(0, self.screen.get_height())
-            brightness = random.randint(100, 255)
-            size = random.choice([1, 1, 1, 2])  # Mostly small stars
-            
-            # Twinkling effect
-            twinkle = abs(pygame.math.Vector2(1, 0).rotate(self.pulse_timer * 30 + x + y).x)
-            final_brightness = int(brightness * (0.3 + 0.7 * twinkle))
-            
-            color = (final_brightness, final_brightness, final_brightness)
-            pygame.draw.circle(self.screen, color, (x, y), size)
\ No newline at end of file
+        self.starfield.resize(*self.screen.get_size())
+        self.starfield.draw(self.screen)
@@ -0,0 +1,354 @@
+"""
+Save Files for Quorum of Suns
+
+A save is one binary file: a header, a full snapshot of the game state, then
+append-only delta records holding only the fields that changed since the
+previous record. Autosaving on every turn therefore costs about as much as
+the turn changed, not the size of the whole game. Once the deltas add up to
+more than the snapshot (or there are ``snapshot_every`` of them) the file is
+rewritten as a fresh snapshot, via a temp file and ``os.replace``.
+
+Every record carries a sequence number, its length and a CRC32 of its
+payload, so a write torn by a crash or power loss is detected on load: the
+save is replayed up to the last intact record and the damaged tail is cut off
+before the next append. Payloads use a small tagged binary encoding of plain
+Python values (None, bool, int, float, str, list, dict) and are
+zlib-compressed when that makes them smaller.
+"""
+
+import copy
+import os
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bump whenever the record layout changes; older files are then not read
+FORMAT_VERSION = 1
+
+SAVE_MAGIC = b"QSAV"
+FILE_HEADER = struct.Struct("<4sB")        # magic, version
+RECORD_HEADER = struct.Struct("<BBIII")    # kind, flags, sequence, payload length, crc32
+
+SNAPSHOT = 1
+DELTA = 2
+
+COMPRESSED = 0x01
+
+# Delta operations: (op, field, value)
+SET = 0        # replace the field's value
+EXTEND = 1     # append items to a list field
+UPDATE = 2     # set keys of a dict field
+DELETE = 3     # remove keys from a dict field
+
+INT64 = struct.Struct("<q")
+FLOAT = struct.Struct("<d")
+LENGTH = struct.Struct("<I")
+
+State = Dict[str, Any]
+Delta = List[Tuple[int, str, Any]]
+
+
+class SaveFile:
+    """One save on disk: a full snapshot followed by delta records"""
+
+    def __init__(self, path: str, snapshot_every: int = 32, compress_over: int = 256):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.compress_over = compress_over
+        self.state: Optional[State] = None   # state as last written or loaded
+        self.sequence = 0
+        self.deltas = 0                      # delta records since the snapshot
+        self.snapshot_bytes = 0
+        self.delta_bytes = 0
+        self.length = 0                      # end of the last intact record
+        self.torn = False                    # a damaged tail was found on load
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def stats(self) -> dict:
+        return {
+            "sequence": self.sequence,
+            "deltas": self.deltas,
+            "snapshot_bytes": self.snapshot_bytes,
+            "delta_bytes": self.delta_bytes,
+            "torn": self.torn,
+        }
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def load(self) -> Optional[State]:
+        """Replay the snapshot and every intact delta; None if there is no usable snapshot"""
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if len(data) < FILE_HEADER.size:
+            raise ValueError("not a save file")
+        magic, version = FILE_HEADER.unpack_from(data, 0)
+        if magic != SAVE_MAGIC:
+            raise ValueError("not a save file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported save format version {version}")
+
+        state = None
+        offset = FILE_HEADER.size
+        while True:
+            record = _read_record(data, offset)
+            if record is None:
+                break
+            kind, sequence, payload, end = record
+            if state is None:
+                if kind != SNAPSHOT:
+                    break
+                state = decode_value(payload)
+                self.snapshot_bytes = end - offset
+                self.deltas = self.delta_bytes = 0
+            elif kind == DELTA and sequence == self.sequence + 1:
+                apply_delta(state, decode_value(payload))
+                self.deltas += 1
+                self.delta_bytes += end - offset
+            else:
+                break
+            self.sequence = sequence
+            offset = end
+
+        if state is None:
+            return None
+        self.length = offset
+        self.torn = offset < len(data)
+        if self.torn:
+            print(f"Save '{self.path}' has a damaged tail; recovered up to record {self.sequence}")
+        self.state = state
+        return copy.deepcopy(state)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def write(self, state: State, owned: bool = False) -> str:
+        """Persist ``state``; returns "snapshot", "delta" or "unchanged".
+
+        Pass ``owned=True`` when the caller will not touch ``state`` again, so
+        it can be kept as the new baseline without copying it.
+        """
+        if self.state is None or not os.path.exists(self.path):
+            self.write_snapshot(state, owned)
+            return "snapshot"
+        delta = diff_state(self.state, state)
+        if not delta:
+            return "unchanged"
+        payload, flags = self._pack(delta)
+        size = RECORD_HEADER.size + len(payload)
+        if self.deltas + 1 >= self.snapshot_every or self.delta_bytes + size > self.snapshot_bytes:
+            self.write_snapshot(state, owned)
+            return "snapshot"
+
+        with open(self.path, "r+b") as f:
+            # Anything past the last intact record is a torn write; overwrite it
+            f.seek(self.length)
+            f.truncate()
+            f.write(self._record(DELTA, flags, self.sequence + 1, payload))
+            f.flush()
+            os.fsync(f.fileno())
+        self.sequence += 1
+        self.deltas += 1
+        self.delta_bytes += size
+        self.length += size
+        self.torn = False
+        self.state = state if owned else copy.deepcopy(state)
+        return "delta"
+
+    def write_snapshot(self, state: State, owned: bool = False):
+        """Replace the file with a single full snapshot of ``state``"""
+        payload, flags = self._pack(state)
+        record = self._record(SNAPSHOT, flags, self.sequence + 1, payload)
+        tmp_path = self.path + ".tmp"
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(FILE_HEADER.pack(SAVE_MAGIC, FORMAT_VERSION))
+                f.write(record)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.sequence += 1
+        self.snapshot_bytes = len(record)
+        self.deltas = self.delta_bytes = 0
+        self.length = FILE_HEADER.size + len(record)
+        self.torn = False
+        self.state = state if owned else copy.deepcopy(state)
+
+    def _pack(self, value) -> Tuple[bytes, int]:
+        out = bytearray()
+        encode_value(out, value)
+        payload = bytes(out)
+        if len(payload) > self.compress_over:
+            compressed = zlib.compress(payload, 6)
+            if len(compressed) < len(payload):
+                return compressed, COMPRESSED
+        return payload, 0
+
+    @staticmethod
+    def _record(kind: int, flags: int, sequence: int, payload: bytes) -> bytes:
+        return RECORD_HEADER.pack(kind, flags, sequence, len(payload), zlib.crc32(payload)) + payload
+
+
+def _read_record(data: bytes, offset: int) -> Optional[Tuple[int, int, bytes, int]]:
+    """(kind, sequence, payload, end) of the record at ``offset``, or None if it is missing or damaged"""
+    if offset + RECORD_HEADER.size > len(data):
+        return None
+    kind, flags, sequence, length, crc = RECORD_HEADER.unpack_from(data, offset)
+    start = offset + RECORD_HEADER.size
+    end = start + length
+    if kind not in (SNAPSHOT, DELTA) or end > len(data):
+        return None
+    payload = data[start:end]
+    if zlib.crc32(payload) != crc:
+        return None
+    if flags & COMPRESSED:
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error:
+            return None
+    return kind, sequence, payload, end
+
+
+# ----------------------------------------------------------------------
+# Deltas
+# ----------------------------------------------------------------------
+def diff_state(old: State, new: State) -> Delta:
+    """Operations that turn ``old`` into ``new``, field by field"""
+    ops: Delta = []
+    for name, value in new.items():
+        if name not in old:
+            ops.append((SET, name, value))
+            continue
+        prev = old[name]
+        if prev == value:
+            continue
+        if (isinstance(prev, list) and isinstance(value, list)
+                and len(value) > len(prev) and value[:len(prev)] == prev):
+            ops.append((EXTEND, name, value[len(prev):]))
+        elif isinstance(prev, dict) and isinstance(value, dict):
+            changed = {k: v for k, v in value.items() if k not in prev or prev[k] != v}
+            removed = [k for k in prev if k not in value]
+            if changed:
+                ops.append((UPDATE, name, changed))
+            if removed:
+                ops.append((DELETE, name, removed))
+        else:
+            ops.append((SET, name, value))
+    return ops
+
+
+def apply_delta(state: State, ops) -> State:
+    for op, name, value in ops:
+        if op == SET:
+            state[name] = value
+        elif op == EXTEND:
+            state.setdefault(name, []).extend(value)
+        elif op == UPDATE:
+            state.setdefault(name, {}).update(value)
+        elif op == DELETE:
+            fields = state.get(name, {})
+            for key in value:
+                fields.pop(key, None)
+        else:
+            raise ValueError(f"unknown delta operation {op}")
+    return state
+
+
+# ----------------------------------------------------------------------
+# Value encoding
+# ----------------------------------------------------------------------
+def encode_value(out: bytearray, value):
+    if value is None:
+        out += b"N"
+    elif value is True:
+        out += b"T"
+    elif value is False:
+        out += b"F"
+    elif isinstance(value, int):
+        if -(1 << 63) <= value < (1 << 63):
+            out += b"i"
+            out += INT64.pack(value)
+        else:
+            _encode_bytes(out, b"I", str(value).encode("ascii"))
+    elif isinstance(value, float):
+        out += b"d"
+        out += FLOAT.pack(value)
+    elif isinstance(value, str):
+        _encode_bytes(out, b"s", value.encode("utf-8"))
+    elif isinstance(value, (list, tuple)):
+        out += b"l"
+        out += LENGTH.pack(len(value))
+        for item in value:
+            encode_value(out, item)
+    elif isinstance(value, dict):
+        out += b"m"
+        out += LENGTH.pack(len(value))
+        for key, item in value.items():
+            encode_value(out, key)
+            encode_value(out, item)
+    else:
+        raise TypeError(f"cannot save value of type {type(value).__name__}")
+
+
+def _encode_bytes(out: bytearray, tag: bytes, raw: bytes):
+    out += tag
+    out += LENGTH.pack(len(raw))
+    out += raw
+
+
+def decode_value(data: bytes):
+    value, offset = _decode(data, 0)
+    if offset != len(data):
+        raise ValueError("trailing bytes after value")
+    return value
+
+
+def _decode(data: bytes, offset: int):
+    tag = data[offset:offset + 1]
+    offset += 1
+    if tag == b"N":
+        return None, offset
+    if tag == b"T":
+        return True, offset
+    if tag == b"F":
+        return False, offset
+    if tag == b"i":
+        return INT64.unpack_from(data, offset)[0], offset + INT64.size
+    if tag == b"d":
+        return FLOAT.unpack_from(data, offset)[0], offset + FLOAT.size
+    if tag in (b"s", b"I"):
+        (length,) = LENGTH.unpack_from(data, offset)
+        offset += LENGTH.size
+        raw = data[offset:offset + length]
+        if len(raw) != length:
+            raise ValueError("truncated string")
+        text = raw.decode("utf-8")
+        return (text if tag == b"s" else int(text)), offset + length
+    if tag == b"l":
+        (count,) = LENGTH.unpack_from(data, offset)
+        offset += LENGTH.size
+        items = []
+        for _ in range(count):
+            item, offset = _decode(data, offset)
+            items.append(item)
+        return items, offset
+    if tag == b"m":
+        (count,) = LENGTH.unpack_from(data, offset)
+        offset += LENGTH.size
+        mapping = {}
+        for _ in range(count):
+            key, offset = _decode(data, offset)
+            mapping[key], offset = _decode(data, offset)
+        return mapping, offset
+    raise ValueError(f"unknown value tag {tag!r}")
@@ -0,0 +1,413 @@
+"""
+Sector Galaxy for Quorum of Suns
+
+A galaxy too big to keep in memory, split into square sectors that are only
+generated when something looks at them. Each sector's stars come from its own
+RNG seeded with (galaxy seed, sector x, sector y), so a sector can be dropped
+and regenerated later with exactly the same stars; loading sector (5, 9)
+never depends on which sectors were loaded before it.
+
+Sectors that have been changed (a star explored, a starbase built) are
+written to a SectorStore, one small file per sector next to the save, and
+loaded from there instead of being regenerated. Saving happens in two steps
+so the game can hand the file writes to a background thread: stage_modified()
+encodes the changed sectors on the game thread, then write_staged() writes
+them (GameStateManager does both with every game save). A staged record is
+kept in memory until its write succeeds. Unchanged sectors are evicted least
+recently used once more than ``max_loaded`` are in memory; a changed one is
+staged and written first, and without a store it is never evicted. Sectors can also be pinned, e.g. around the camera or the
+player's fleets, to keep them loaded.
+
+Queries use the same names as GalaxyMap, so callers can switch between the two.
+"""
+
+import math
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .galaxy_map import GalaxyGenerator
+from .save_file import decode_value, encode_value
+from .spatial_index import TableIndex
+from .star_table import STAR_TYPES, Star, StarTable
+
+SectorKey = Tuple[int, int]
+
+
+@dataclass
+class Sector:
+    """One generated sector and its stars"""
+    key: SectorKey
+    stars: StarTable
+    index: TableIndex = field(repr=False)
+    modified: bool = False
+
+
+class SectorStore:
+    """Changed sectors on disk, one zlib-compressed file per sector"""
+
+    # Bump whenever the sector record changes; older files are then not read
+    FORMAT_VERSION = 1
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, key: SectorKey) -> str:
+        return os.path.join(self.directory, f"{key[0]}_{key[1]}.sector")
+
+    def has(self, key: SectorKey) -> bool:
+        return os.path.exists(self._path(key))
+
+    def load(self, key: SectorKey) -> Optional[StarTable]:
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        return self.decode(data, self._path(key))
+
+    def decode(self, data: bytes, source: str = "sector record") -> StarTable:
+        """Stars from a record made by ``encode``"""
+        record = decode_value(zlib.decompress(data))
+        if record.get("version") != self.FORMAT_VERSION:
+            raise ValueError(f"unsupported sector format in {source}")
+        count = len(record["names"])
+        stars = StarTable(count)
+        stars.extend(
+            names=record["names"],
+            xs=record["x"],
+            ys=record["y"],
+            star_types=[STAR_TYPES[code] for code in record["types"]],
+            colors=[tuple(color) for color in record["colors"]],
+            sizes=record["sizes"],
+            has_planets=[False] * count
+        )
+        stars.flags[:count] = record["flags"]
+        stars.homeworlds = {row: tuple(hw) for row, hw in record["homeworlds"].items()}
+        return stars
+
+    def save(self, key: SectorKey, stars: StarTable):
+        """Write a sector's current stars, replacing any earlier file in one step"""
+        self.write(key, self.encode(stars))
+
+    def encode(self, stars: StarTable) -> bytes:
+        """Compressed record of a sector's current stars"""
+        n = len(stars)
+        record = {
+            "version": self.FORMAT_VERSION,
+            "names": [stars.names[code] for code in stars.name_code[:n].tolist()],
+            "x": stars.x[:n].tolist(),
+            "y": stars.y[:n].tolist(),
+            "types": stars.type_code[:n].tolist(),
+            "colors": [list(stars.colors[code]) for code in stars.color_code[:n].tolist()],
+            "sizes": stars.size[:n].tolist(),
+            "flags": stars.flags[:n].tolist(),
+            "homeworlds": {row: list(hw) for row, hw in stars.homeworlds.items()},
+        }
+        out = bytearray()
+        encode_value(out, record)
+        return zlib.compress(bytes(out), 6)
+
+    def write(self, key: SectorKey, data: bytes):
+        """Write an encoded record, replacing any earlier file in one step"""
+        path = self._path(key)
+        tmp_path = path + ".tmp"
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+class SectorGalaxy:
+    """Lazily generated, evictable sectors covering a sectors_x x sectors_y grid"""
+
+    # Sectors per side for each GameSave.galaxy_size
+    SECTORS_PER_SIDE = {"small": 4, "medium": 8, "large": 32, "huge": 256}
+
+    def __init__(self, seed: int, sectors_x: int, sectors_y: int, sector_size: float = 1000.0,
+                 stars_per_sector: float = 60.0, max_loaded: int = 256, name: str = "Quorum Galaxy",
+                 store: Optional[SectorStore] = None):
+        self.seed = seed % (1 << 64)
+        self.sectors_x = sectors_x
+        self.sectors_y = sectors_y
+        self.sector_size = float(sector_size)
+        self.stars_per_sector = stars_per_sector
+        self.max_loaded = max_loaded
+        self.name = name
+        self.store = store
+        self.width = sectors_x * self.sector_size
+        self.height = sectors_y * self.sector_size
+
+        self._sectors: "OrderedDict[SectorKey, Sector]" = OrderedDict()
+        self.pinned: Set[SectorKey] = set()
+        # Encoded changes not yet written to the store; the lock lets a save thread write them
+        self._staged: Dict[SectorKey, bytes] = {}
+        self._staged_lock = threading.Lock()
+        self.generated = 0
+        self.restored = 0
+        self.evictions = 0
+
+    @classmethod
+    def for_save(cls, save, saves_dir: str = "data/saves", **kwargs) -> "SectorGalaxy":
+        """Sector galaxy sized and seeded from a GameSave, keeping changed sectors next to the save"""
+        side = cls.SECTORS_PER_SIDE.get(save.galaxy_size, cls.SECTORS_PER_SIDE["medium"])
+        kwargs.setdefault("store", SectorStore(os.path.join(saves_dir, f"{save.save_name}.sectors")))
+        return cls(save.galaxy_seed, side, side, **kwargs)
+
+    def __len__(self):
+        """Stars currently in memory"""
+        return sum(len(sector.stars) for sector in self._sectors.values())
+
+    @property
+    def stars(self) -> List[Star]:
+        """Stars of the loaded sectors only"""
+        return [star for sector in self._sectors.values() for star in sector.stars]
+
+    def stats(self) -> dict:
+        return {
+            "sectors": self.sectors_x * self.sectors_y,
+            "loaded": len(self._sectors),
+            "modified": sum(1 for s in self._sectors.values() if s.modified),
+            "staged": len(self._staged),
+            "pinned": len(self.pinned),
+            "stars_loaded": len(self),
+            "generated": self.generated,
+            "restored": self.restored,
+            "evictions": self.evictions,
+        }
+
+    # ------------------------------------------------------------------
+    # Sectors
+    # ------------------------------------------------------------------
+    def sector_key(self, x: float, y: float) -> SectorKey:
+        return (int(math.floor(x / self.sector_size)), int(math.floor(y / self.sector_size)))
+
+    def in_bounds(self, key: SectorKey) -> bool:
+        return 0 <= key[0] < self.sectors_x and 0 <= key[1] < self.sectors_y
+
+    def sector_keys_in_rect(self, left: float, top: float, right: float, bottom: float) -> Iterator[SectorKey]:
+        x0, y0 = self.sector_key(left, top)
+        x1, y1 = self.sector_key(right, bottom)
+        for sx in range(max(0, x0), min(self.sectors_x - 1, x1) + 1):
+            for sy in range(max(0, y0), min(self.sectors_y - 1, y1) + 1):
+                yield (sx, sy)
+
+    def is_loaded(self, key: SectorKey) -> bool:
+        return key in self._sectors
+
+    def sector(self, key: SectorKey) -> Sector:
+        """The sector at ``key``, loading or generating it if it is not in memory"""
+        sector = self._sectors.get(key)
+        if sector is not None:
+            self._sectors.move_to_end(key)
+            return sector
+        if not self.in_bounds(key):
+            raise KeyError(f"sector {key} is outside the galaxy")
+        with self._staged_lock:
+            data = self._staged.get(key)
+        if data is not None:
+            stars = self.store.decode(data)
+        else:
+            stars = self.store.load(key) if self.store is not None else None
+        if stars is not None:
+            sector = Sector(key, stars, self._index(stars))
+            self.restored += 1
+        else:
+            sector = self._generate(key)
+            self.generated += 1
+        self._sectors[key] = sector
+        self._evict()
+        return sector
+
+    def pin(self, keys: Iterable[SectorKey]):
+        """Keep these sectors loaded (e.g. around player fleets) until unpinned"""
+        for key in keys:
+            if self.in_bounds(key):
+                self.pinned.add(key)
+                self.sector(key)
+
+    def unpin(self, keys: Iterable[SectorKey]):
+        self.pinned.difference_update(keys)
+        self._evict()
+
+    def pin_near(self, x: float, y: float, radius: float):
+        """Pin every sector within ``radius`` of a point"""
+        self.pin(self.sector_keys_in_rect(x - radius, y - radius, x + radius, y + radius))
+
+    def load_rect(self, left: float, top: float, right: float, bottom: float) -> List[Sector]:
+        """Make sure every sector overlapping the rectangle (e.g. the camera view) is loaded"""
+        return [self.sector(key) for key in self.sector_keys_in_rect(left, top, right, bottom)]
+
+    def mark_modified(self, star: Star):
+        """Record that ``star`` was changed, so its sector is kept instead of regenerated"""
+        key = self.sector_key(star.x, star.y)
+        sector = self._sectors.get(key)
+        if sector is None or sector.stars is not star._table:
+            # The star's sector was evicted (and perhaps reloaded) after the caller got the
+            # star; its table holds the change, so it becomes the loaded copy again
+            if sector is not None and sector.modified:
+                raise ValueError(f"{star.name} is from a stale copy of modified sector {key}")
+            sector = Sector(key, star._table, self._index(star._table))
+            self._sectors[key] = sector
+        self._sectors.move_to_end(key)
+        sector.modified = True
+        self._evict()
+
+    def modified_sectors(self) -> List[Sector]:
+        """Sectors with changes that have not been written to the store yet"""
+        return [s for s in self._sectors.values() if s.modified]
+
+    def save_modified(self) -> int:
+        """Write every changed sector to the store now; returns how many records were written"""
+        self.stage_modified()
+        saved = self.write_staged()
+        self._evict()
+        return saved
+
+    def stage_modified(self) -> int:
+        """Encode every changed sector for writing (on the game thread); returns how many"""
+        if self.store is None:
+            raise RuntimeError("this sector galaxy has no store to save sectors to")
+        modified = self.modified_sectors()
+        for sector in modified:
+            self._stage(sector)
+        return len(modified)
+
+    def write_staged(self, keys: Optional[Iterable[SectorKey]] = None) -> int:
+        """Write staged sectors to the store; safe to call from a save thread.
+
+        A record whose write fails stays staged, so the next save retries it.
+        """
+        if keys is None:
+            with self._staged_lock:
+                keys = list(self._staged)
+        written = 0
+        for key in keys:
+            # Held across the write so a newer record for the key is never overwritten by an older one
+            with self._staged_lock:
+                data = self._staged.pop(key, None)
+                if data is None:
+                    continue
+                try:
+                    self.store.write(key, data)
+                except OSError:
+                    self._staged[key] = data
+                    raise
+            written += 1
+        return written
+
+    def _stage(self, sector: Sector):
+        data = self.store.encode(sector.stars)
+        with self._staged_lock:
+            self._staged[sector.key] = data
+        sector.modified = False
+
+    def _evict(self):
+        """Drop least recently used unpinned sectors, writing changed ones out first"""
+        if len(self._sectors) <= self.max_loaded:
+            return
+        for key in list(self._sectors):
+            if len(self._sectors) <= self.max_loaded:
+                break
+            sector = self._sectors[key]
+            if key in self.pinned:
+                continue
+            if sector.modified:
+                if self.store is None:
+                    continue  # nowhere to keep the change, so the sector stays loaded
+                self._stage(sector)
+                try:
+                    self.write_staged([key])
+                except OSError as e:
+                    # still staged in memory; the next save retries the write
+                    print(f"Could not write sector {key}: {e}")
+            del self._sectors[key]
+            self.evictions += 1
+
+    # ------------------------------------------------------------------
+    # Generation
+    # ------------------------------------------------------------------
+    def density(self, x: float, y: float) -> float:
+        """Relative star density: a bright core fading outwards, brighter along three spiral arms"""
+        cx, cy = self.width / 2, self.height / 2
+        radius = max(1.0, min(self.width, self.height) / 2)
+        dx, dy = x - cx, y - cy
+        r = math.sqrt(dx * dx + dy * dy) / radius
+        if r > 1.0:
+            return 0.05
+        theta = math.atan2(dy, dx)
+        arms = 0.5 + 0.5 * math.cos(3 * (theta - r * math.pi))
+        return 0.15 + 0.85 * math.exp(-2.0 * r * r) * (0.4 + 0.6 * arms)
+
+    def _generate(self, key: SectorKey) -> Sector:
+        sx, sy = key
+        rng = np.random.default_rng([self.seed, sx, sy])
+        size = self.sector_size
+        left, top = sx * size, sy * size
+        count = int(rng.poisson(self.stars_per_sector * self.density(left + size / 2, top + size / 2)))
+
+        stars = StarTable(count)
+        if count:
+            xs = left + rng.uniform(0, size, count)
+            ys = top + rng.uniform(0, size, count)
+            star_types = GalaxyGenerator._star_types(rng, count)
+            base_names = rng.integers(0, len(GalaxyGenerator.STAR_NAMES), count).tolist()
+            names = GalaxyGenerator.STAR_NAMES
+            stars.extend(
+                names=[f"{names[n]} {sx}:{sy}-{i}" for i, n in enumerate(base_names)],
+                xs=xs,
+                ys=ys,
+                star_types=star_types,
+                colors=[GalaxyGenerator.STAR_COLORS[t] for t in star_types],
+                sizes=[GalaxyGenerator._get_star_size(t) for t in star_types],
+                has_planets=rng.random(count) > 0.1  # 90% have planets
+            )
+        return Sector(key, stars, self._index(stars))
+
+    def _index(self, stars: StarTable) -> TableIndex:
+        return TableIndex(stars, cell_size=self.sector_size / 8)
+
+    # ------------------------------------------------------------------
+    # Queries (same names as GalaxyMap; they load the sectors they touch)
+    # ------------------------------------------------------------------
+    def get_stars_in_rect(self, left: float, top: float, right: float, bottom: float) -> List[Star]:
+        found = []
+        for sector in self.load_rect(left, top, right, bottom):
+            found.extend(sector.index.in_rect(left, top, right, bottom))
+        return found
+
+    def get_stars_in_range(self, center_x: float, center_y: float, range_radius: float) -> List[Star]:
+        """Stars within ``range_radius`` of a position, nearest first"""
+        r2 = range_radius * range_radius
+        hits = []
+        for star in self.get_stars_in_rect(center_x - range_radius, center_y - range_radius,
+                                           center_x + range_radius, center_y + range_radius):
+            d2 = (star.x - center_x) ** 2 + (star.y - center_y) ** 2
+            if d2 <= r2:
+                hits.append((d2, id(star), star))
+        hits.sort(key=lambda h: h[:2])
+        return [h[2] for h in hits]
+
+    def get_star_at_position(self, x: float, y: float, tolerance: float = 20.0) -> Optional[Star]:
+        """Find the star nearest the given position, within ``tolerance``"""
+        best = None
+        best_d2 = tolerance * tolerance
+        for sector in self.load_rect(x - tolerance, y - tolerance, x + tolerance, y + tolerance):
+            star = sector.index.nearest(x, y, tolerance)
+            if star is not None:
+                d2 = (star.x - x) ** 2 + (star.y - y) ** 2
+                if d2 <= best_d2:
+                    best, best_d2 = star, d2
+        return best
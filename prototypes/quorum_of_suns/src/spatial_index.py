@@ -0,0 +1,155 @@
+"""
+Spatial Index for Quorum of Suns
+
+Uniform grid over star positions for mouse picking, sensor ranges and
+viewport queries. Each query only visits the cells it overlaps, so the cost
+depends on how many stars are near the query, not on how big the galaxy is.
+
+The grid covers the rows of a StarTable and is stored as NumPy arrays,
+without a Python object per star.
+"""
+
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class TableIndex:
+    """Uniform grid over the rows of a StarTable, stored as NumPy arrays
+
+    Rows are sorted by cell (column-major), so all the cells a rectangle spans
+    in one grid column are a single contiguous slice of ``order``. Queries
+    gather those slices, filter them with array math and only create Star
+    views for the rows they return. The grid remembers the table version it
+    was built from, so any edit to the table (including ``star.x = ...``)
+    makes the next query rebuild it, fully vectorized.
+    """
+
+    # Aim for roughly this many stars per cell when sizing the grid automatically
+    TARGET_PER_CELL = 2.0
+
+    def __init__(self, table, cell_size: Optional[float] = None):
+        self.table = table
+        self.fixed_cell_size = cell_size
+        self.cell_size = 64.0
+        self.bounds = None  # occupied cell range (x0, y0, x1, y1)
+        self.order = np.zeros(0, dtype=np.int32)   # rows sorted by cell
+        self.starts = np.zeros(1, dtype=np.int32)  # cell id -> first position in order
+        self._version = -1  # table version the grid was built from
+        self.build()
+
+    def __len__(self):
+        return len(self.table)
+
+    def build(self, table=None, cell_size: Optional[float] = None):
+        """Rebuild from the table's current rows"""
+        if table is not None:
+            self.table = table
+        if cell_size is not None:
+            self.fixed_cell_size = cell_size
+        n = len(self.table)
+        xs = self.table.x[:n]
+        ys = self.table.y[:n]
+        if self.fixed_cell_size is not None:
+            cs = float(self.fixed_cell_size)
+        elif n < 2:
+            cs = 64.0
+        else:
+            area = max(1.0, float(np.ptp(xs)) * float(np.ptp(ys)))
+            cs = max(4.0, math.sqrt(area * self.TARGET_PER_CELL / n))
+        self.cell_size = cs
+        self._version = self.table.version
+        if n == 0:
+            self.bounds = None
+            self.order = np.zeros(0, dtype=np.int32)
+            self.starts = np.zeros(1, dtype=np.int32)
+            return
+        cx = np.floor(xs / cs).astype(np.int64)
+        cy = np.floor(ys / cs).astype(np.int64)
+        x0, y0 = int(cx.min()), int(cy.min())
+        x1, y1 = int(cx.max()), int(cy.max())
+        self.bounds = (x0, y0, x1, y1)
+        rows_per_column = y1 - y0 + 1
+        cell_ids = (cx - x0) * rows_per_column + (cy - y0)
+        self.order = np.argsort(cell_ids, kind="stable").astype(np.int32)
+        cells = (x1 - x0 + 1) * rows_per_column
+        self.starts = np.searchsorted(cell_ids[self.order], np.arange(cells + 1)).astype(np.int32)
+
+    def _fresh(self):
+        if self._version != self.table.version:
+            self.build()
+
+    # There is no insert/remove: edits go through the table, and the version
+    # change marks the grid stale
+    def move(self, star, x: float, y: float):
+        self.table.move(star._row, x, y)
+
+    def rows_in_rect(self, left: float, top: float, right: float, bottom: float) -> np.ndarray:
+        """Rows with left <= x <= right and top <= y <= bottom"""
+        self._fresh()
+        if self.bounds is None:
+            return self.order
+        cs = self.cell_size
+        x0, y0, x1, y1 = self.bounds
+        cx0 = max(x0, math.floor(left / cs))
+        cx1 = min(x1, math.floor(right / cs))
+        cy0 = max(y0, math.floor(top / cs))
+        cy1 = min(y1, math.floor(bottom / cs))
+        if cx0 > cx1 or cy0 > cy1:
+            return self.order[:0]
+        rows_per_column = y1 - y0 + 1
+        starts = self.starts
+        order = self.order
+        pieces = []
+        for cx in range(cx0, cx1 + 1):
+            base = (cx - x0) * rows_per_column - y0
+            a = starts[base + cy0]
+            b = starts[base + cy1 + 1]
+            if b > a:
+                pieces.append(order[a:b])
+        if not pieces:
+            return order[:0]
+        rows = pieces[0] if len(pieces) == 1 else np.concatenate(pieces)
+        xs = self.table.x[rows]
+        ys = self.table.y[rows]
+        return rows[(xs >= left) & (xs <= right) & (ys >= top) & (ys <= bottom)]
+
+    def in_rect(self, left: float, top: float, right: float, bottom: float) -> List:
+        return self.table.stars(self.rows_in_rect(left, top, right, bottom))
+
+    def _rows_near(self, x: float, y: float, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows within ``radius`` of (x, y) and their squared distances, nearest first"""
+        rows = self.rows_in_rect(x - radius, y - radius, x + radius, y + radius)
+        d2 = self.table.distances_sq(x, y, rows)
+        keep = d2 <= radius * radius
+        rows, d2 = rows[keep], d2[keep]
+        by_distance = np.lexsort((rows, d2))
+        return rows[by_distance], d2[by_distance]
+
+    def within_radius(self, x: float, y: float, radius: float) -> List:
+        """Stars within ``radius`` of (x, y), nearest first"""
+        return self.table.stars(self._rows_near(x, y, radius)[0])
+
+    def nearest(self, x: float, y: float, max_distance: float = math.inf):
+        """Closest star to (x, y), or None if none lies within ``max_distance``"""
+        found = self.k_nearest(x, y, 1, max_distance)
+        return found[0] if found else None
+
+    def k_nearest(self, x: float, y: float, k: int, max_distance: float = math.inf) -> List:
+        """Up to ``k`` closest stars to (x, y) within ``max_distance``, nearest first"""
+        self._fresh()
+        if k <= 0 or self.bounds is None:
+            return []
+        cs = self.cell_size
+        x0, y0, x1, y1 = self.bounds
+        # widest square that could still matter: one reaching every occupied cell
+        span = math.hypot(max(abs(x - x0 * cs), abs(x - (x1 + 1) * cs)),
+                          max(abs(y - y0 * cs), abs(y - (y1 + 1) * cs)))
+        reach = min(cs, max_distance)
+        while True:
+            # everything outside the searched square is at least ``reach`` away
+            rows, d2 = self._rows_near(x, y, reach)
+            if len(rows) >= k or reach >= max_distance or reach >= span:
+                return self.table.stars(rows[:k])
+            reach = min(reach * 2, max_distance)
@@ -0,0 +1,279 @@
+"""
+Star Lanes for Quorum of Suns
+
+Builds the network of travel lanes between stars and answers route queries
+on it. Lanes approximate a relative neighbourhood graph: two stars are linked
+unless some third star is closer to both of them than they are to each other.
+This gives a sparse, planar-looking web with no long lanes that skip past a
+star, which is also what a player expects to see on the map.
+
+It is an approximation: only each star's ``neighbours`` nearest stars are
+considered as lane candidates, so a true RNG edge to a farther star (rare,
+mostly across empty gaps between clusters) is missed. Clusters left
+disconnected that way are joined afterwards by their shortest bridging lane.
+
+Routes are found with A*, guided by the larger of the straight-line distance
+and an ALT bound (shortest-path distances to a handful of landmark stars,
+precomputed with Dijkstra when the lanes are built). Finished routes are kept
+in an LRU cache, so the many repeated queries fleets and AI make each turn
+are dictionary lookups.
+"""
+
+import heapq
+import math
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .spatial_index import TableIndex
+from .star_table import StarTable
+
+Route = Tuple[Tuple[int, ...], float]
+
+
+class StarLanes:
+    """Lane graph over a fixed StarTable with cached A* routing"""
+
+    def __init__(self, stars: StarTable, index: Optional[TableIndex] = None, max_jump: Optional[float] = None,
+                 neighbours: int = 8, landmarks: int = 8, max_routes: int = 4096):
+        self.stars = list(stars)
+        self.max_jump = max_jump
+        self.max_routes = max_routes
+        self._ids: Dict[int, int] = {id(star): i for i, star in enumerate(self.stars)}
+        self.adjacency: List[List[Tuple[int, float]]] = [[] for _ in self.stars]
+        self._routes: "OrderedDict[Tuple[int, int], Route]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        index = index if index is not None else TableIndex(stars)
+        self._build_lanes(index, neighbours)
+        if max_jump is None:
+            self._connect_components(index)
+        self.component = self._components()
+        self._build_landmarks(landmarks)
+
+    def __len__(self):
+        return len(self.stars)
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    def _build_lanes(self, index: TableIndex, neighbours: int):
+        stars = self.stars
+        ids = self._ids
+        edges = set()
+        for a, star in enumerate(stars):
+            # Candidates come nearest first, so every star that could block the
+            # lane to candidate j (it must be closer to ``star``) comes before it
+            near = [s for s in index.k_nearest(star.x, star.y, neighbours + 1) if s is not star]
+            for j, other in enumerate(near):
+                d = star.distance_to(other)
+                if self.max_jump is not None and d > self.max_jump:
+                    break
+                if any(other.distance_to(witness) < d and star.distance_to(witness) < d for witness in near[:j]):
+                    continue
+                b = ids.get(id(other))
+                if b is not None:
+                    edges.add((min(a, b), max(a, b)))
+        for a, b in edges:
+            self._link(a, b)
+
+    def _link(self, a: int, b: int):
+        d = self.stars[a].distance_to(self.stars[b])
+        self.adjacency[a].append((b, d))
+        self.adjacency[b].append((a, d))
+
+    def _components(self) -> List[int]:
+        component = [-1] * len(self.stars)
+        label = 0
+        for start in range(len(self.stars)):
+            if component[start] >= 0:
+                continue
+            component[start] = label
+            stack = [start]
+            while stack:
+                n = stack.pop()
+                for m, _ in self.adjacency[n]:
+                    if component[m] < 0:
+                        component[m] = label
+                        stack.append(m)
+            label += 1
+        return component
+
+    def _connect_components(self, index: TableIndex):
+        """Join separate clusters with their shortest bridging lane until one network remains"""
+        component = self._components()
+        groups: Dict[int, List[int]] = {}
+        for n, c in enumerate(component):
+            groups.setdefault(c, []).append(n)
+        while len(groups) > 1:
+            # Bridge the smallest cluster to its nearest star elsewhere, then merge the two
+            label = min(groups, key=lambda c: len(groups[c]))
+            members = groups.pop(label)
+            best = None
+            for a in members:
+                # Only stars closer than the best bridge so far can improve on it
+                limit = best[0] if best is not None else math.inf
+                d, b = self._nearest_outside(index, a, component, label, limit)
+                if b is not None and (best is None or d < best[0]):
+                    best = (d, a, b)
+            if best is None:
+                return
+            self._link(best[1], best[2])
+            target = component[best[2]]
+            for n in members:
+                component[n] = target
+            groups[target].extend(members)
+
+    def _nearest_outside(self, index: TableIndex, a: int, component: List[int], label: int,
+                         max_distance: float = math.inf) -> Tuple[float, Optional[int]]:
+        """(distance, star) of the closest star to ``a`` within ``max_distance`` that is not in cluster ``label``"""
+        star = self.stars[a]
+        k = 8
+        while True:
+            near = index.k_nearest(star.x, star.y, k, max_distance)
+            for other in near:  # nearest first
+                b = self._ids.get(id(other))
+                if b is not None and component[b] != label:
+                    return star.distance_to(other), b
+            if len(near) < k:
+                return math.inf, None
+            k *= 2
+
+    def _dijkstra(self, source: int) -> List[float]:
+        dist = [math.inf] * len(self.stars)
+        dist[source] = 0.0
+        heap = [(0.0, source)]
+        adjacency = self.adjacency
+        while heap:
+            d, n = heapq.heappop(heap)
+            if d > dist[n]:
+                continue
+            for m, w in adjacency[n]:
+                nd = d + w
+                if nd < dist[m]:
+                    dist[m] = nd
+                    heapq.heappush(heap, (nd, m))
+        return dist
+
+    def _build_landmarks(self, count: int):
+        """Pick far-apart landmarks and store every star's distance to each"""
+        self.landmarks: List[int] = []
+        tables: List[List[float]] = []
+        if self.stars and count > 0:
+            # Farthest-point selection: each new landmark is the star farthest from those chosen
+            nearest = self._dijkstra(0)
+            for _ in range(min(count, len(self.stars))):
+                candidates = [(d, n) for n, d in enumerate(nearest) if d != math.inf and n not in self.landmarks]
+                if not candidates:
+                    break
+                landmark = max(candidates)[1]
+                dist = self._dijkstra(landmark)
+                self.landmarks.append(landmark)
+                tables.append(dist)
+                nearest = [min(a, b) for a, b in zip(nearest, dist)]
+        # Per star, its distance to every landmark; unreachable is stored as 0, which keeps
+        # the bound valid because routes are only searched within one component
+        self._landmark_dist = [tuple(0.0 if t[n] == math.inf else t[n] for t in tables)
+                               for n in range(len(self.stars))]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def lanes(self) -> List[Tuple[object, object]]:
+        """Every lane once, as (star, star) pairs"""
+        return [(self.stars[a], self.stars[b]) for a, links in enumerate(self.adjacency)
+                for b, _ in links if a < b]
+
+    def neighbours(self, star) -> List:
+        """Stars one lane away from ``star``"""
+        return [self.stars[b] for b, _ in self.adjacency[self._ids[id(star)]]]
+
+    def route(self, start, goal) -> List:
+        """Stars along the shortest lane route from ``start`` to ``goal``, inclusive; [] if unreachable"""
+        path, _ = self._route(self._ids[id(start)], self._ids[id(goal)])
+        return [self.stars[n] for n in path]
+
+    def route_distance(self, start, goal) -> float:
+        """Length of the shortest lane route, or inf if unreachable"""
+        return self._route(self._ids[id(start)], self._ids[id(goal)])[1]
+
+    def clear_routes(self):
+        self._routes.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "stars": len(self.stars),
+            "lanes": sum(len(links) for links in self.adjacency) // 2,
+            "landmarks": len(self.landmarks),
+            "routes": len(self._routes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _route(self, start: int, goal: int) -> Route:
+        routes = self._routes
+        key = (start, goal)
+        cached = routes.get(key)
+        if cached is None:
+            # Lanes are two-way, so the reverse trip is the same route backwards
+            reverse = routes.get((goal, start))
+            if reverse is not None:
+                cached = (reverse[0][::-1], reverse[1])
+        if cached is not None:
+            routes[key] = cached
+            routes.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            cached = routes[key] = self._search(start, goal)
+        while len(routes) > self.max_routes:
+            routes.popitem(last=False)
+        return cached
+
+    def _search(self, start: int, goal: int) -> Route:
+        """A* from ``start`` to ``goal`` using the straight-line and landmark bounds"""
+        if start == goal:
+            return (start,), 0.0
+        if self.component[start] != self.component[goal]:
+            return (), math.inf
+
+        stars = self.stars
+        gx, gy = stars[goal].x, stars[goal].y
+        goal_dist = self._landmark_dist[goal]
+        landmark_dist = self._landmark_dist
+
+        def estimate(n):
+            s = stars[n]
+            h = math.sqrt((s.x - gx) ** 2 + (s.y - gy) ** 2)
+            for a, b in zip(landmark_dist[n], goal_dist):
+                d = a - b if a > b else b - a
+                if d > h:
+                    h = d
+            return h
+
+        best = {start: 0.0}
+        came_from = {}
+        heap = [(estimate(start), 0.0, start)]
+        adjacency = self.adjacency
+        while heap:
+            _, g, n = heapq.heappop(heap)
+            if n == goal:
+                break
+            if g > best[n]:
+                continue
+            for m, w in adjacency[n]:
+                ng = g + w
+                if ng < best.get(m, math.inf):
+                    best[m] = ng
+                    came_from[m] = n
+                    heapq.heappush(heap, (ng + estimate(m), ng, m))
+        else:
+            return (), math.inf
+
+        path = [goal]
+        while path[-1] != start:
+            path.append(came_from[path[-1]])
+        path.reverse()
+        return tuple(path), best[goal]
@@ -0,0 +1,433 @@
+"""
+Star Storage for Quorum of Suns
+
+Stars are stored column by column in a StarTable: NumPy arrays for position,
+size, type and color, one bit-packed byte of flags, and names kept once in an
+intern table and referenced by index. A row costs about 30 bytes instead of
+the several hundred a dataclass instance with its own ``__dict__``, float
+objects and color tuple takes, and whole-galaxy questions (what is in this
+rectangle, what is within this range) are answered with array operations.
+
+``Star`` is a small view onto one row. It reads and writes the columns
+through properties, so code written against the old dataclass (the star info
+panel, the spatial index, lane routing) keeps working. Views are cached weakly:
+while anything holds a row's view, the table hands out that same object, so
+stars can still be compared with ``is`` and keyed by ``id()``; iterating the
+whole table does not leave an object per star behind.
+
+Positions are written through ``StarTable.move``, which bumps ``version`` so
+spatial indexes over the table know to rebuild.
+"""
+
+import math
+import weakref
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Color = Tuple[int, int, int]
+
+
+class StarType(Enum):
+    YELLOW_DWARF = "yellow_dwarf"
+    RED_GIANT = "red_giant"
+    WHITE_DWARF = "white_dwarf"
+    BLUE_GIANT = "blue_giant"
+    NEUTRON_STAR = "neutron_star"
+    BINARY_SYSTEM = "binary_system"
+
+
+STAR_TYPES = list(StarType)
+TYPE_CODES = {star_type: code for code, star_type in enumerate(STAR_TYPES)}
+
+HAS_PLANETS = 0x01
+IS_EXPLORED = 0x02
+HAS_STARBASE = 0x04
+
+
+class StarTable:
+    """Columnar storage for stars; behaves like a list of Star views"""
+
+    # name -> dtype of every per-row column
+    FIELDS = {
+        "x": np.float64,
+        "y": np.float64,
+        "size": np.float32,
+        "type_code": np.uint8,
+        "color_code": np.uint16,
+        "name_code": np.int32,
+        "flags": np.uint8,
+    }
+
+    def __init__(self, capacity: int = 64):
+        self.n = 0
+        self.version = 0  # bumped whenever rows are added, removed or moved
+        for name, dtype in self.FIELDS.items():
+            setattr(self, name, np.zeros(max(1, capacity), dtype=dtype))
+        # Interned strings and colors, referenced by the *_code columns
+        self.names: List[str] = []
+        self._name_codes: Dict[str, int] = {}
+        self.colors: List[Color] = []
+        self._color_codes: Dict[Color, int] = {}
+        # Only a handful of stars are homeworlds, so these live off to the side
+        self.homeworlds: Dict[int, Tuple[Optional[str], Optional[str]]] = {}
+        # row -> view, only while something still holds the view
+        self._views: "weakref.WeakValueDictionary[int, Star]" = weakref.WeakValueDictionary()
+
+    @classmethod
+    def from_stars(cls, stars: Iterable["Star"]) -> "StarTable":
+        """Table holding ``stars``; each Star object becomes a view onto its new row"""
+        stars = list(stars)
+        table = cls(len(stars))
+        for star in stars:
+            table.append(star)
+        return table
+
+    # ------------------------------------------------------------------
+    # Sequence behaviour
+    # ------------------------------------------------------------------
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self.view(row) for row in range(*item.indices(self.n))]
+        row = item + self.n if item < 0 else item
+        if not 0 <= row < self.n:
+            raise IndexError("star index out of range")
+        return self.view(row)
+
+    def __iter__(self):
+        for row in range(self.n):
+            yield self.view(row)
+
+    def __eq__(self, other):
+        if isinstance(other, (StarTable, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __contains__(self, star) -> bool:
+        return isinstance(star, Star) and star._table is self
+
+    def index(self, star) -> int:
+        if isinstance(star, Star) and star._table is self:
+            return star._row
+        for row in range(self.n):
+            if self.view(row) == star:
+                return row
+        raise ValueError("star is not in this table")
+
+    def view(self, row: int) -> "Star":
+        """The Star view for ``row``; the same object is returned while it is alive"""
+        star = self._views.get(row)
+        if star is None:
+            star = self._views[row] = Star._view(self, row)
+        return star
+
+    # ------------------------------------------------------------------
+    # Adding and removing
+    # ------------------------------------------------------------------
+    def _grow(self, needed: int):
+        capacity = len(self.x)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def intern_name(self, name: str) -> int:
+        code = self._name_codes.get(name)
+        if code is None:
+            code = self._name_codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def intern_color(self, color: Sequence[int]) -> int:
+        color = tuple(int(c) for c in color)
+        code = self._color_codes.get(color)
+        if code is None:
+            code = self._color_codes[color] = len(self.colors)
+            self.colors.append(color)
+        return code
+
+    def add(self, name: str, x: float, y: float, star_type: StarType, color: Sequence[int], size: float,
+            has_planets: bool = True, is_explored: bool = False, has_starbase: bool = False,
+            homeworld_species: Optional[str] = None, homeworld_planet: Optional[str] = None) -> int:
+        """Append one star from field values; returns its row"""
+        row = self.n
+        self._grow(row + 1)
+        self.x[row] = x
+        self.y[row] = y
+        self.size[row] = size
+        self.type_code[row] = TYPE_CODES[star_type]
+        self.color_code[row] = self.intern_color(color)
+        self.name_code[row] = self.intern_name(name)
+        self.flags[row] = ((HAS_PLANETS if has_planets else 0)
+                           | (IS_EXPLORED if is_explored else 0)
+                           | (HAS_STARBASE if has_starbase else 0))
+        if homeworld_species is not None or homeworld_planet is not None:
+            self.homeworlds[row] = (homeworld_species, homeworld_planet)
+        self.n = row + 1
+        self.version += 1
+        return row
+
+    def extend(self, names: Sequence[str], xs, ys, star_types: Sequence[StarType], colors: Sequence[Color],
+               sizes, has_planets) -> range:
+        """Append many plain stars at once from parallel columns; returns their rows"""
+        count = len(names)
+        start = self.n
+        self._grow(start + count)
+        end = start + count
+        self.x[start:end] = xs
+        self.y[start:end] = ys
+        self.size[start:end] = sizes
+        self.type_code[start:end] = [TYPE_CODES[t] for t in star_types]
+        self.color_code[start:end] = [self.intern_color(c) for c in colors]
+        self.name_code[start:end] = [self.intern_name(name) for name in names]
+        self.flags[start:end] = np.where(np.asarray(has_planets, dtype=bool), HAS_PLANETS, 0)
+        self.n = end
+        self.version += 1
+        return range(start, end)
+
+    def append(self, star: "Star") -> "Star":
+        """Copy ``star`` into a new row and rebind the same object as that row's view"""
+        row = self.add(**star.fields())
+        old_table, old_row = star._table, star._row
+        if old_table._views.get(old_row) is star:
+            del old_table._views[old_row]  # that row gets a fresh view if it is read again
+        star._table, star._row = self, row
+        self._views[row] = star
+        return star
+
+    def remove(self, star: "Star"):
+        """Delete ``star``'s row; the object keeps its values as a standalone star"""
+        row = self.index(star)
+        removed = self.view(row)
+        removed._detach()
+
+        n = self.n
+        for name in self.FIELDS:
+            column = getattr(self, name)
+            column[row:n - 1] = column[row + 1:n]
+        self.homeworlds = {(r - 1 if r > row else r): hw for r, hw in self.homeworlds.items() if r != row}
+        views = weakref.WeakValueDictionary()
+        for r, view in list(self._views.items()):
+            if r > row:
+                view._row = r - 1
+                views[r - 1] = view
+            elif r < row:
+                views[r] = view
+        self._views = views
+        self.n = n - 1
+        self.version += 1
+
+    def move(self, row: int, x: float, y: float):
+        """Set a row's position; indexes over the table rebuild on their next query"""
+        self.x[row] = x
+        self.y[row] = y
+        self.version += 1
+
+    # ------------------------------------------------------------------
+    # Vectorized queries (all return row numbers)
+    # ------------------------------------------------------------------
+    def rows_in_rect(self, left: float, top: float, right: float, bottom: float) -> np.ndarray:
+        x = self.x[:self.n]
+        y = self.y[:self.n]
+        return np.flatnonzero((x >= left) & (x <= right) & (y >= top) & (y <= bottom))
+
+    def distances_sq(self, x: float, y: float, rows=None) -> np.ndarray:
+        if rows is None:
+            dx = self.x[:self.n] - x
+            dy = self.y[:self.n] - y
+        else:
+            dx = self.x[rows] - x
+            dy = self.y[rows] - y
+        return dx * dx + dy * dy
+
+    def rows_within(self, x: float, y: float, radius: float) -> np.ndarray:
+        """Rows within ``radius`` of (x, y), nearest first"""
+        d2 = self.distances_sq(x, y)
+        rows = np.flatnonzero(d2 <= radius * radius)
+        return rows[np.argsort(d2[rows], kind="stable")]
+
+    def stars(self, rows: Iterable[int]) -> List["Star"]:
+        """Star views for a set of rows"""
+        view = self.view
+        return [view(row) for row in np.asarray(rows).tolist()]
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns"""
+        return sum(getattr(self, name).nbytes for name in self.FIELDS)
+
+
+class Star:
+    """Represents a star in the galaxy (a view onto one StarTable row)"""
+
+    __slots__ = ("_table", "_row", "__weakref__")
+
+    def __init__(self, name: str, x: float, y: float, star_type: StarType, color: Color, size: float,
+                 has_planets: bool = True, is_explored: bool = False, has_starbase: bool = False,
+                 homeworld_species: str = None,  # Species that has their homeworld here
+                 homeworld_planet: str = None):  # Name of the homeworld planet
+        # A star made on its own gets a private one-row table until it is appended somewhere
+        table = StarTable(1)
+        self._table = table
+        self._row = table.add(name, x, y, star_type, color, size, has_planets, is_explored,
+                              has_starbase, homeworld_species, homeworld_planet)
+        table._views[self._row] = self
+
+    @classmethod
+    def _view(cls, table: StarTable, row: int) -> "Star":
+        star = cls.__new__(cls)
+        star._table = table
+        star._row = row
+        return star
+
+    def _detach(self):
+        table = StarTable(1)
+        table.add(**self.fields())
+        table._views[0] = self
+        self._table, self._row = table, 0
+
+    def fields(self) -> dict:
+        return {
+            "name": self.name,
+            "x": self.x,
+            "y": self.y,
+            "star_type": self.star_type,
+            "color": self.color,
+            "size": self.size,
+            "has_planets": self.has_planets,
+            "is_explored": self.is_explored,
+            "has_starbase": self.has_starbase,
+            "homeworld_species": self.homeworld_species,
+            "homeworld_planet": self.homeworld_planet,
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Star):
+            return NotImplemented
+        return self is other or self.fields() == other.fields()
+
+    __hash__ = None  # mutable, like the dataclass it replaces; key by id() instead
+
+    def __repr__(self):
+        return "Star(" + ", ".join(f"{k}={v!r}" for k, v in self.fields().items()) + ")"
+
+    # Column-backed fields
+    @property
+    def name(self) -> str:
+        t = self._table
+        return t.names[t.name_code[self._row]]
+
+    @name.setter
+    def name(self, value: str):
+        self._table.name_code[self._row] = self._table.intern_name(value)
+
+    @property
+    def x(self) -> float:
+        return float(self._table.x[self._row])
+
+    @x.setter
+    def x(self, value: float):
+        self._table.move(self._row, value, self._table.y[self._row])
+
+    @property
+    def y(self) -> float:
+        return float(self._table.y[self._row])
+
+    @y.setter
+    def y(self, value: float):
+        self._table.move(self._row, self._table.x[self._row], value)
+
+    @property
+    def star_type(self) -> StarType:
+        return STAR_TYPES[self._table.type_code[self._row]]
+
+    @star_type.setter
+    def star_type(self, value: StarType):
+        self._table.type_code[self._row] = TYPE_CODES[value]
+
+    @property
+    def color(self) -> Color:
+        t = self._table
+        return t.colors[t.color_code[self._row]]
+
+    @color.setter
+    def color(self, value: Color):
+        self._table.color_code[self._row] = self._table.intern_color(value)
+
+    @property
+    def size(self) -> float:
+        return float(self._table.size[self._row])
+
+    @size.setter
+    def size(self, value: float):
+        self._table.size[self._row] = value
+
+    def _flag(self, bit: int) -> bool:
+        return bool(self._table.flags[self._row] & bit)
+
+    def _set_flag(self, bit: int, on: bool):
+        flags = self._table.flags
+        value = int(flags[self._row])
+        flags[self._row] = (value | bit) if on else (value & ~bit)
+
+    @property
+    def has_planets(self) -> bool:
+        return self._flag(HAS_PLANETS)
+
+    @has_planets.setter
+    def has_planets(self, value: bool):
+        self._set_flag(HAS_PLANETS, value)
+
+    @property
+    def is_explored(self) -> bool:
+        return self._flag(IS_EXPLORED)
+
+    @is_explored.setter
+    def is_explored(self, value: bool):
+        self._set_flag(IS_EXPLORED, value)
+
+    @property
+    def has_starbase(self) -> bool:
+        return self._flag(HAS_STARBASE)
+
+    @has_starbase.setter
+    def has_starbase(self, value: bool):
+        self._set_flag(HAS_STARBASE, value)
+
+    @property
+    def homeworld_species(self) -> Optional[str]:
+        return self._table.homeworlds.get(self._row, (None, None))[0]
+
+    @homeworld_species.setter
+    def homeworld_species(self, value: Optional[str]):
+        self._set_homeworld(value, self.homeworld_planet)
+
+    @property
+    def homeworld_planet(self) -> Optional[str]:
+        return self._table.homeworlds.get(self._row, (None, None))[1]
+
+    @homeworld_planet.setter
+    def homeworld_planet(self, value: Optional[str]):
+        self._set_homeworld(self.homeworld_species, value)
+
+    def _set_homeworld(self, species: Optional[str], planet: Optional[str]):
+        if species is None and planet is None:
+            self._table.homeworlds.pop(self._row, None)
+        else:
+            self._table.homeworlds[self._row] = (species, planet)
+
+    def distance_to(self, other_star) -> float:
+        """Calculate distance to another star"""
+        dx = self.x - other_star.x
+        dy = self.y - other_star.y
+        return math.sqrt(dx * dx + dy * dy)
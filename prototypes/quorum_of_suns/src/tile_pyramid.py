@@ -0,0 +1,167 @@
+"""
+Tiled Background Pyramid for Quorum of Suns
+
+Cuts the galaxy art into a mipmap pyramid of fixed-size tiles: level 0 is the
+image at full resolution and each further level halves it, down to a single
+tile. The tiles are written to disk the first time an image is seen and loaded
+from there afterwards.
+
+Drawing picks the level closest to (but not coarser than) the current zoom and
+blits only the tiles that overlap the target area. Each tile is scaled by at
+most the 1-2x left over after choosing the level, and the scaled tiles are
+kept in an LRU, so panning and zooming never rescale or blit the whole image.
+Scales are snapped to 1/16 of an octave before tiles are scaled, so zooming
+back and forth reuses tiles instead of filling the LRU with near-duplicates.
+"""
+
+import math
+import os
+import shutil
+from typing import List, Optional, Tuple
+
+import pygame
+
+from shared.sprite_cache import SpriteCache
+
+COMPLETE_MARKER = "complete"
+SCALE_STEPS = 16  # scaled tiles are made for 2 ** (k / SCALE_STEPS) only
+
+
+class TilePyramid:
+    """Multi-resolution tiled image, built once per image and cached on disk"""
+
+    def __init__(self, image_path: str, image_key: str, tile_size: int = 256,
+                 cache_dir: str = "data/cache/tiles", max_tiles: int = 96):
+        self.image_path = image_path
+        self.tile_size = tile_size
+        self.directory = os.path.join(cache_dir, f"{image_key[:16]}-{tile_size}")
+        # Raw level tiles loaded from disk, and tiles scaled for the current zoom; both opaque
+        self.tiles = SpriteCache(max_entries=max_tiles, alpha=False)
+        self.scaled = SpriteCache(max_entries=max_tiles, alpha=False)
+        self.levels: List[Tuple[int, int]] = []  # (width, height) per level, finest first
+
+        if not self._load_manifest():
+            self.build()
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """Full-resolution image size"""
+        return self.levels[0]
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def _load_manifest(self) -> bool:
+        try:
+            with open(os.path.join(self.directory, COMPLETE_MARKER), "r") as f:
+                self.levels = [tuple(int(v) for v in line.split()) for line in f if line.strip()]
+        except (OSError, ValueError):
+            return False
+        return bool(self.levels)
+
+    def build(self):
+        """Cut every level of the pyramid into tiles and write them to disk"""
+        image = pygame.image.load(self.image_path).convert()
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+
+        ts = self.tile_size
+        self.levels = []
+        level = 0
+        while True:
+            w, h = image.get_size()
+            self.levels.append((w, h))
+            for tx in range(0, math.ceil(w / ts)):
+                for ty in range(0, math.ceil(h / ts)):
+                    rect = pygame.Rect(tx * ts, ty * ts, ts, ts).clip(image.get_rect())
+                    tile = image.subsurface(rect)
+                    pygame.image.save(tile, self._tile_path(level, tx, ty))
+                    self.tiles.get(("tile", level, tx, ty), tile.copy)
+            if w <= ts and h <= ts:
+                break
+            image = pygame.transform.smoothscale(image, (max(1, (w + 1) // 2), max(1, (h + 1) // 2)))
+            level += 1
+
+        # Written last, so an interrupted build is redone on the next launch
+        with open(os.path.join(self.directory, COMPLETE_MARKER), "w") as f:
+            f.writelines(f"{w} {h}\n" for w, h in self.levels)
+
+    def _tile_path(self, level: int, tx: int, ty: int) -> str:
+        return os.path.join(self.directory, f"L{level}_{tx}_{ty}.png")
+
+    def _tile(self, level: int, tx: int, ty: int) -> pygame.Surface:
+        return self.tiles.get(("tile", level, tx, ty),
+                              lambda: pygame.image.load(self._tile_path(level, tx, ty)).convert())
+
+    # ------------------------------------------------------------------
+    # Drawing
+    # ------------------------------------------------------------------
+    @staticmethod
+    def quantize_scale(scale: float, down: bool = False) -> float:
+        """Nearest (or, with ``down``, next lower) scale that tiles are cached for"""
+        steps = math.log2(scale) * SCALE_STEPS
+        steps = math.floor(steps + 1e-9) if down else round(steps)
+        return 2.0 ** (steps / SCALE_STEPS)
+
+    def level_for(self, scale: float) -> int:
+        """Coarsest level that still has at least one image pixel per screen pixel"""
+        if scale <= 0:
+            return len(self.levels) - 1
+        level = int(math.floor(math.log2(1.0 / scale))) if scale < 1.0 else 0
+        return max(0, min(len(self.levels) - 1, level))
+
+    def draw(self, surface: pygame.Surface, x: float, y: float, width: float, height: float,
+             clip: Optional[pygame.Rect] = None) -> int:
+        """Draw the image stretched over (x, y, width, height); returns how many tiles were blitted.
+
+        The scale is snapped to the 1/16-octave grid, keeping the point under
+        the clip center in place; callers that want an exact fit pick sizes
+        on the grid (see quantize_scale).
+        """
+        full_w, full_h = self.size
+        if width <= 0 or height <= 0:
+            return 0
+        clip = clip or surface.get_clip()
+        scale_x = self.quantize_scale(width / full_w)
+        scale_y = self.quantize_scale(height / full_h)
+        cx, cy = clip.center
+        x = cx - (cx - x) * (full_w * scale_x) / width
+        y = cy - (cy - y) * (full_h * scale_y) / height
+        level = self.level_for(scale_x)
+        level_w, level_h = self.levels[level]
+        sx = full_w * scale_x / level_w
+        sy = full_h * scale_y / level_h
+        ts = self.tile_size
+        # Tile edges are rounded relative to the image, so tile sizes do not change while panning
+        ox, oy = round(x), round(y)
+
+        # Only the tile columns and rows that overlap the clip area
+        tx0 = max(0, int((clip.left - x) / (ts * sx)))
+        tx1 = min(math.ceil(level_w / ts), int((clip.right - x) / (ts * sx)) + 1)
+        ty0 = max(0, int((clip.top - y) / (ts * sy)))
+        ty1 = min(math.ceil(level_h / ts), int((clip.bottom - y) / (ts * sy)) + 1)
+
+        blits = []
+        for tx in range(tx0, tx1):
+            # Edges are rounded once per boundary so neighbouring tiles meet without seams
+            left = ox + round(tx * ts * sx)
+            right = ox + round(min((tx + 1) * ts, level_w) * sx)
+            for ty in range(ty0, ty1):
+                top = oy + round(ty * ts * sy)
+                bottom = oy + round(min((ty + 1) * ts, level_h) * sy)
+                w, h = right - left, bottom - top
+                if w <= 0 or h <= 0:
+                    continue
+                blits.append((self._scaled_tile(level, tx, ty, w, h), (left, top)))
+        surface.blits(blits, doreturn=False)
+        return len(blits)
+
+    def _scaled_tile(self, level: int, tx: int, ty: int, w: int, h: int) -> pygame.Surface:
+        def render():
+            tile = self._tile(level, tx, ty)
+            if tile.get_size() == (w, h):
+                return tile
+            return pygame.transform.smoothscale(tile, (w, h))
+
+        return self.scaled.get(("scaled", level, tx, ty, w, h), render)
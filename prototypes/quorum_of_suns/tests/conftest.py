@@ -0,0 +1,8 @@
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# Tests import the game the way main.py does, as the ``src`` package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,30 @@
+import random
+
+from src.galaxy_map import GalaxyGenerator
+
+
+def star_fields(galaxy):
+    return [star.fields() for star in galaxy.stars]
+
+
+def test_same_seed_same_galaxy():
+    first = GalaxyGenerator.generate_galaxy(1200, 900, num_stars=120, seed=77)
+    random.seed(5)  # the global generator must not feed into generation
+    random.random()
+    second = GalaxyGenerator.generate_galaxy(1200, 900, num_stars=120, seed=77)
+    assert len(first.stars) == 120
+    assert star_fields(first) == star_fields(second)
+
+
+def test_different_seeds_differ():
+    a = GalaxyGenerator.generate_galaxy(1200, 900, num_stars=60, seed=1)
+    b = GalaxyGenerator.generate_galaxy(1200, 900, num_stars=60, seed=2)
+    assert star_fields(a) != star_fields(b)
+
+
+def test_generation_leaves_global_random_alone():
+    random.seed(3)
+    expected = [random.random() for _ in range(3)]
+    random.seed(3)
+    GalaxyGenerator.generate_galaxy(800, 600, num_stars=40, seed=9)
+    assert [random.random() for _ in range(3)] == expected
@@ -0,0 +1,53 @@
+import numpy as np
+import pygame
+import pytest
+
+from src.galaxy_map import GalaxyGenerator
+
+
+def _surface(rgb):
+    return pygame.surfarray.make_surface(rgb.astype(np.uint8))
+
+
+def greedy_bright_spots(surface, num_stars, min_distance, threshold=50.0):
+    """Reference: every pixel brightest first (ties by y, then x), kept if clear of those taken"""
+    rgb = pygame.surfarray.array3d(surface)
+    brightness = (rgb[..., 0] * np.float32(0.299) + rgb[..., 1] * np.float32(0.587)
+                  + rgb[..., 2] * np.float32(0.114))
+    xs, ys = np.nonzero(brightness >= threshold)
+    order = np.lexsort((xs, ys, -brightness[xs, ys]))
+    taken = []
+    for x, y in zip(xs[order].tolist(), ys[order].tolist()):
+        if all((x - ox) ** 2 + (y - oy) ** 2 >= min_distance ** 2 for ox, oy in taken):
+            taken.append((x, y))
+            if len(taken) >= num_stars:
+                break
+    return taken
+
+
+def test_rejected_tile_maximum_falls_back_to_next_pixel():
+    rgb = np.zeros((200, 40, 3))
+    rgb[5, 5] = 255     # first star
+    rgb[31, 5] = 250    # its tile's maximum, too close to the first star
+    rgb[44, 14] = 200   # same tile, far enough away
+    assert GalaxyGenerator._extract_bright_spots(_surface(rgb), 10, min_distance=30.0) == [(5, 5), (44, 14)]
+
+
+def test_ties_break_by_y_then_x():
+    rgb = np.zeros((40, 40, 3))
+    for x, y in ((15, 1), (10, 2), (2, 10)):
+        rgb[x, y] = 200
+    assert GalaxyGenerator._extract_bright_spots(_surface(rgb), 5, min_distance=40.0) == [(15, 1)]
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_matches_greedy_reference(seed):
+    rng = np.random.default_rng(seed)
+    width, height = rng.integers(20, 90, size=2)
+    # few distinct levels so equal brightness is common
+    levels = rng.integers(0, 6, size=(width, height)) * 51
+    surface = _surface(np.repeat(levels[..., None], 3, axis=2))
+    num_stars = int(rng.integers(1, 40))
+    min_distance = float(rng.integers(4, 30))
+    expected = greedy_bright_spots(surface, num_stars, min_distance)
+    assert GalaxyGenerator._extract_bright_spots(surface, num_stars, min_distance=min_distance) == expected
@@ -0,0 +1,76 @@
+import copy
+import os
+
+import pytest
+
+from src.save_file import SaveFile
+
+
+def states():
+    """A game advancing turn by turn: appended lists, changed and removed dict keys, replaced values"""
+    state = {"save_name": "Test", "game_turn": 1, "playtime_hours": 0.0, "explored_stars": ["Ra"],
+             "diplomatic_status": {"vr": "neutral"}, "player_fleets": [{"id": 1, "at": "Ra"}], "big": 2 ** 80}
+    history = [copy.deepcopy(state)]
+    for turn in range(2, 9):
+        state["game_turn"] = turn
+        state["playtime_hours"] += 0.25
+        state["explored_stars"].append(f"Star {turn}")
+        state["diplomatic_status"][f"race{turn}"] = "war" if turn % 2 else "peace"
+        if turn == 5:
+            del state["diplomatic_status"]["vr"]
+        state["player_fleets"] = [{"id": 1, "at": f"Star {turn}"}]
+        history.append(copy.deepcopy(state))
+    return history
+
+
+def write_all(path, history, **kwargs):
+    save = SaveFile(str(path), **kwargs)
+    results = [save.write(state) for state in history]
+    return save, results
+
+
+def test_snapshot_and_deltas_round_trip(tmp_path):
+    history = states()
+    save, results = write_all(tmp_path / "game.qsav", history)
+    assert results[0] == "snapshot" and "delta" in results
+    assert SaveFile(save.path).load() == history[-1]
+    assert save.write(history[-1]) == "unchanged"
+
+
+def test_truncated_delta_recovers_previous_state(tmp_path):
+    history = states()
+    save, results = write_all(tmp_path / "game.qsav", history)
+    assert results[-1] == "delta"
+    size = os.path.getsize(save.path)
+    with open(save.path, "r+b") as f:
+        f.truncate(size - 3)  # tear the last delta mid-payload
+
+    recovered = SaveFile(save.path)
+    assert recovered.load() == history[-2]
+    assert recovered.torn
+
+    # the next write replaces the damaged tail
+    assert recovered.write(history[-1]) == "delta"
+    reloaded = SaveFile(save.path)
+    assert reloaded.load() == history[-1]
+    assert not reloaded.torn
+
+
+def test_corrupted_delta_is_cut_off(tmp_path):
+    history = states()
+    save, _ = write_all(tmp_path / "game.qsav", history[:4])
+    with open(save.path, "r+b") as f:
+        f.seek(-2, os.SEEK_END)
+        byte = f.read(1)
+        f.seek(-2, os.SEEK_END)
+        f.write(bytes([byte[0] ^ 0xFF]))  # fails the CRC
+    assert SaveFile(save.path).load() == history[2]
+
+
+@pytest.mark.parametrize("snapshot_every", [1, 3])
+def test_periodic_snapshots_keep_the_latest_state(tmp_path, snapshot_every):
+    history = states()
+    save, results = write_all(tmp_path / "game.qsav", history, snapshot_every=snapshot_every)
+    assert results.count("snapshot") > 1
+    assert SaveFile(save.path).load() == history[-1]
+    assert not os.path.exists(save.path + ".tmp")
@@ -0,0 +1,67 @@
+import heapq
+import math
+
+import numpy as np
+import pytest
+
+from src.star_lanes import StarLanes
+from src.star_table import StarTable, StarType
+
+
+def make_stars(rng, count, clustered=False):
+    if clustered:
+        centers = rng.uniform(0, 6000, (6, 2))
+        points = centers[rng.integers(0, 6, count)] + rng.normal(0, 120, (count, 2))
+    else:
+        points = rng.uniform(0, 1500, (count, 2))
+    stars = StarTable()
+    stars.extend([f"S{i}" for i in range(count)], points[:, 0], points[:, 1], [StarType.YELLOW_DWARF] * count,
+                 [(255, 255, 255)] * count, [2.0] * count, [True] * count)
+    return stars
+
+
+def dijkstra(lanes, source):
+    """Reference shortest distances over the lanes, using only the public API"""
+    index = {id(star): i for i, star in enumerate(lanes.stars)}
+    dist = [math.inf] * len(lanes.stars)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, n = heapq.heappop(heap)
+        if d > dist[n]:
+            continue
+        star = lanes.stars[n]
+        for other in lanes.neighbours(star):
+            m = index[id(other)]
+            nd = d + star.distance_to(other)
+            if nd < dist[m]:
+                dist[m] = nd
+                heapq.heappush(heap, (nd, m))
+    return dist
+
+
+@pytest.mark.parametrize("seed, clustered, max_jump", [(1, False, None), (2, True, None), (3, True, 150.0)])
+def test_routes_match_dijkstra(seed, clustered, max_jump):
+    rng = np.random.default_rng(seed)
+    stars = make_stars(rng, 250, clustered)
+    lanes = StarLanes(stars, max_jump=max_jump)
+    if max_jump is not None:
+        assert len(set(lanes.component)) > 1  # some routes are unreachable
+    for source in rng.choice(len(stars), 6, replace=False).tolist():
+        expected = dijkstra(lanes, source)
+        for goal in range(len(stars)):
+            start, end = lanes.stars[source], lanes.stars[goal]
+            path = lanes.route(start, end)
+            if expected[goal] == math.inf:
+                assert lanes.route_distance(start, end) == math.inf
+                assert path == []
+                continue
+            assert lanes.route_distance(start, end) == pytest.approx(expected[goal])
+            assert path[0] is start and path[-1] is end
+            assert all(b in lanes.neighbours(a) for a, b in zip(path, path[1:]))
+            assert sum(a.distance_to(b) for a, b in zip(path, path[1:])) == pytest.approx(expected[goal])
+
+
+def test_clusters_are_joined_into_one_network():
+    lanes = StarLanes(make_stars(np.random.default_rng(4), 300, clustered=True))
+    assert math.isfinite(max(dijkstra(lanes, 0)))
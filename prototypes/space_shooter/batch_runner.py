@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch runner for headless space shooter sessions.
+
+Spreads seeded HeadlessSim runs across a process pool and aggregates survival
+time, score, peak entity counts and per-phase timing into a JSON or CSV report.
+Gameplay constants from space_shooter.py can be swept with --set; every
+combination of values becomes one config, and each config runs the same seeds.
+
+Usage:
+    python3 batch_runner.py --runs 200 --out report.json
+    python3 batch_runner.py --runs 1000 --set ENEMY_MIN_SPAWN=0.25,0.33 --set POWERUP_CHANCE=0.1,0.18 --out sweep.csv
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import space_shooter  # noqa: E402
+from headless import SCRIPTS, HeadlessSim  # noqa: E402
+
+# Gameplay constants that may be overridden, with their defaults captured before any
+# worker touches them. Display and timing constants (WIDTH, FPS, SIM_HZ, ...) are left
+# out: the headless World ignores some and the rest would make runs incomparable.
+TUNABLES = {name: getattr(space_shooter, name) for name in (
+    "PLAYER_ACCEL", "PLAYER_FRICTION", "PLAYER_RADIUS", "PLAYER_MAX_HP", "PLAYER_FIRE_COOLDOWN",
+    "PLAYER_DASH_TIME", "PLAYER_DASH_COOLDOWN", "PLAYER_DASH_MULT",
+    "BULLET_SPEED", "BULLET_RADIUS", "BULLET_SPREAD",
+    "ENEMY_BASE_SPEED", "ENEMY_SPEED_VARIANCE", "ENEMY_RADIUS", "ELITE_RADIUS", "ELITE_HP",
+    "ENEMY_MIN_SPAWN", "ENEMY_MAX_SPAWN",
+    "POWERUP_CHANCE", "POWERUP_RADIUS",
+)}
+
+PEAK_KEYS = ("peak_enemies", "peak_bullets", "peak_powerups", "peak_particles")
+
+
+def parse_sets(items):
+    """Turn ['NAME=a,b', ...] into a list of override dicts (cartesian product)"""
+    axes = []
+    for item in items:
+        name, _, values = item.partition("=")
+        name = name.strip()
+        if name not in TUNABLES:
+            raise SystemExit(f"Unknown tunable '{name}'. Options: {', '.join(sorted(TUNABLES))}")
+        cast = type(TUNABLES[name])
+        try:
+            axes.append([(name, cast(v)) for v in values.split(",") if v.strip()])
+        except ValueError:
+            raise SystemExit(f"Bad value for {name} (expected {cast.__name__}): '{values}'")
+    if not axes:
+        return [{}]
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+
+def config_label(overrides):
+    return ",".join(f"{k}={v}" for k, v in overrides.items()) or "baseline"
+
+
+def run_session(task):
+    """Worker entry: apply overrides, run one seeded session, return its summary"""
+    overrides, seed, frames, dt, script = task
+    # pool workers are reused across configs, so always start from the defaults
+    for name, value in TUNABLES.items():
+        setattr(space_shooter, name, value)
+    for name, value in overrides.items():
+        setattr(space_shooter, name, value)
+
+    sim = HeadlessSim(seed=seed, dt=dt, script=SCRIPTS[script])
+    result = sim.run(frames, stop_on_death=True, profile=True)
+    result["config"] = config_label(overrides)
+    return result
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def aggregate(overrides, runs, phase_names):
+    survival = [r["sim_time"] for r in runs]
+    scores = [r["score"] for r in runs]
+    row = {
+        "config": config_label(overrides),
+        **overrides,
+        "runs": len(runs),
+        "deaths": sum(1 for r in runs if not r["alive"]),
+        "survival_mean": statistics.fmean(survival),
+        "survival_median": statistics.median(survival),
+        "survival_p10": percentile(survival, 0.10),
+        "survival_p90": percentile(survival, 0.90),
+        "score_mean": statistics.fmean(scores),
+        "score_median": statistics.median(scores),
+        "score_p90": percentile(scores, 0.90),
+        "frames_per_sec_mean": statistics.fmean(r["frames_per_sec"] for r in runs),
+    }
+    for key in PEAK_KEYS:
+        row[f"{key}_max"] = max(r[key] for r in runs)
+        row[f"{key}_mean"] = statistics.fmean(r[key] for r in runs)
+    for name in phase_names:
+        row[f"{name}_ms_mean"] = statistics.fmean(r[f"{name}_ms"] for r in runs)
+    return row
+
+
+def write_report(path, rows, per_run, meta):
+    if path.endswith(".csv"):
+        fields = []
+        for row in rows:
+            fields.extend(k for k in row if k not in fields)
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, "w") as f:
+            json.dump({"meta": meta, "configs": rows, "runs": per_run}, f, indent=2)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run many seeded headless sessions in parallel and report.")
+    ap.add_argument("--runs", type=int, default=100, help="sessions per config")
+    ap.add_argument("--frames", type=int, default=120 * 60 * 5, help="frame cap per session")
+    ap.add_argument("--seed", type=space_shooter.seed_arg, default=0, help="first seed; runs use seed..seed+runs-1")
+    ap.add_argument("--dt", type=float, default=1.0 / space_shooter.SIM_HZ, help="fixed timestep in seconds")
+    ap.add_argument("--script", choices=sorted(SCRIPTS), default="strafe", help="scripted input")
+    ap.add_argument("--set", dest="sets", action="append", default=[], metavar="NAME=v1,v2",
+                    help="sweep a tuning constant (repeatable)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count(), help="process pool size")
+    ap.add_argument("--out", default="batch_report.json", help="report path (.json or .csv)")
+    args = ap.parse_args()
+
+    configs = parse_sets(args.sets)
+    tasks = [(overrides, args.seed + i, args.frames, args.dt, args.script)
+             for overrides in configs for i in range(args.runs)]
+    print(f"Running {len(tasks)} sessions ({len(configs)} configs x {args.runs}) on {args.workers} workers...")
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        chunk = max(1, len(tasks) // (args.workers * 8))
+        results = list(pool.map(run_session, tasks, chunksize=chunk))
+    wall = time.perf_counter() - t0
+
+    phase_names = [k[:-3] for k in results[0] if k.endswith("_ms")] if results else []
+    rows = []
+    for overrides in configs:
+        label = config_label(overrides)
+        runs = [r for r in results if r["config"] == label]
+        rows.append(aggregate(overrides, runs, phase_names))
+
+    meta = {"runs_per_config": args.runs, "frames": args.frames, "dt": args.dt,
+            "script": args.script, "first_seed": args.seed, "workers": args.workers,
+            "wall_time": wall}
+    write_report(args.out, rows, results, meta)
+
+    for row in rows:
+        print(f"{row['config']:<40} survival {row['survival_mean']:7.1f}s  "
+              f"score {row['score_mean']:9.0f}  peak enemies {row['peak_enemies_max']:4d}")
+    print(f"Done in {wall:.1f}s -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Headless simulation driver for the space shooter.
+
+Steps space_shooter.World with a fixed timestep, a seeded RNG and scripted
+Controls, without opening a window or touching fonts. Same seed + dt + script
+gives the same session every time, so it doubles as a balance regression
+harness and a way to time the hot loops without rendering.
+
+Usage:
+    python3 headless.py --frames 100000 --seed 7
+    python3 headless.py --frames 1000000 --script idle --keep-going
+    python3 headless.py --frames 2000 --swarm 5000 --keep-going --profile
+    python3 headless.py --replay session.ssr --profile
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from replay import Replayer  # noqa: E402
+from space_shooter import HEIGHT, SIM_HZ, WIDTH, Controls, NO_INPUT, World, seed_arg  # noqa: E402
+
+
+# ---------------------------
+# Input scripts: (frame, world) -> Controls
+# ---------------------------
+def idle(frame, world):
+    return NO_INPUT
+
+
+def autofire(frame, world):
+    return Controls(fire=True)
+
+
+def strafe(frame, world):
+    # hold fire and slide under the nearest enemy; dash when one gets close
+    player = world.player
+    enemies = world.enemies
+    i, best = enemies.nearest(player.pos.x, player.pos.y)
+    left = right = False
+    if i >= 0:
+        dx = enemies.pos[i, 0] - player.pos.x
+        left, right = dx < -8, dx > 8
+    return Controls(left=left, right=right, fire=True, dash=best < 90 * 90)
+
+
+SCRIPTS = {"idle": idle, "autofire": autofire, "strafe": strafe}
+
+
+class HeadlessSim:
+    """Fixed-step, display-free runner around a World"""
+
+    def __init__(self, seed=0, dt=1.0 / SIM_HZ, bounds=(WIDTH, HEIGHT), script=strafe, swarm=0, replay=None):
+        self.dt = dt
+        self.script = script
+        self.replay = replay  # a replay.Replayer overrides the script, seed and dt
+        if replay is not None:
+            self.dt = replay.log.dt
+        self.world = World(bounds, seed=seed)
+        if swarm:
+            self.world.spawn_swarm(swarm)
+        self.frame = 0
+
+    def step(self, controls=None, probe=None):
+        if self.replay is not None:
+            controls = self.replay.next_step(self.world)
+            if controls is None:
+                return
+        elif controls is None:
+            controls = self.script(self.frame, self.world)
+        self.world.update(self.dt, controls, probe)
+        self.frame += 1
+
+    def run(self, max_frames, stop_on_death=True, profile=False):
+        """Step until ``max_frames`` (or death) and return a summary dict.
+
+        With ``profile`` the summary also carries per-phase milliseconds per
+        frame and peak entity counts; without it the loop stays bare.
+        """
+        world = self.world
+        if self.replay is not None:
+            max_frames = min(max_frames, self.replay.log.steps)
+        t0 = time.perf_counter()
+        if not profile:
+            step = self.step
+            while self.frame < max_frames:
+                step()
+                if stop_on_death and not world.player.alive():
+                    break
+        else:
+            timings = {}
+
+            def probe(name, start, end):
+                timings[name] = timings.get(name, 0.0) + (end - start)
+
+            peaks = {"enemies": 0, "bullets": 0, "powerups": 0, "particles": 0}
+            while self.frame < max_frames:
+                self.step(probe=probe)
+                peaks["enemies"] = max(peaks["enemies"], len(world.enemies))
+                peaks["bullets"] = max(peaks["bullets"], len(world.bullets))
+                peaks["powerups"] = max(peaks["powerups"], len(world.powerups))
+                peaks["particles"] = max(peaks["particles"], len(world.particles))
+                if stop_on_death and not world.player.alive():
+                    break
+        wall = time.perf_counter() - t0
+
+        result = {
+            "seed": world.seed,
+            "frames": self.frame,
+            "sim_time": world.elapsed,
+            "score": world.player.score,
+            "hp": world.player.hp,
+            "alive": world.player.alive(),
+            "wall_time": wall,
+            "frames_per_sec": self.frame / wall if wall > 0 else 0.0,
+        }
+        if profile:
+            frames = max(1, self.frame)
+            for name, _ in world.phases:
+                result[f"{name}_ms"] = timings.get(name, 0.0) * 1000.0 / frames
+            for name, peak in peaks.items():
+                result[f"peak_{name}"] = peak
+        return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run the space shooter simulation without a window.")
+    ap.add_argument("--frames", type=int, default=None,
+                    help="maximum frames to simulate (default 100000, or the whole replay)")
+    ap.add_argument("--seed", type=seed_arg, default=0, help="RNG seed for the session")
+    ap.add_argument("--dt", type=float, default=1.0 / SIM_HZ, help="fixed timestep in seconds")
+    ap.add_argument("--script", choices=sorted(SCRIPTS), default="strafe", help="scripted input")
+    ap.add_argument("--swarm", type=int, default=0, help="extra enemies spawned on the first frame")
+    ap.add_argument("--keep-going", action="store_true", help="keep simulating after the player dies")
+    ap.add_argument("--profile", action="store_true", help="report per-phase timing and peak entity counts")
+    ap.add_argument("--replay", metavar="LOG", help="drive the session from a recording instead of a script")
+    args = ap.parse_args()
+
+    replay = Replayer.load(args.replay, Controls.from_mask) if args.replay else None
+    sim = HeadlessSim(seed=args.seed, dt=args.dt, script=SCRIPTS[args.script], swarm=args.swarm, replay=replay)
+    # a recording already covers deaths and restarts, so play all of it
+    stop_on_death = not args.keep_going and replay is None
+    frames = args.frames if args.frames is not None else replay.log.steps if replay else 100000
+    result = sim.run(frames, stop_on_death=stop_on_death, profile=args.profile)
+    for k, v in result.items():
+        print(f"{k:>15}: {v:.3f}" if isinstance(v, float) else f"{k:>15}: {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Input recording and deterministic replay for the space shooter.
+
+A recording is a compact binary log of every simulation step the game ran:
+the Controls for that step packed into one byte, whether the game was paused,
+and the seed and playfield size each time a session (re)started. Because all
+gameplay randomness comes from World's seeded generators, feeding the log back
+reproduces the session exactly, with rendering or headless at full speed, so a
+session that stuttered can be captured once and profiled offline.
+
+Record while playing, then replay in a window or headless:
+    python3 space_shooter.py --record session.ssr
+    python3 space_shooter.py --replay session.ssr
+    python3 headless.py --replay session.ssr --profile
+
+This module only knows the log format; it imports nothing from the game, so
+space_shooter.py can use it directly.
+
+Log layout (little-endian):
+    header  b"SSRP", u8 version, f64 dt
+    run     u8 mask (bits 0-6 = Controls slots, 0x80 = paused), varint steps
+    bounds  0xFD, u16 width, u16 height
+    reset   0xFE, varint seed, u16 width, u16 height
+
+Version 1 logs stored the reset seed as an i64; they still load.
+"""
+
+import struct
+
+MAGIC = b"SSRP"
+VERSION = 2
+HEADER = struct.Struct("<4sBd")
+BOUNDS = struct.Struct("<HH")
+RESET = BOUNDS  # follows the varint seed
+RESET_V1 = struct.Struct("<qHH")
+
+PAUSED = 0x80
+OP_BOUNDS = 0xFD
+OP_RESET = 0xFE
+
+
+class InputRecorder:
+    """Run-length encodes per-step input as the game plays"""
+
+    def __init__(self, dt):
+        self.dt = dt
+        self.data = bytearray(HEADER.pack(MAGIC, VERSION, dt))
+        self.steps = 0
+        self._mask = None
+        self._run = 0
+        self._bounds = None
+        self._reset_at = None  # offset of a reset with no steps after it yet
+
+    def reset(self, seed, bounds):
+        """A session (re)started with ``seed`` on a ``bounds`` playfield"""
+        self._flush()
+        if self._reset_at is not None:
+            # nothing was played since the last reset, so it would never matter
+            del self.data[self._reset_at:]
+        self._reset_at = len(self.data)
+        if seed < 0:
+            raise ValueError(f"seed must be non-negative, got {seed}")
+        self.data.append(OP_RESET)
+        _write_varint(self.data, seed)
+        self.data += RESET.pack(*bounds)
+        self._bounds = tuple(bounds)
+
+    def step(self, controls, bounds):
+        """One simulated step with ``controls``"""
+        bounds = tuple(bounds)
+        if bounds != self._bounds:
+            self._flush()
+            self.data.append(OP_BOUNDS)
+            self.data += BOUNDS.pack(*bounds)
+            self._bounds = bounds
+        self._push(controls.to_mask())
+
+    def paused(self):
+        """One step spent paused; input is ignored while paused"""
+        self._push(PAUSED)
+
+    def _push(self, mask):
+        self._reset_at = None
+        self.steps += 1
+        if mask == self._mask:
+            self._run += 1
+            return
+        self._flush()
+        self._mask, self._run = mask, 1
+
+    def _flush(self):
+        if self._run:
+            self.data.append(self._mask)
+            _write_varint(self.data, self._run)
+        self._mask, self._run = None, 0
+
+    def to_bytes(self):
+        self._flush()
+        return bytes(self.data)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+        return path
+
+
+class ReplayLog:
+    """A decoded recording; ``events()`` yields it back one step at a time"""
+
+    def __init__(self, dt, ops):
+        self.dt = dt
+        self.ops = ops  # ("run", mask, count) / ("bounds", (w, h)) / ("reset", seed, (w, h))
+        self.steps = sum(op[2] for op in ops if op[0] == "run")
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, dt = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("not a space shooter replay")
+        if version not in (1, VERSION):
+            raise ValueError(f"unsupported replay version {version}")
+        ops = []
+        i = HEADER.size
+        n = len(data)
+        while i < n:
+            op = data[i]
+            i += 1
+            if op == OP_RESET:
+                if version == 1:
+                    seed, w, h = RESET_V1.unpack_from(data, i)
+                    i += RESET_V1.size
+                else:
+                    seed, i = _read_varint(data, i)
+                    w, h = RESET.unpack_from(data, i)
+                    i += RESET.size
+                ops.append(("reset", seed, (w, h)))
+            elif op == OP_BOUNDS:
+                w, h = BOUNDS.unpack_from(data, i)
+                i += BOUNDS.size
+                ops.append(("bounds", (w, h)))
+            else:
+                count, i = _read_varint(data, i)
+                ops.append(("run", op, count))
+        return cls(dt, ops)
+
+    def events(self):
+        """Yield an int mask per step, with bounds/reset ops as tuples in between"""
+        for op in self.ops:
+            if op[0] == "run":
+                mask = op[1]
+                for _ in range(op[2]):
+                    yield mask
+            else:
+                yield op
+
+
+class Replayer:
+    """Applies a log to a World step by step"""
+
+    def __init__(self, log, make_controls):
+        self.log = log
+        self.make_controls = make_controls  # mask -> Controls, e.g. Controls.from_mask
+        self._events = log.events()
+        self._controls = {}
+        self.done = False
+
+    @classmethod
+    def load(cls, path, make_controls):
+        return cls(ReplayLog.load(path), make_controls)
+
+    def next_step(self, world):
+        """Apply any session changes, then return Controls for the next step (None at the end)"""
+        for ev in self._events:
+            if type(ev) is int:
+                world.paused = ev == PAUSED
+                controls = self._controls.get(ev)
+                if controls is None:
+                    controls = self._controls[ev] = self.make_controls(ev)
+                return controls
+            if ev[0] == "reset":
+                world.bounds = ev[2]
+                world.reset(ev[1])
+            else:
+                world.bounds = ev[1]
+        self.done = True
+        return None
+
+
+def _write_varint(buf, value):
+    while value >= 0x80:
+        buf.append(value & 0x7F | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _read_varint(data, i):
+    value = shift = 0
+    while True:
+        b = data[i]
+        i += 1
+        value |= (b & 0x7F) << shift
+        if b < 0x80:
+            return value, i
+        shift += 7
+
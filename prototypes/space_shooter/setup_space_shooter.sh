@@ -1,5 +1,5 @@
 #!/usr/bin/env bash
-# Setup script for Space Shooter — creates a local venv and installs pygame
+# Setup script for Space Shooter — creates a local venv and installs pygame + numpy
 # Works on WSL even when working under /mnt/c by handling Windows vs Linux venv layouts.
 
 set -euo pipefail
@@ -58,19 +58,20 @@ fi
 # shellcheck disable=SC1090
 source "$ACTIVATE"
 
-# Inside venv, upgrade tooling and install pygame
+# Inside venv, upgrade tooling and install pygame + numpy
 python -m pip install --upgrade pip setuptools wheel
 if ! python - <<'PYCHK'
 try:
     import pygame  # noqa: F401
+    import numpy  # noqa: F401
 except Exception as e:
     raise SystemExit(1)
 PYCHK
 then
-  echo "Installing pygame in the virtualenv ..."
-  python -m pip install "pygame>=2.5"
+  echo "Installing pygame and numpy in the virtualenv ..."
+  python -m pip install "pygame>=2.5" "numpy>=1.21"
 else
-  echo "pygame already present in the virtualenv."
+  echo "pygame and numpy already present in the virtualenv."
 fi
 
 # Create a helper launcher (no auto-run)
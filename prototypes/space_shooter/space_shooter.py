@@ -4,18 +4,34 @@
 2D Space Shooter — single-file Pygame
 - Preserves original gameplay (player, bullets, enemies, powerups, particles)
 - Adds an animated main menu (press Enter/Space to start, Esc to quit)
+- World holds the simulation with no display dependencies (see headless.py)
 """
 
+import argparse
 import math
+import os
 import random
 import sys
+import time
+from collections import OrderedDict
+import numpy as np
 import pygame as pg
 
+# shared/ helpers live at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from shared.dirty_rects import DirtyRects  # noqa: E402
+from shared.game_loop import FixedStepLoop  # noqa: E402
+from shared.profiler import FrameProfiler  # noqa: E402
+from shared.sprite_cache import SpriteCache  # noqa: E402
+from shared.starfield import Starfield, StarLayer  # noqa: E402
+
 # ---------------------------
 # Config / Constants
 # ---------------------------
 WIDTH, HEIGHT = 900, 700
-FPS = 120
+FPS = 120                # render rate
+SIM_HZ = 120             # fixed simulation rate; may differ from FPS
+MAX_STEPS_PER_FRAME = 6  # catch-up cap so a hitch can't snowball
 
 BG_COLOR = (12, 14, 28)
 STAR_COLOR = (160, 170, 200)
@@ -48,11 +64,28 @@ POWERUP_CHANCE = 0.18
 POWERUP_RADIUS = 10
 POWERUP_COLOR = (120, 255, 170)
 
-PARTICLE_MAX = 600
-MAX_STARS = 140
+GRID_CELLS_MAX = 4096  # broadphase buckets kept between frames before a full reset
+GRID_CELL = 64  # broadphase cell size in pixels (widened when a query reaches further)
+DENSE_PAIRS_MAX = 4096  # below this many query x enemy pairs a direct test beats building the grid
+
+PARTICLE_MAX = 20000
+PARTICLE_DAMPING = 0.96
+PARTICLE_COLORS = ((255, 200, 120), (255, 150, 90), (200, 240, 255))
+# 140 stars in three parallax layers: far and dim to near, bright and fast
+STAR_LAYERS = (
+    StarLayer(80, speed=(20, 45), sizes=(1,), brightness=(0.45, 0.65)),
+    StarLayer(45, speed=(45, 85), sizes=(2,), brightness=(0.7, 0.85)),
+    StarLayer(15, speed=(85, 120), sizes=(3,), brightness=(0.95, 1.0)),
+)
 
 UI_COLOR = (220, 230, 255)
 
+# (name, size, bold) font specs, resolved once through TextCache
+UI_FONT = ("consolas", 22, False)
+BIG_FONT = ("consolas", 46, True)
+GLYPH_FONT = ("consolas", 16, True)
+TEXT_CACHE_MAX = 256
+
 
 # ---------------------------
 # Helpers
@@ -64,101 +97,555 @@ def clamp(x, lo, hi):
     return max(lo, min(hi, x))
 
 
+def lerp_point(a, b, t):
+    # integer screen point between two positions, for render interpolation
+    return (int(a.x + (b.x - a.x) * t), int(a.y + (b.y - a.y) * t))
+
+
 def circle_collide(p1, r1, p2, r2):
     return (p1 - p2).length_squared() <= (r1 + r2) * (r1 + r2)
 
 
+def seed_arg(text):
+    """argparse type for --seed: World's NumPy generator only takes non-negative ints"""
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid seed {text!r}")
+    if seed < 0:
+        raise argparse.ArgumentTypeError(f"seed must be non-negative, got {seed}")
+    return seed
+
+
+class SpatialHash:
+    """Uniform-grid broadphase, cleared and refilled every frame.
+
+    Entities are bucketed by the cell containing their center; queries widen
+    the search box by the largest radius inserted so nothing is missed.
+    Candidates come back as list indices in ascending order so callers can
+    resolve hits in the same order a brute-force scan would.
+    """
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.size = 0
+        self.max_radius = 0
+        self._found = []
+
+    def clear(self):
+        # empty the buckets but keep them, so steady-state frames allocate nothing;
+        # drop them all if stragglers far off-screen have spread them too wide
+        if len(self.cells) > GRID_CELLS_MAX:
+            self.cells.clear()
+        for bucket in self.cells.values():
+            bucket.clear()
+        self.size = 0
+        self.max_radius = 0
+
+    def build(self, items):
+        self.clear()
+        cs = self.cell_size
+        cells = self.cells
+        for i, it in enumerate(items):
+            if it.dead:
+                continue
+            key = (int(it.pos.x // cs), int(it.pos.y // cs))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [i]
+            else:
+                bucket.append(i)
+            self.size += 1
+            if it.radius > self.max_radius:
+                self.max_radius = it.radius
+
+    def query(self, pos, radius):
+        """Candidate indices near ``pos``; the list is reused by the next query"""
+        found = self._found
+        found.clear()
+        if not self.size:
+            return found
+        cs = self.cell_size
+        reach = radius + self.max_radius
+        x0, x1 = int((pos.x - reach) // cs), int((pos.x + reach) // cs)
+        y0, y1 = int((pos.y - reach) // cs), int((pos.y + reach) // cs)
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.extend(bucket)
+        found.sort()
+        return found
+
+
+class TextCache:
+    """Font objects and rendered text surfaces, looked up instead of rebuilt.
+
+    ``render`` caches by (font, text, color) with LRU eviction and suits fixed
+    strings. ``label`` keeps one surface per named slot and only re-renders
+    when that slot's text or color changes, which suits live values like the
+    score so stale strings never pile up in the shared cache.
+    """
+
+    def __init__(self, max_entries=TEXT_CACHE_MAX):
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.labels = {}
+
+    def font(self, spec):
+        f = self.fonts.get(spec)
+        if f is None:
+            name, size, bold = spec
+            f = self.fonts[spec] = pg.font.SysFont(name, size, bold=bold)
+        return f
+
+    def render(self, spec, text, color):
+        key = (spec, text, color)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.surfaces.move_to_end(key)
+            return surf
+        surf = self.surfaces[key] = self.font(spec).render(text, True, color)
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surf
+
+    def label(self, slot, spec, text, color):
+        cached = self.labels.get(slot)
+        if cached is not None and cached[0] == (spec, text, color):
+            return cached[1]
+        surf = self.font(spec).render(text, True, color)
+        self.labels[slot] = ((spec, text, color), surf)
+        return surf
+
+
+class Pool:
+    """Free list of reusable entities.
+
+    ``acquire`` re-initialises a released object in place through its
+    ``spawn`` method, and only calls the constructor when the free list is empty.
+    """
+
+    __slots__ = ("factory", "free", "created")
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.created = 0
+
+    def acquire(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            obj.spawn(*args)
+            return obj
+        self.created += 1
+        return self.factory(*args)
+
+    def release(self, obj):
+        self.free.append(obj)
+
+
+def compact(items, pool):
+    """Drop dead entities from ``items`` in place and hand them back to ``pool``"""
+    n = 0
+    for it in items:
+        if it.dead:
+            pool.release(it)
+        else:
+            items[n] = it
+            n += 1
+    del items[n:]
+
+
+class Controls:
+    """One frame of player input, decoupled from pygame's keyboard state.
+
+    ``fire`` is held auto-fire; ``tap`` is a single KEYDOWN shot, which has a
+    tighter spread. Scripted and replayed sessions build these directly.
+    """
+
+    __slots__ = ("left", "right", "up", "down", "fire", "dash", "tap")
+
+    def __init__(self, left=False, right=False, up=False, down=False, fire=False, dash=False, tap=False):
+        self.left = left
+        self.right = right
+        self.up = up
+        self.down = down
+        self.fire = fire
+        self.dash = dash
+        self.tap = tap
+
+    @classmethod
+    def from_keys(cls, keys, tap=False):
+        return cls().read_keys(keys, tap)
+
+    def read_keys(self, keys, tap=False):
+        # refill in place so the live game reuses one Controls per session
+        self.left = bool(keys[pg.K_LEFT] or keys[pg.K_a])
+        self.right = bool(keys[pg.K_RIGHT] or keys[pg.K_d])
+        self.up = bool(keys[pg.K_UP] or keys[pg.K_w])
+        self.down = bool(keys[pg.K_DOWN] or keys[pg.K_s])
+        self.fire = bool(keys[pg.K_SPACE])
+        self.dash = bool(keys[pg.K_LSHIFT] or keys[pg.K_RSHIFT])
+        self.tap = tap
+        return self
+
+    def to_mask(self):
+        """Pack into one byte, bit i = __slots__[i] (used by replay logs)"""
+        mask = 0
+        for i, name in enumerate(self.__slots__):
+            if getattr(self, name):
+                mask |= 1 << i
+        return mask
+
+    @classmethod
+    def from_mask(cls, mask):
+        return cls(*(bool(mask >> i & 1) for i in range(len(cls.__slots__))))
+
+
+NO_INPUT = Controls()
+
+
 # ---------------------------
 # Entities
 # ---------------------------
 class Bullet:
-    def __init__(self, pos, vel):
-        self.pos = vec2(pos)
-        self.vel = vec2(vel)
+    __slots__ = ("pos", "prev", "vel", "radius", "dead")
+
+    def __init__(self, x, y, vx, vy):
+        self.pos = vec2()
+        self.prev = vec2()
+        self.vel = vec2()
+        self.spawn(x, y, vx, vy)
+
+    def spawn(self, x, y, vx, vy):
+        self.pos.update(x, y)
+        self.prev.update(x, y)
+        self.vel.update(vx, vy)
         self.radius = BULLET_RADIUS
+        self.dead = False
 
     def update(self, dt):
-        self.pos += self.vel * dt
-
-    def draw(self, s):
-        pg.draw.circle(s, (240, 250, 255), (int(self.pos.x), int(self.pos.y)), self.radius)
-
-
-class Particle:
-    def __init__(self, pos, vel, life, color):
-        self.pos = vec2(pos)
-        self.vel = vec2(vel)
-        self.life = life
-        self.color = color
-        self.radius = random.randint(1, 2)
-
-    def update(self, dt):
-        self.life -= dt
-        self.pos += self.vel * dt
-        self.vel *= 0.96
-
-    def draw(self, s):
-        if self.life <= 0:
+        pos, vel = self.pos, self.vel
+        self.prev.update(pos)
+        pos.x += vel.x * dt
+        pos.y += vel.y * dt
+
+    def draw(self, s, alpha=1.0):
+        return pg.draw.circle(s, (240, 250, 255), lerp_point(self.prev, self.pos, alpha), self.radius)
+
+
+class ParticleSystem:
+    """Structure-of-arrays particles in a fixed-capacity ring buffer.
+
+    Spawning writes over the oldest slots once the buffer is full, which keeps
+    the newest ``capacity`` particles just like the old list slicing did.
+    A slot is live while its ``life`` is above zero.
+    """
+
+    def __init__(self, capacity=PARTICLE_MAX, rng=None, sprites=None):
+        self.capacity = capacity
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.sprites = sprites if sprites is not None else SpriteCache()
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.radius = np.zeros(capacity, dtype=np.uint8)
+        self.head = 0
+        self.used = 0  # high-water mark; slots past it have never been written
+        self._palette = np.array(PARTICLE_COLORS, dtype=np.uint8)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.life[:self.used] > 0))
+
+    def clear(self):
+        self.life[:] = 0
+        self.head = 0
+        self.used = 0
+
+    def emit(self, pos, amount=10, power=1.0):
+        """Spawn a whole explosion burst at ``pos`` in one batched write."""
+        if amount <= 0:
             return
-        a = clamp(int(255 * (self.life / 1.2)), 40, 255)
-        col = (*self.color, a)
-        surf = pg.Surface((self.radius * 2 + 2, self.radius * 2 + 2), pg.SRCALPHA)
-        pg.draw.circle(surf, col, (self.radius + 1, self.radius + 1), self.radius)
-        s.blit(surf, (self.pos.x - self.radius - 1, self.pos.y - self.radius - 1))
-
+        amount = min(amount, self.capacity)
+        rng = self.rng
+        idx = (self.head + np.arange(amount)) % self.capacity
+        self.used = min(self.capacity, max(self.used, self.head + amount))
+        self.head = (self.head + amount) % self.capacity
+
+        ang = rng.uniform(0.0, math.tau, amount)
+        mag = rng.uniform(80.0, 260.0, amount) * power
+        self.pos[idx] = (pos[0], pos[1])
+        self.vel[idx, 0] = np.cos(ang) * mag
+        self.vel[idx, 1] = np.sin(ang) * mag
+        self.life[idx] = rng.uniform(0.3, 1.2, amount)
+        self.color[idx] = self._palette[rng.integers(0, len(self._palette), amount)]
+        self.radius[idx] = rng.integers(1, 3, amount)
+
+    def update(self, dt, bounds):
+        n = self.used
+        if n == 0:
+            return
+        # dead slots integrate too; it is cheaper than masking them out
+        life, pos, vel = self.life[:n], self.pos[:n], self.vel[:n]
+        life -= dt
+        pos += vel * dt
+        vel *= PARTICLE_DAMPING
 
-class Enemy:
-    def __init__(self, pos: vec2, speed: float, elite=False):
-        self.pos = vec2(pos)
-        self.speed = speed
-        self.radius = ELITE_RADIUS if elite else ENEMY_RADIUS
-        self.elite = elite
-        self.hp = ELITE_HP if elite else 1
-        self.wobble_t = random.random() * 10
-
-    def update(self, dt, player_pos: vec2):
-        # simple seek with sine wobble
-        to_player = (player_pos - self.pos)
-        dist = to_player.length() + 1e-5
-        dirv = to_player / dist
-        self.wobble_t += dt * (1.3 if self.elite else 1.0)
-        wobble = vec2(math.cos(self.wobble_t), math.sin(self.wobble_t)) * (60 if self.elite else 40)
-        self.pos += (dirv * self.speed + wobble) * dt
+        # cull expired and off-screen particles
+        w, h = bounds
+        x, y = pos[:, 0], pos[:, 1]
+        off = (x < -40) | (x > w + 40) | (y < -40) | (y > h + 40)
+        life[off] = 0
 
     def draw(self, s):
-        color = ELITE_COLOR if self.elite else ENEMY_COLOR
-        pg.draw.circle(s, color, (int(self.pos.x), int(self.pos.y)), self.radius)
-        if self.elite:
-            # small inner core
-            pg.draw.circle(s, (255, 220, 200), (int(self.pos.x), int(self.pos.y)), max(2, self.radius // 3))
+        """Blit live particles; returns the rects touched"""
+        live = np.flatnonzero(self.life[:self.used] > 0)
+        if live.size == 0:
+            return []
+        alpha = np.clip((255 * (self.life[live] / 1.2)).astype(np.int32), 40, 255)
+        circle = self.sprites.circle
+        return s.blits([(circle(r, tuple(col), a), (x - r - 1, y - r - 1))
+                        for (x, y), r, col, a in zip(self.pos[live].tolist(), self.radius[live].tolist(),
+                                                     self.color[live].tolist(), alpha.tolist())])
+
+
+class EnemyHorde:
+    """Structure-of-arrays enemy storage stepped as one batch.
+
+    Slots ``[0, n)`` hold live enemies in spawn order, so index order matches
+    the order the old per-object list iterated in. Enemies are only flagged
+    ``dead`` during a frame; ``compact`` drops them once collisions are done.
+    Capacity doubles on demand, which keeps swarms of thousands cheap.
+    """
+
+    def __init__(self, capacity=256, sprites=None):
+        self.sprites = sprites if sprites is not None else SpriteCache()
+        self.n = 0
+        self._grid = None  # (cell size, origin, cols, sorted cell ids, row order) until positions change
+        self._alloc(capacity)
+
+    FIELDS = ("pos", "prev", "speed", "wobble_t", "wobble_rate", "wobble_amp", "radius", "hp", "elite", "dead")
+
+    def _alloc(self, capacity):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2))
+        self.prev = np.zeros((capacity, 2))
+        self.speed = np.zeros(capacity)
+        self.wobble_t = np.zeros(capacity)
+        self.wobble_rate = np.zeros(capacity)
+        self.wobble_amp = np.zeros(capacity)
+        self.radius = np.zeros(capacity, dtype=np.int32)
+        self.hp = np.zeros(capacity, dtype=np.int32)
+        self.elite = np.zeros(capacity, dtype=bool)
+        self.dead = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return self.n
+
+    def clear(self):
+        self.n = 0
+        self._grid = None
+
+    def spawn(self, x, y, speed, elite, wobble_t):
+        if self.n == self.capacity:
+            self._grow()
+        i = self.n
+        self.n += 1
+        self._grid = None
+        self.pos[i] = self.prev[i] = (x, y)
+        self.speed[i] = speed
+        self.wobble_t[i] = wobble_t
+        self.wobble_rate[i] = 1.3 if elite else 1.0
+        self.wobble_amp[i] = 60 if elite else 40
+        self.radius[i] = ELITE_RADIUS if elite else ENEMY_RADIUS
+        self.hp[i] = ELITE_HP if elite else 1
+        self.elite[i] = elite
+        self.dead[i] = False
+
+    def _grow(self):
+        old = [getattr(self, name) for name in self.FIELDS]
+        n = self.n
+        self._alloc(self.capacity * 2)
+        for name, arr in zip(self.FIELDS, old):
+            getattr(self, name)[:n] = arr[:n]
+
+    def update(self, dt, player_pos, bounds):
+        """Seek the player with a sine wobble, then flag enemies that left the field"""
+        n = self.n
+        if n == 0:
+            return
+        self._grid = None
+        pos, prev = self.pos[:n], self.prev[:n]
+        prev[:] = pos
+        dx = player_pos.x - pos[:, 0]
+        dy = player_pos.y - pos[:, 1]
+        dist = np.sqrt(dx * dx + dy * dy) + 1e-5
+        wob = self.wobble_t[:n]
+        wob += dt * self.wobble_rate[:n]
+        speed, amp = self.speed[:n], self.wobble_amp[:n]
+        pos[:, 0] += (dx / dist * speed + np.cos(wob) * amp) * dt
+        pos[:, 1] += (dy / dist * speed + np.sin(wob) * amp) * dt
+
+        y = pos[:, 1]
+        self.dead[:n] |= (y < -60) | (y > bounds[1] + 120)
+
+    def hits(self, x, y, radius):
+        """Indices of live enemies overlapping the circle at (x, y), in spawn order"""
+        _, rows = self.pairs(np.array([x], dtype=float), np.array([y], dtype=float), np.array([radius]))
+        return rows
+
+    def pairs(self, xs, ys, radii):
+        """(query index, enemy index) for every live enemy overlapping a query circle.
+
+        Uniform-grid broadphase: enemy rows are sorted by cell id, so each
+        query row of three neighbouring cells is one contiguous slice found
+        with searchsorted, and only those candidates get the exact test. The
+        grid is kept until enemies move, so several queries per step share it.
+        Pairs come back ordered by enemy, then query, i.e. spawn order.
+        """
+        n = self.n
+        empty = np.zeros(0, dtype=np.intp)
+        if n == 0 or len(xs) == 0:
+            return empty, empty
+        pos = self.pos[:n]
+        radius = self.radius[:n]
+        if len(xs) * n <= DENSE_PAIRS_MAX:
+            # a handful of pairs: test them all directly
+            dx = pos[:, 0][None, :] - xs[:, None]
+            dy = pos[:, 1][None, :] - ys[:, None]
+            reach = radius[None, :] + radii[:, None]
+            rows, query = np.nonzero(((dx * dx + dy * dy <= reach * reach) & ~self.dead[:n][None, :]).T)
+            return query, rows
+
+        # cells at least as wide as the longest reach, so the 3x3 neighbourhood covers it
+        cs = max(GRID_CELL, float(np.max(radii)) + int(radius.max()))
+        if self._grid is None or self._grid[0] != cs:
+            self._grid = self._build_grid(pos, cs)
+        _, origin, cols, sorted_ids, order = self._grid
+
+        qx, qy = np.floor_divide(xs, cs).astype(np.int64) - origin[0], np.floor_divide(ys, cs).astype(np.int64) - origin[1]
+        row_ids = (qy[:, None] + np.arange(-1, 2)[None, :]) * cols + qx[:, None]  # (queries, 3)
+        lo = np.searchsorted(sorted_ids, row_ids - 1, "left").ravel()
+        hi = np.searchsorted(sorted_ids, row_ids + 1, "right").ravel()
+        counts = hi - lo
+        total = int(counts.sum())
+        if total == 0:
+            return empty, empty
+
+        # expand the slices into flat candidate pairs
+        query = np.repeat(np.repeat(np.arange(len(xs)), 3), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows = order[np.repeat(lo, counts) + offsets]
+        dx = pos[rows, 0] - xs[query]
+        dy = pos[rows, 1] - ys[query]
+        reach = radius[rows] + radii[query]
+        keep = (dx * dx + dy * dy <= reach * reach) & ~self.dead[rows]
+        query, rows = query[keep], rows[keep]
+        o = np.lexsort((query, rows))
+        return query[o], rows[o]
+
+    @staticmethod
+    def _build_grid(pos, cs):
+        """Bucket rows by cell as (cell size, origin, cols, sorted cell ids, row order)"""
+        cells = np.floor_divide(pos, cs).astype(np.int64)
+        # the one-cell border keeps neighbour slices of adjacent grid rows from overlapping
+        origin = cells.min(axis=0) - 1
+        cells -= origin
+        cols = int(cells[:, 0].max()) + 2
+        ids = cells[:, 1] * cols + cells[:, 0]
+        order = np.argsort(ids, kind="stable")
+        return cs, origin, cols, ids[order], order
+
+    def nearest(self, x, y):
+        """(index, squared distance) of the closest live enemy, or (-1, inf)"""
+        n = self.n
+        if n == 0:
+            return -1, math.inf
+        pos = self.pos[:n]
+        dx = pos[:, 0] - x
+        dy = pos[:, 1] - y
+        d2 = np.where(self.dead[:n], np.inf, dx * dx + dy * dy)
+        i = int(np.argmin(d2))
+        return (i, float(d2[i])) if d2[i] < math.inf else (-1, math.inf)
+
+    def compact(self):
+        n = self.n
+        keep = np.flatnonzero(~self.dead[:n])
+        if keep.size == n:
+            return
+        m = keep.size
+        for name in self.FIELDS:
+            arr = getattr(self, name)
+            arr[:m] = arr[keep]
+        self.n = m
+        self._grid = None
+
+    def draw(self, s, alpha=1.0):
+        """Blit the whole horde; returns the rects touched"""
+        n = self.n
+        if n == 0:
+            return []
+        prev = self.prev[:n]
+        centers = (prev + (self.pos[:n] - prev) * alpha).astype(np.int64).tolist()
+        # three sprites cover the whole horde, so look them up once per frame
+        circle = self.sprites.circle
+        core = max(2, ELITE_RADIUS // 3)
+        body = circle(ENEMY_RADIUS, ENEMY_COLOR)
+        elite_body = circle(ELITE_RADIUS, ELITE_COLOR)
+        core_sprite = circle(core, (255, 220, 200))
+        eo, co, bo = ELITE_RADIUS + 1, core + 1, ENEMY_RADIUS + 1
+        blits = []
+        for (cx, cy), elite in zip(centers, self.elite[:n].tolist()):
+            if elite:
+                blits.append((elite_body, (cx - eo, cy - eo)))
+                # small inner core
+                blits.append((core_sprite, (cx - co, cy - co)))
+            else:
+                blits.append((body, (cx - bo, cy - bo)))
+        return s.blits(blits)
 
 
 class PowerUp:
     TYPES = ("rapid", "shield", "spread")
+    __slots__ = ("pos", "prev", "kind", "radius", "t", "dead")
 
-    def __init__(self, pos: vec2):
-        self.pos = vec2(pos)
-        self.kind = random.choice(PowerUp.TYPES)
+    def __init__(self, x, y, rng=random):
+        self.pos = vec2()
+        self.prev = vec2()
+        self.spawn(x, y, rng)
+
+    def spawn(self, x, y, rng=random):
+        self.pos.update(x, y)
+        self.prev.update(x, y)
+        self.kind = rng.choice(PowerUp.TYPES)
         self.radius = POWERUP_RADIUS
         self.t = 0.0
+        self.dead = False
 
     def update(self, dt):
+        self.prev.update(self.pos)
         self.t += dt
         self.pos.y += 60 * dt
         self.pos.x += math.cos(self.t * 2.0) * 30 * dt
 
-    def draw(self, s):
+    def draw(self, s, text, alpha=1.0):
         col = (120, 255, 170) if self.kind == "rapid" else (120, 170, 255) if self.kind == "shield" else (255, 210, 120)
-        pg.draw.circle(s, col, (int(self.pos.x), int(self.pos.y)), self.radius)
+        center = lerp_point(self.prev, self.pos, alpha)
+        rect = pg.draw.circle(s, col, center, self.radius)
         sym = {"rapid": "R", "shield": "S", "spread": "W"}[self.kind]
-        font = pg.font.SysFont("consolas", 16, bold=True)
-        glyph = font.render(sym, True, (20, 30, 40))
-        s.blit(glyph, glyph.get_rect(center=(int(self.pos.x), int(self.pos.y))))
+        glyph = text.render(GLYPH_FONT, sym, (20, 30, 40))
+        return rect.union(s.blit(glyph, glyph.get_rect(center=center)))
 
 
 class Player:
     def __init__(self, pos: vec2):
         self.pos = vec2(pos)
+        self.prev = vec2(pos)
         self.vel = vec2(0, 0)
         self.radius = PLAYER_RADIUS
         self.hp = PLAYER_MAX_HP
@@ -182,7 +669,8 @@ class Player:
         elif kind == "spread":
             self.power["spread"] = min(12.0, self.power["spread"] + 9.0)
 
-    def update(self, dt, keys, bounds):
+    def update(self, dt, controls, bounds):
+        self.prev.update(self.pos)
         # handle powers decay
         for k in self.power:
             self.power[k] = max(0.0, self.power[k] - dt)
@@ -190,32 +678,34 @@ class Player:
         if self.mult_t <= 0:
             self.mult = 1
 
-        acc = vec2(0, 0)
-        if keys[pg.K_LEFT] or keys[pg.K_a]:
-            acc.x -= PLAYER_ACCEL
-        if keys[pg.K_RIGHT] or keys[pg.K_d]:
-            acc.x += PLAYER_ACCEL
-        if keys[pg.K_UP] or keys[pg.K_w]:
-            acc.y -= PLAYER_ACCEL
-        if keys[pg.K_DOWN] or keys[pg.K_s]:
-            acc.y += PLAYER_ACCEL
+        ax = ay = 0.0
+        if controls.left:
+            ax -= PLAYER_ACCEL
+        if controls.right:
+            ax += PLAYER_ACCEL
+        if controls.up:
+            ay -= PLAYER_ACCEL
+        if controls.down:
+            ay += PLAYER_ACCEL
 
-        self.vel += acc * dt
-        self.vel *= PLAYER_FRICTION
+        vel = self.vel
+        vel.x = (vel.x + ax * dt) * PLAYER_FRICTION
+        vel.y = (vel.y + ay * dt) * PLAYER_FRICTION
 
         # dash
         self.dash_cd -= dt
-        if (keys[pg.K_LSHIFT] or keys[pg.K_RSHIFT]) and self.dash_cd <= 0 and self.dash_t <= 0:
+        if controls.dash and self.dash_cd <= 0 and self.dash_t <= 0:
             if self.vel.length_squared() > 1:
                 self.dash_t = PLAYER_DASH_TIME
                 self.dash_cd = PLAYER_DASH_COOLDOWN
                 self.invuln = max(self.invuln, PLAYER_DASH_TIME + 0.05)
 
+        step = dt
         if self.dash_t > 0:
             self.dash_t -= dt
-            self.pos += self.vel * (PLAYER_DASH_MULT * dt)
-        else:
-            self.pos += self.vel * dt
+            step = PLAYER_DASH_MULT * dt
+        self.pos.x += vel.x * step
+        self.pos.y += vel.y * step
 
         self.invuln = max(0.0, self.invuln - dt)
 
@@ -226,7 +716,7 @@ class Player:
 
         self.fire_cd = max(0.0, self.fire_cd - dt)
 
-    def try_fire(self, bullets, holding=False):
+    def try_fire(self, bullets, pool, holding=False, rng=random):
         rate = PLAYER_FIRE_COOLDOWN
         if self.power["rapid"] > 0:
             rate *= 0.55
@@ -245,9 +735,9 @@ class Player:
         for i in (-1, 0, 1):
             if spread == 0 and i != 0:
                 continue
-            ang = -math.pi / 2 + i * spread + random.uniform(-jitter, jitter)
-            vel = vec2(math.cos(ang), math.sin(ang)) * BULLET_SPEED
-            bullets.append(Bullet(self.pos + vec2(0, -self.radius - 2), vel))
+            ang = -math.pi / 2 + i * spread + rng.uniform(-jitter, jitter)
+            bullets.append(pool.acquire(self.pos.x, self.pos.y - self.radius - 2,
+                                        math.cos(ang) * BULLET_SPEED, math.sin(ang) * BULLET_SPEED))
 
     def damage(self, amt):
         if self.invuln > 0 or self.power["shield"] > 0:
@@ -261,280 +751,455 @@ class Player:
         self.mult = min(8, self.mult + 1)
         self.mult_t = 4.0
 
-    def draw(self, surf):
+    def draw(self, surf, alpha=1.0):
         # Triangle ship oriented by velocity; default up
+        pos = self.prev.lerp(self.pos, alpha)
         angle = math.atan2(self.vel.y, self.vel.x) if self.vel.length_squared() > 10 else -math.pi / 2
-        tip = self.pos + vec2(math.cos(angle), math.sin(angle)) * (self.radius + 4)
-        left = self.pos + vec2(math.cos(angle + 2.4), math.sin(angle + 2.4)) * self.radius
-        right = self.pos + vec2(math.cos(angle - 2.4), math.sin(angle - 2.4)) * self.radius
+        tip = pos + vec2(math.cos(angle), math.sin(angle)) * (self.radius + 4)
+        left = pos + vec2(math.cos(angle + 2.4), math.sin(angle + 2.4)) * self.radius
+        right = pos + vec2(math.cos(angle - 2.4), math.sin(angle - 2.4)) * self.radius
         color = PLAYER_COLOR
         if self.invuln > 0 and int(self.invuln * 20) % 2 == 0:
             color = (200, 200, 220)
-        pg.draw.polygon(surf, color, [(int(tip.x), int(tip.y)),
-                                      (int(right.x), int(right.y)),
-                                      (int(left.x), int(left.y))])
+        rect = pg.draw.polygon(surf, color, [(int(tip.x), int(tip.y)),
+                                             (int(right.x), int(right.y)),
+                                             (int(left.x), int(left.y))])
         # thruster
         flame_len = 10 + min(20, self.vel.length() * 0.05) * (1.6 if self.dash_t > 0 else 1.0)
         back = (right + left) / 2
         flame = back + vec2(math.cos(angle + math.pi), math.sin(angle + math.pi)) * flame_len
-        pg.draw.line(surf, (255, 180, 140), (int(back.x), int(back.y)), (int(flame.x), int(flame.y)), 3)
+        return rect.union(pg.draw.line(surf, (255, 180, 140), (int(back.x), int(back.y)),
+                                       (int(flame.x), int(flame.y)), 3))
 
 
 # ---------------------------
-# Game
+# World (simulation only)
 # ---------------------------
-class Game:
-    def __init__(self):
-        pg.init()
-        pg.display.set_caption("2D Space Shooter — Pygame")
-        self.screen = pg.display.set_mode((WIDTH, HEIGHT), pg.RESIZABLE)
-        self.clock = pg.time.Clock()
-        self.font = pg.font.SysFont("consolas", 22)
-        self.bigfont = pg.font.SysFont("consolas", 46, bold=True)
-        # menu state
-        self.state = "menu"
-        self.running = True
-        self.reset()  # prepare game entities even before first start (for sizes/etc.)
-
-    def start_game(self):
-        # Begin a new play session from the menu
-        self.reset()
-        self.state = "playing"
-
-    def update_starfield(self, dt):
-        # Starfield for menu animation
-        if not hasattr(self, "starfield") or self.starfield is None:
-            w, h = self.screen.get_size()
-            self.starfield = self._make_stars(w, h)
-            return
-        w, h = self.screen.get_size()
-        for s in self.starfield:
-            s[1] += s[2] * dt
-            if s[1] > h:
-                s[0] = random.uniform(0, w)
-                s[1] = -5
-                s[2] = random.uniform(20, 120)
-
-    def draw_menu(self):
-        # Background
-        self.screen.fill(BG_COLOR)
-        for x, y, _, size in getattr(self, "starfield", []):
-            pg.draw.circle(self.screen, STAR_COLOR, (int(x), int(y)), size)
-
-        title = self.bigfont.render("2D Space Shooter", True, (220, 235, 255))
-        prompt = self.font.render("Press Enter / Space to Start", True, (200, 210, 230))
-        controls = [
-            "Move: Arrow Keys / WASD",
-            "Shoot: Space (hold)",
-            "Dash: Left Shift",
-            "Pause: P     Quit: Esc",
-        ]
-        w, h = self.screen.get_size()
-        self.screen.blit(title, (w // 2 - title.get_width() // 2, int(h * 0.28)))
-        self.screen.blit(prompt, (w // 2 - prompt.get_width() // 2, int(h * 0.28) + 60))
-
-        y0 = int(h * 0.28) + 110
-        for i, line in enumerate(controls):
-            surf = self.font.render(line, True, (200, 210, 230))
-            self.screen.blit(surf, (w // 2 - surf.get_width() // 2, y0 + i * 26))
-        pg.display.flip()
-
-    def reset(self):
-        w, h = self.screen.get_size()
-        self.player = Player(vec2(w / 2, h * 0.75))
+class World:
+    """Gameplay state and rules with no display, font or event dependencies.
+
+    All gameplay randomness goes through ``self.rng`` and particles draw from
+    a NumPy generator seeded the same way, so a given seed, timestep and
+    sequence of Controls always reproduces the same session.
+    """
+
+    def __init__(self, bounds=(WIDTH, HEIGHT), seed=None, sprites=None):
+        self.bounds = bounds
+        self.sprites = sprites
+        # broadphase grids, refilled every frame
+        self.powerup_grid = SpatialHash()
+        # pooled entity storage; lists are compacted in place every frame
+        self.bullet_pool = Pool(Bullet)
+        self.powerup_pool = Pool(PowerUp)
         self.bullets = []
-        self.enemies = []
-        self.particles = []
+        self.enemies = EnemyHorde(sprites=sprites)
         self.powerups = []
+        # update order; names double as timing labels
+        self.phases = (
+            ("player", self._phase_player),
+            ("spawn", self._phase_spawn),
+            ("move", self._phase_move),
+            ("collide", self._phase_collide),
+            ("particles", self._phase_particles),
+        )
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.rng = random.Random(self.seed)
+        w, h = self.bounds
+        self.player = Player(vec2(w / 2, h * 0.75))
+        self.enemies.clear()
+        for items, pool in ((self.bullets, self.bullet_pool), (self.powerups, self.powerup_pool)):
+            for it in items:
+                pool.release(it)
+            items.clear()
+        self.particles = ParticleSystem(PARTICLE_MAX, rng=np.random.default_rng(self.seed), sprites=self.sprites)
         self.paused = False
         self.elapsed = 0.0
-        self.spawn_t = random.uniform(ENEMY_MIN_SPAWN, ENEMY_MAX_SPAWN)
+        self.frame = 0
+        self.spawn_t = self.rng.uniform(ENEMY_MIN_SPAWN, ENEMY_MAX_SPAWN)
         self.difficulty = 1.0
-        self.starfield = self._make_stars(w, h)
-
-    def _make_stars(self, w, h):
-        stars = []
-        for _ in range(MAX_STARS):
-            x = random.uniform(0, w)
-            y = random.uniform(0, h)
-            speed = random.uniform(20, 120)
-            size = random.randint(1, 3)
-            stars.append([x, y, speed, size])
-        return stars
 
     def spawn_enemy(self):
-        w, h = self.screen.get_size()
-        x = random.uniform(40, w - 40)
+        w, h = self.bounds
+        rng = self.rng
+        x = rng.uniform(40, w - 40)
         y = -30
-        elite = random.random() < clamp(0.05 * self.difficulty, 0, 0.4)
-        speed = ENEMY_BASE_SPEED + random.uniform(-ENEMY_SPEED_VARIANCE, ENEMY_SPEED_VARIANCE)
+        elite = rng.random() < clamp(0.05 * self.difficulty, 0, 0.4)
+        speed = ENEMY_BASE_SPEED + rng.uniform(-ENEMY_SPEED_VARIANCE, ENEMY_SPEED_VARIANCE)
         speed *= (0.8 + 0.25 * self.difficulty)
-        self.enemies.append(Enemy(vec2(x, y), speed, elite=elite))
+        self.enemies.spawn(x, y, speed, elite, rng.random() * 10)
+
+    def spawn_swarm(self, count):
+        """Drop ``count`` extra enemies in at once (stress and swarm runs)"""
+        for _ in range(count):
+            self.spawn_enemy()
 
     def add_explosion(self, pos, amount=10, power=1.0):
-        for _ in range(amount):
-            ang = random.uniform(0, math.tau)
-            mag = random.uniform(80, 260) * power
-            vel = vec2(math.cos(ang), math.sin(ang)) * mag
-            col = random.choice([(255, 200, 120), (255, 150, 90), (200, 240, 255)])
-            self.particles.append(Particle(vec2(pos), vel, random.uniform(0.3, 1.2), col))
-        if len(self.particles) > PARTICLE_MAX:
-            self.particles = self.particles[-PARTICLE_MAX:]
+        self.particles.emit(pos, amount, power)
 
-    def update(self, dt):
+    def update(self, dt, controls=NO_INPUT, probe=None):
+        """Advance one step.
+
+        ``probe``, if given, is called as probe(phase_name, start, end) with
+        perf_counter times after each phase; without it no clock is read.
+        """
         if self.paused:
             return
 
-        w, h = self.screen.get_size()
-        keys = pg.key.get_pressed()
+        self.frame += 1
         self.elapsed += dt
         # scale difficulty slowly
         self.difficulty = 1.0 + self.elapsed * 0.02
 
-        # update player
-        self.player.update(dt, keys, (w, h))
+        if probe is None:
+            for _, phase in self.phases:
+                phase(dt, controls)
+        else:
+            clock = time.perf_counter
+            for name, phase in self.phases:
+                t0 = clock()
+                phase(dt, controls)
+                probe(name, t0, clock())
 
-        # update starfield (even during play for motion)
-        for s in self.starfield:
-            s[1] += s[2] * dt * 0.5
-            if s[1] > h:
-                s[0] = random.uniform(0, w)
-                s[1] = -5
-                s[2] = random.uniform(20, 120)
+    def _phase_player(self, dt, controls):
+        # manual tap shooting (tap has tighter spread)
+        if controls.tap and self.player.alive():
+            self.player.try_fire(self.bullets, self.bullet_pool, holding=False, rng=self.rng)
 
+        # update player
+        self.player.update(dt, controls, self.bounds)
+
+    def _phase_spawn(self, dt, controls):
         # spawn enemies
         self.spawn_t -= dt
         spmin = max(0.18, ENEMY_MIN_SPAWN / self.difficulty)
         spmax = max(spmin + 0.05, ENEMY_MAX_SPAWN / self.difficulty)
         if self.spawn_t <= 0:
             self.spawn_enemy()
-            self.spawn_t = random.uniform(spmin, spmax)
+            self.spawn_t = self.rng.uniform(spmin, spmax)
 
         # fire bullets (hold)
-        if keys[pg.K_SPACE] and self.player.alive():
-            self.player.try_fire(self.bullets, holding=True)
+        if controls.fire and self.player.alive():
+            self.player.try_fire(self.bullets, self.bullet_pool, holding=True, rng=self.rng)
+
+    def _phase_move(self, dt, controls):
+        w, h = self.bounds
 
-        # update bullets
+        # update bullets (off-screen ones are marked and dropped at compaction)
         for b in self.bullets:
             b.update(dt)
-        self.bullets = [b for b in self.bullets if -20 <= b.pos.x <= w + 20 and -60 <= b.pos.y <= h + 60]
+            if not (-20 <= b.pos.x <= w + 20 and -60 <= b.pos.y <= h + 60):
+                b.dead = True
 
-        # update enemies
-        for e in self.enemies:
-            e.update(dt, self.player.pos)
-        self.enemies = [e for e in self.enemies if -60 <= e.pos.y <= h + 120]
+        # update enemies as one batch
+        self.enemies.update(dt, self.player.pos, self.bounds)
+
+    def _phase_collide(self, dt, controls):
+        rng = self.rng
 
         # collisions: bullets -> enemies
-        for e in list(self.enemies):
-            hit = False
-            for b in list(self.bullets):
-                if circle_collide(e.pos, e.radius, b.pos, b.radius):
-                    self.bullets.remove(b)
-                    e.hp -= 1
-                    hit = True
+        # Enemies stay the outer loop and bullets are tried in list order, so
+        # hits resolve exactly as the old all-pairs scan did. Candidate pairs
+        # come from the horde's grid broadphase; only enemies with a hit are
+        # walked in Python.
+        bullets = self.bullets
+        enemies = self.enemies
+        n = len(enemies)
+        if n and bullets:
+            bxy = np.array([(b.pos.x, b.pos.y) for b in bullets])
+            br = np.array([b.radius for b in bullets])
+            epos = enemies.pos[:n]
+            hit_bullets, hit_enemies = enemies.pairs(bxy[:, 0], bxy[:, 1], br)
+            groups = np.flatnonzero(np.diff(hit_enemies)) + 1
+            for ei, group in zip(hit_enemies[np.r_[0, groups]].tolist() if hit_enemies.size else [],
+                                 np.split(hit_bullets, groups)):
+                epos_i = epos[ei]
+                elite = bool(enemies.elite[ei])
+                for bi in group.tolist():
+                    b = bullets[bi]
+                    if b.dead:
+                        continue
+                    b.dead = True
+                    enemies.hp[ei] -= 1
                     self.add_explosion(b.pos, amount=6, power=0.5)
-                    if e.hp <= 0:
-                        self.enemies.remove(e)
-                        self.player.add_score(15 if e.elite else 7)
-                        self.add_explosion(e.pos, amount=24 if e.elite else 16, power=1.4 if e.elite else 1.0)
-                        if random.random() < POWERUP_CHANCE * (1.2 if e.elite else 1.0):
-                            self.powerups.append(PowerUp(e.pos))
+                    if enemies.hp[ei] <= 0:
+                        enemies.dead[ei] = True
+                        self.player.add_score(15 if elite else 7)
+                        self.add_explosion(epos_i, amount=24 if elite else 16, power=1.4 if elite else 1.0)
+                        if rng.random() < POWERUP_CHANCE * (1.2 if elite else 1.0):
+                            self.powerups.append(self.powerup_pool.acquire(epos_i[0], epos_i[1], rng))
                         break
-            if hit:
-                continue
 
         # enemies -> player
-        if self.player.alive():
-            for e in list(self.enemies):
-                if circle_collide(e.pos, e.radius, self.player.pos, self.player.radius):
-                    if self.player.damage(1):
-                        self.add_explosion(self.player.pos, amount=20, power=1.2)
-                    self.enemies.remove(e)
-                    self.add_explosion(e.pos, amount=12, power=0.9)
-
-        # powerups
+        if self.player.alive() and n:
+            ppos = self.player.pos
+            for ei in enemies.hits(ppos.x, ppos.y, self.player.radius).tolist():
+                if self.player.damage(1):
+                    self.add_explosion(ppos, amount=20, power=1.2)
+                enemies.dead[ei] = True
+                self.add_explosion(enemies.pos[ei], amount=12, power=0.9)
+
         for p in self.powerups:
             p.update(dt)
+
+        # powerups -> player
         if self.player.alive():
-            for p in list(self.powerups):
+            powerups = self.powerups
+            self.powerup_grid.build(powerups)
+            for pi in self.powerup_grid.query(self.player.pos, self.player.radius + 4):
+                p = powerups[pi]
                 if circle_collide(p.pos, p.radius, self.player.pos, self.player.radius + 4):
                     self.player.apply_powerup(p.kind)
-                    self.powerups.remove(p)
+                    p.dead = True
                     self.add_explosion(p.pos, amount=10, power=0.7)
 
-        # particles
-        for pr in self.particles:
-            pr.update(dt)
-        self.particles = [pr for pr in self.particles if pr.life > 0 and -40 <= pr.pos.x <= w + 40 and -40 <= pr.pos.y <= h + 40]
+        # compact once per frame, recycling the dead
+        compact(self.bullets, self.bullet_pool)
+        self.enemies.compact()
+        compact(self.powerups, self.powerup_pool)
+
+    def _phase_particles(self, dt, controls):
+        self.particles.update(dt, self.bounds)
+
+
+# ---------------------------
+# Game
+# ---------------------------
+class Game:
+    def __init__(self, seed=None, recorder=None, replay=None):
+        pg.init()
+        pg.display.set_caption("2D Space Shooter — Pygame")
+        self.screen = pg.display.set_mode((WIDTH, HEIGHT), pg.RESIZABLE)
+        # F3 toggles the profiler overlay, F9 starts/stops a Chrome trace
+        self.profiler = FrameProfiler()
+        self.loop = FixedStepLoop(self.step, self.render, self.handle_events,
+                                  sim_hz=SIM_HZ, render_fps=FPS, max_steps=MAX_STEPS_PER_FRAME,
+                                  profiler=self.profiler)
+        self.text = TextCache()
+        self.sprites = SpriteCache()
+        # only the regions drawn this frame or last frame reach the display
+        self.dirty = DirtyRects(BG_COLOR)
+        self._hearts = {}    # hp -> pre-rendered heart row
+        self._overlays = {}  # (kind, size) -> dimmed full-screen overlay with its text
+        self._frozen = False  # a paused frame is already on screen
+        self._overlay_shown = False
+        # None picks a fresh seed for every session
+        self.seed = seed
+        # starfield is cosmetic, so it keeps its own unseeded generator
+        self.starfield = Starfield(self.screen.get_size(), STAR_LAYERS, STAR_COLOR, sprites=self.sprites)
+        self.world = World(self.screen.get_size(), seed=seed, sprites=self.sprites)
+        self.tap_fire = False
+        self.controls = Controls()
+        # optional replay.InputRecorder capturing every step, or replay.Replayer driving them
+        self.recorder = recorder
+        self.replay = replay
+        # menu state
+        self.state = "menu"
+        self.running = True
+        self.reset()  # prepare game entities even before first start (for sizes/etc.)
+        if replay is not None:
+            self.start_game()
+
+    def start_game(self):
+        # Begin a new play session from the menu
+        self.reset()
+        self.state = "playing"
+
+    def update_starfield(self, dt):
+        # Starfield for menu animation
+        self.starfield.update(dt)
+
+    def draw_menu(self):
+        dirty = self.dirty
+        self._begin_frame()
+        dirty.extend(self.starfield.draw(self.screen))
+
+        title = self.text.render(BIG_FONT, "2D Space Shooter", (220, 235, 255))
+        prompt = self.text.render(UI_FONT, "Press Enter / Space to Start", (200, 210, 230))
+        controls = [
+            "Move: Arrow Keys / WASD",
+            "Shoot: Space (hold)",
+            "Dash: Left Shift",
+            "Pause: P     Quit: Esc",
+        ]
+        w, h = self.screen.get_size()
+        dirty.add(self.screen.blit(title, (w // 2 - title.get_width() // 2, int(h * 0.28))))
+        dirty.add(self.screen.blit(prompt, (w // 2 - prompt.get_width() // 2, int(h * 0.28) + 60)))
+
+        y0 = int(h * 0.28) + 110
+        for i, line in enumerate(controls):
+            surf = self.text.render(UI_FONT, line, (200, 210, 230))
+            dirty.add(self.screen.blit(surf, (w // 2 - surf.get_width() // 2, y0 + i * 26)))
+        dirty.add(self.profiler.draw_overlay(self.screen))
+        dirty.present()
+
+    def reset(self):
+        w, h = self.screen.get_size()
+        self.world.bounds = (w, h)
+        self.world.reset(self.seed)
+        self.tap_fire = False
+        if self.recorder is not None:
+            self.recorder.reset(self.world.seed, self.world.bounds)
+        self.starfield.resize(w, h)
+        self.dirty.invalidate()
+
+    def _on_resize(self, w, h):
+        self.starfield.resize(w, h)
+        self._overlays.clear()
+        self.dirty.invalidate()
+
+    def _begin_frame(self):
+        if self.starfield.pixel_mode:
+            # pixel-mode starfields touch the whole screen
+            self.dirty.invalidate()
+        self.dirty.begin(self.screen)
+
+    def update(self, dt):
+        world = self.world
+        if self.replay is not None:
+            self._replay_step()
+            return
+        if world.paused:
+            if self.recorder is not None:
+                self.recorder.paused()
+            return
+
+        w, h = self.screen.get_size()
+        world.bounds = (w, h)
+        controls = self.controls.read_keys(pg.key.get_pressed(), tap=self.tap_fire)
+        self.tap_fire = False
+        if self.recorder is not None:
+            self.recorder.step(controls, world.bounds)
+        self._advance(dt, controls)
+
+    def _replay_step(self):
+        replay = self.replay
+        was_done = replay.done
+        controls = replay.next_step(self.world)
+        if controls is None:
+            if not was_done:
+                print(f"Replay finished after {replay.log.steps} steps")
+            return
+        if not self.world.paused:
+            self._advance(replay.log.dt, controls)
+
+    def _advance(self, dt, controls):
+        prof = self.profiler
+        self.world.update(dt, controls, prof.record if prof.enabled else None)
+
+        # update starfield (even during play for motion)
+        self.starfield.update(dt * 0.5)
+
+    def _heart_row(self, hp):
+        row = self._hearts.get(hp)
+        if row is None:
+            row = pg.Surface((PLAYER_MAX_HP * 26 + 20, 40), pg.SRCALPHA)
+            for i in range(PLAYER_MAX_HP):
+                cx = 20 + i * 26
+                cy = 20
+                color = (240, 70, 90) if i < hp else (80, 60, 70)
+                pg.draw.circle(row, color, (cx, cy), 8)
+                pg.draw.circle(row, color, (cx + 10, cy), 8)
+                pg.draw.polygon(row, color, [(cx - 6, cy + 2), (cx + 16, cy + 2), (cx + 5, cy + 18)])
+            self._hearts[hp] = row
+        return row
 
     def _draw_ui(self):
+        # every piece is a cached surface that only re-renders when its value changes
         w, _ = self.screen.get_size()
+        player = self.world.player
+        blit = self.screen.blit
+        add = self.dirty.add
         # HP hearts
-        for i in range(PLAYER_MAX_HP):
-            cx = 20 + i * 26
-            cy = 20
-            color = (240, 70, 90) if i < self.player.hp else (80, 60, 70)
-            pg.draw.circle(self.screen, color, (cx, cy), 8)
-            pg.draw.circle(self.screen, color, (cx + 10, cy), 8)
-            pg.draw.polygon(self.screen, color, [(cx - 6, cy + 2), (cx + 16, cy + 2), (cx + 5, cy + 18)])
+        add(blit(self._heart_row(player.hp), (0, 0)))
 
         # Score / Mult
-        sc = self.font.render(f"Score: {self.player.score}", True, UI_COLOR)
-        self.screen.blit(sc, (w - sc.get_width() - 20, 10))
-        mult = self.font.render(f"x{self.player.mult}", True, (255, 230, 120))
-        self.screen.blit(mult, (w - mult.get_width() - 20, 36))
+        sc = self.text.label("score", UI_FONT, f"Score: {player.score}", UI_COLOR)
+        add(blit(sc, (w - sc.get_width() - 20, 10)))
+        mult = self.text.label("mult", UI_FONT, f"x{player.mult}", (255, 230, 120))
+        add(blit(mult, (w - mult.get_width() - 20, 36)))
 
         # Powers
-        pw = self.font.render(
-            f"[Rapid {self.player.power['rapid']:.1f}]  [Shield {self.player.power['shield']:.1f}]  [Spread {self.player.power['spread']:.1f}]",
-            True, (180, 200, 235))
-        self.screen.blit(pw, (20, 48))
-
-    def _draw_game_over(self):
-        w, h = self.screen.get_size()
-        overlay = pg.Surface((w, h), pg.SRCALPHA)
-        overlay.fill((10, 10, 20, 160))
-        self.screen.blit(overlay, (0, 0))
-        title = self.bigfont.render("GAME OVER", True, (255, 210, 220))
-        self.screen.blit(title, title.get_rect(center=(w // 2, h // 2 - 24)))
-        msg = self.font.render("Press Enter to restart or Esc to quit", True, UI_COLOR)
-        self.screen.blit(msg, msg.get_rect(center=(w // 2, h // 2 + 10)))
-
-    def _draw_paused(self):
-        w, h = self.screen.get_size()
-        overlay = pg.Surface((w, h), pg.SRCALPHA)
-        overlay.fill((10, 10, 20, 140))
-        self.screen.blit(overlay, (0, 0))
-        title = self.bigfont.render("PAUSED", True, (210, 230, 255))
-        self.screen.blit(title, title.get_rect(center=(w // 2, h // 2)))
-
-    def draw(self):
-        self.screen.fill(BG_COLOR)
+        pw = self.text.label(
+            "powers", UI_FONT,
+            f"[Rapid {player.power['rapid']:.1f}]  [Shield {player.power['shield']:.1f}]  [Spread {player.power['spread']:.1f}]",
+            (180, 200, 235))
+        add(blit(pw, (20, 48)))
+
+    def _overlay(self, kind):
+        size = self.screen.get_size()
+        key = (kind, size)
+        overlay = self._overlays.get(key)
+        if overlay is not None:
+            return overlay
+        w, h = size
+        overlay = pg.Surface(size, pg.SRCALPHA)
+        if kind == "game_over":
+            overlay.fill((10, 10, 20, 160))
+            title = self.text.render(BIG_FONT, "GAME OVER", (255, 210, 220))
+            overlay.blit(title, title.get_rect(center=(w // 2, h // 2 - 24)))
+            msg = self.text.render(UI_FONT, "Press Enter to restart or Esc to quit", UI_COLOR)
+            overlay.blit(msg, msg.get_rect(center=(w // 2, h // 2 + 10)))
+        else:
+            overlay.fill((10, 10, 20, 140))
+            title = self.text.render(BIG_FONT, "PAUSED", (210, 230, 255))
+            overlay.blit(title, title.get_rect(center=(w // 2, h // 2)))
+        self._overlays[key] = overlay
+        return overlay
+
+    def draw(self, alpha=1.0):
+        world = self.world
+        prof = self.profiler
+        dirty = self.dirty
+        if world.paused:
+            # nothing is stepping, so don't blend toward a stale previous state
+            alpha = 1.0
+            if self._frozen and not dirty.full and not prof.enabled:
+                # the paused frame is already on screen and nothing has changed
+                return
+        self._frozen = world.paused
+        overlay = None
+        if world.paused:
+            overlay = self._overlay("paused")
+        elif not world.player.alive():
+            overlay = self._overlay("game_over")
+        if overlay is not None or self._overlay_shown:
+            # full-screen overlays blend over everything, so repaint it all
+            # while one is up and once more after it goes away
+            dirty.invalidate()
+        self._overlay_shown = overlay is not None
+
+        screen = self.screen
+        self._begin_frame()
         # stars
-        for x, y, _, size in self.starfield:
-            pg.draw.circle(self.screen, STAR_COLOR, (int(x), int(y)), size)
+        dirty.extend(self.starfield.draw(screen))
 
         # entities
-        for p in self.particles:
-            p.draw(self.screen)
-        for pu in self.powerups:
-            pu.draw(self.screen)
-        for e in self.enemies:
-            e.draw(self.screen)
-        for b in self.bullets:
-            b.draw(self.screen)
-        self.player.draw(self.screen)
+        with prof.scope("draw.particles"):
+            dirty.extend(world.particles.draw(screen))
+        for pu in world.powerups:
+            dirty.add(pu.draw(screen, self.text, alpha))
+        dirty.extend(world.enemies.draw(screen, alpha))
+        for b in world.bullets:
+            dirty.add(b.draw(screen, alpha))
+        dirty.add(world.player.draw(screen, alpha))
 
         # UI
         self._draw_ui()
 
-        if not self.player.alive():
-            self._draw_game_over()
+        if overlay is not None:
+            screen.blit(overlay, (0, 0))
 
-        if self.paused:
-            self._draw_paused()
+        if prof.enabled:
+            prof.count("enemies", len(world.enemies))
+            prof.count("bullets", len(world.bullets))
+            prof.count("powerups", len(world.powerups))
+            prof.count("particles", len(world.particles))
+            dirty.add(prof.draw_overlay(screen))
 
-        pg.display.flip()
+        dirty.present()
 
     def handle_events(self):
         if self.state == "menu":
@@ -542,40 +1207,61 @@ class Game:
                 if e.type == pg.QUIT:
                     self.running = False
                 elif e.type == pg.VIDEORESIZE:
-                    self.starfield = self._make_stars(e.w, e.h)
+                    self._on_resize(e.w, e.h)
                 elif e.type == pg.KEYDOWN:
                     if e.key == pg.K_ESCAPE:
                         self.running = False
                     elif e.key in (pg.K_RETURN, pg.K_SPACE):
                         self.start_game()
+                    else:
+                        self._handle_debug_key(e.key)
         else:
             for e in pg.event.get():
                 if e.type == pg.QUIT:
                     self.running = False
                 elif e.type == pg.VIDEORESIZE:
-                    self.starfield = self._make_stars(e.w, e.h)
+                    self._on_resize(e.w, e.h)
                 elif e.type == pg.KEYDOWN:
                     if e.key == pg.K_ESCAPE:
                         self.running = False
+                    elif self.replay is not None:
+                        # the recording drives play; only debug keys apply
+                        self._handle_debug_key(e.key)
                     elif e.key == pg.K_p:
-                        if self.player.alive():
-                            self.paused = not self.paused
-                    elif e.key == pg.K_RETURN and not self.player.alive():
+                        if self.world.player.alive():
+                            self.world.paused = not self.world.paused
+                    elif e.key == pg.K_RETURN and not self.world.player.alive():
                         self.reset()
-                    elif e.key == pg.K_SPACE and self.player.alive():
-                        # manual tap shooting (tap has tighter spread)
-                        self.player.try_fire(self.bullets, holding=False)
-
-    def run(self):
-        while self.running:
-            dt = self.clock.tick(FPS) / 1000.0
-            self.handle_events()
-            if self.state == "menu":
-                self.update_starfield(dt)
-                self.draw_menu()
-            else:
-                self.update(dt)
-                self.draw()
+                    elif e.key == pg.K_SPACE and self.world.player.alive():
+                        # fired on the next update (tap has tighter spread)
+                        self.tap_fire = True
+                    else:
+                        self._handle_debug_key(e.key)
+
+    def _handle_debug_key(self, key):
+        if key == pg.K_F3:
+            self.profiler.toggle()
+        elif key == pg.K_F9:
+            self.profiler.toggle_trace(lambda path: print(f"Trace written to {path}"))
+
+    def step(self, dt):
+        # one fixed simulation step (dt is always 1 / SIM_HZ)
+        if self.state == "menu":
+            self.update_starfield(dt)
+        else:
+            self.update(dt)
+
+    def render(self, alpha=1.0):
+        if self.state == "menu":
+            self.draw_menu()
+        else:
+            self.draw(alpha)
+
+    def run(self, record_path=None):
+        self.loop.run(lambda: self.running)
+        if self.recorder is not None and record_path:
+            self.recorder.save(record_path)
+            print(f"Recorded {self.recorder.steps} steps to {record_path}")
         pg.quit()
         sys.exit()
 
@@ -583,5 +1269,19 @@ class Game:
 # ---------------------------
 # Entry
 # ---------------------------
+def main():
+    from replay import InputRecorder, Replayer
+
+    ap = argparse.ArgumentParser(description="2D Space Shooter")
+    ap.add_argument("--seed", type=seed_arg, default=None, help="gameplay RNG seed (default: random per session)")
+    ap.add_argument("--record", metavar="LOG", help="record every step's input to LOG on exit")
+    ap.add_argument("--replay", metavar="LOG", help="play back a recording instead of reading the keyboard")
+    args = ap.parse_args()
+
+    recorder = InputRecorder(1.0 / SIM_HZ) if args.record else None
+    replay = Replayer.load(args.replay, Controls.from_mask) if args.replay else None
+    Game(seed=args.seed, recorder=recorder, replay=replay).run(args.record)
+
+
 if __name__ == "__main__":
-    Game().run()
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# Tests import the game modules the way headless.py does, from the prototype directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from space_shooter import DENSE_PAIRS_MAX, EnemyHorde
+
+
+def brute_force_pairs(horde, xs, ys, radii):
+    pairs = []
+    for e in range(len(horde)):
+        if horde.dead[e]:
+            continue
+        ex, ey = horde.pos[e]
+        for q in range(len(xs)):
+            reach = horde.radius[e] + radii[q]
+            if (ex - xs[q]) ** 2 + (ey - ys[q]) ** 2 <= reach * reach:
+                pairs.append((q, e))
+    # ordered by enemy, then query
+    return sorted(pairs, key=lambda p: (p[1], p[0]))
+
+
+def make_horde(rng, count):
+    horde = EnemyHorde(capacity=4)
+    for _ in range(count):
+        horde.spawn(rng.uniform(-50, 850), rng.uniform(-80, 700), 100.0, bool(rng.random() < 0.2), 0.0)
+    horde.dead[:count] = rng.random(count) < 0.1
+    return horde
+
+
+# query counts on both sides of DENSE_PAIRS_MAX, so the dense and grid paths are both covered
+@pytest.mark.parametrize("enemies, queries", [(0, 5), (7, 1), (30, 40), (400, 60), (2000, 300)])
+def test_pairs_match_brute_force(enemies, queries):
+    rng = np.random.default_rng(enemies * 1000 + queries)
+    horde = make_horde(rng, enemies)
+    xs = rng.uniform(-50, 850, queries)
+    ys = rng.uniform(-80, 700, queries)
+    radii = rng.choice([3.0, 5.0, 30.0], queries)
+    query, rows = horde.pairs(xs, ys, radii)
+    assert list(zip(query.tolist(), rows.tolist())) == brute_force_pairs(horde, xs, ys, radii)
+    if enemies * queries > DENSE_PAIRS_MAX:
+        assert horde._grid is not None
+
+
+def test_pairs_after_moving_reuse_no_stale_grid():
+    rng = np.random.default_rng(3)
+    horde = make_horde(rng, 1500)
+    xs, ys = rng.uniform(0, 800, 50), rng.uniform(0, 600, 50)
+    radii = np.full(50, 12.0)
+    horde.pairs(xs, ys, radii)
+    horde.update(0.5, type("P", (), {"x": 400.0, "y": 500.0})(), (800, 600))
+    query, rows = horde.pairs(xs, ys, radii)
+    assert list(zip(query.tolist(), rows.tolist())) == brute_force_pairs(horde, xs, ys, radii)
+
+
+def test_hits_lists_overlapping_enemies_in_spawn_order():
+    horde = EnemyHorde()
+    for x in (100, 10, 105, 300):
+        horde.spawn(x, 50, 100.0, False, 0.0)
+    horde.dead[2] = True
+    assert horde.hits(102.0, 50.0, 5.0).tolist() == [0]
+    assert horde.hits(20.0, 50.0, 100.0).tolist() == [0, 1]
@@ -0,0 +1,29 @@
+import pytest
+
+from headless import SCRIPTS, HeadlessSim
+
+OUTCOME = ("seed", "frames", "sim_time", "score", "hp", "alive")
+
+
+def outcome(result):
+    return {k: result[k] for k in OUTCOME}
+
+
+@pytest.mark.parametrize("script", sorted(SCRIPTS))
+def test_same_seed_same_session(script):
+    runs = [HeadlessSim(seed=11, script=SCRIPTS[script], swarm=40).run(3000, stop_on_death=False)
+            for _ in range(2)]
+    assert outcome(runs[0]) == outcome(runs[1])
+
+
+def test_profiling_does_not_change_the_session():
+    plain = HeadlessSim(seed=4).run(4000)
+    profiled = HeadlessSim(seed=4).run(4000, profile=True)
+    assert outcome(plain) == outcome(profiled)
+
+
+@pytest.mark.parametrize("seed, frames, score", [(3, 14353, 24356), (6, 16060, 29060)])
+def test_balance_is_unchanged(seed, frames, score):
+    # Pinned strafe outcomes: a change here means gameplay, not just speed, changed
+    result = HeadlessSim(seed=seed, dt=1 / 120).run(10 ** 6)
+    assert (result["frames"], result["score"]) == (frames, score)
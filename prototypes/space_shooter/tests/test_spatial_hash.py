@@ -0,0 +1,30 @@
+import random
+
+import pygame as pg
+
+from space_shooter import SpatialHash, circle_collide
+
+
+class Body:
+    def __init__(self, x, y, radius, dead=False):
+        self.pos = pg.Vector2(x, y)
+        self.radius = radius
+        self.dead = dead
+
+
+def test_query_finds_every_overlap_in_index_order():
+    rng = random.Random(1)
+    grid = SpatialHash(cell_size=64)
+    for _ in range(50):
+        bodies = [Body(rng.uniform(-100, 900), rng.uniform(-100, 700), rng.choice((4, 8, 18)), rng.random() < 0.1)
+                  for _ in range(rng.randint(0, 120))]
+        grid.build(bodies)
+        for _ in range(20):
+            probe = pg.Vector2(rng.uniform(-100, 900), rng.uniform(-100, 700))
+            radius = rng.uniform(1, 40)
+            found = list(grid.query(probe, radius))
+            assert found == sorted(found)
+            assert not any(bodies[i].dead for i in found)
+            expected = [i for i, b in enumerate(bodies)
+                        if not b.dead and circle_collide(b.pos, b.radius, probe, radius)]
+            assert set(expected) <= set(found)
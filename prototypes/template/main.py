@@ -13,18 +13,28 @@ Feel free to:
 - Use web technologies (JavaScript/Canvas)
 
 This is just ONE possible starting point.
+
+The loop runs the simulation at a fixed rate (SIM_HZ) and renders at its own
+rate (FPS), blending positions between steps so motion stays smooth either way.
 """
 
+import os
 import pygame
 import sys
 
+# shared/ helpers live at the repository root (two levels up from any prototype)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from shared.game_loop import FixedStepLoop
+
 # Initialize pygame
 pygame.init()
 
 # Constants (modify as needed)
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
-FPS = 60
+FPS = 60                 # render rate
+SIM_HZ = 120             # simulation rate
+MAX_STEPS_PER_FRAME = 5  # catch-up cap after a hitch
 BACKGROUND_COLOR = (20, 20, 30)
 PLAYER_COLOR = (100, 200, 255)
 
@@ -32,13 +42,17 @@ class GamePrototype:
     def __init__(self):
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Game Prototype Template")
-        self.clock = pygame.time.Clock()
         self.running = True
+        self.loop = FixedStepLoop(self.update, self.render, self.handle_events,
+                                  sim_hz=SIM_HZ, render_fps=FPS, max_steps=MAX_STEPS_PER_FRAME)
         
         # Example game state
         self.player_x = SCREEN_WIDTH // 2
         self.player_y = SCREEN_HEIGHT // 2
+        self.prev_x = self.player_x  # position at the previous step, for interpolation
+        self.prev_y = self.player_y
         self.player_speed = 200  # pixels per second
+        self.font = pygame.font.Font(None, 36)
         
     def handle_events(self):
         for event in pygame.event.get():
@@ -49,6 +63,9 @@ class GamePrototype:
                     self.running = False
     
     def update(self, dt):
+        # dt is always 1 / SIM_HZ
+        self.prev_x, self.prev_y = self.player_x, self.player_y
+        
         # Handle input
         keys = pygame.key.get_pressed()
         
@@ -68,21 +85,23 @@ class GamePrototype:
         
         # Add your game logic here
         
-    def render(self):
+    def render(self, alpha=1.0):
+        # alpha (0..1) is how far we are between the last two simulation steps
         # Clear screen
         self.screen.fill(BACKGROUND_COLOR)
         
-        # Draw player
+        # Draw player (interpolated)
+        x = self.prev_x + (self.player_x - self.prev_x) * alpha
+        y = self.prev_y + (self.player_y - self.prev_y) * alpha
         pygame.draw.circle(
             self.screen, 
             PLAYER_COLOR,
-            (int(self.player_x), int(self.player_y)), 
+            (int(x), int(y)), 
             25
         )
         
         # Draw instructions
-        font = pygame.font.Font(None, 36)
-        text = font.render("Use WASD or Arrow Keys to Move", True, (255, 255, 255))
+        text = self.font.render("Use WASD or Arrow Keys to Move", True, (255, 255, 255))
         text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, 50))
         self.screen.blit(text, text_rect)
         
@@ -91,12 +110,7 @@ class GamePrototype:
         pygame.display.flip()
     
     def run(self):
-        while self.running:
-            dt = self.clock.tick(FPS) / 1000.0  # Delta time in seconds
-            
-            self.handle_events()
-            self.update(dt)
-            self.render()
+        self.loop.run(lambda: self.running)
         
         pygame.quit()
         sys.exit()
@@ -0,0 +1 @@
+# Shared pygame helpers used across prototypes
@@ -0,0 +1,69 @@
+"""
+Dirty-Rect Tracker
+
+Keeps the screen up to date by touching only the regions that changed. Each
+frame, begin() paints the background back over whatever was drawn in the
+previous frame, the caller draws and reports the rects it touched, and
+present() pushes the old and new rects to the display with
+pygame.display.update(rects). When a frame touches too many rects, or after
+invalidate() (resize, state change, full-screen overlay), the frame falls back
+to a full clear and flip, which is always correct.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+import pygame
+
+Color = Tuple[int, int, int]
+
+
+class DirtyRects:
+    """Per-frame dirty-rect bookkeeping with a full-redraw fallback"""
+
+    def __init__(self, background: Color = (0, 0, 0), max_rects: int = 800):
+        self.background = background
+        self.max_rects = max_rects
+        self._prev: List[pygame.Rect] = []
+        self._cur: List[pygame.Rect] = []
+        self._full = True  # first frame always paints everything
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def invalidate(self):
+        """Force the next frame to clear and present the whole screen"""
+        self._full = True
+
+    @property
+    def full(self) -> bool:
+        return self._full
+
+    def begin(self, surface: pygame.Surface):
+        """Erase last frame's drawing; clears everything on a full frame"""
+        if self._full or len(self._prev) > self.max_rects:
+            self._full = True
+            surface.fill(self.background)
+        else:
+            fill = surface.fill
+            bg = self.background
+            for r in self._prev:
+                fill(bg, r)
+
+    def add(self, rect: Optional[pygame.Rect]):
+        if rect is not None:
+            self._cur.append(rect)
+
+    def extend(self, rects: Optional[Iterable[pygame.Rect]]):
+        if rects:
+            self._cur.extend(rects)
+
+    def present(self):
+        """Show the frame and remember its rects for the next begin()"""
+        if self._full or len(self._prev) + len(self._cur) > self.max_rects:
+            pygame.display.flip()
+            self.full_frames += 1
+        else:
+            pygame.display.update(self._prev + self._cur)
+            self.partial_frames += 1
+        self._prev = self._cur
+        self._cur = []
+        self._full = False
@@ -0,0 +1,91 @@
+"""
+Fixed-Timestep Game Loop
+
+Runs update() at a fixed simulation rate and render() at its own frame rate.
+Real frame time is added to an accumulator and used up in whole steps. The
+leftover fraction is passed to render() as an interpolation factor (0..1), so
+drawing can blend between the previous and current simulation states. A cap
+on steps per frame stops one long hitch from snowballing into slower and
+slower catch-up frames.
+"""
+
+from contextlib import nullcontext
+from typing import Callable, Optional
+
+import pygame
+
+_NULL_SCOPE = nullcontext()
+
+
+def _no_scope(name):
+    return _NULL_SCOPE
+
+
+class FixedStepLoop:
+    """Fixed-step accumulator with render interpolation"""
+
+    def __init__(self, update: Callable[[float], None], render: Callable[[float], None],
+                 handle_events: Optional[Callable[[], None]] = None,
+                 sim_hz: float = 120.0, render_fps: int = 60, max_steps: int = 5,
+                 profiler=None):
+        self.update = update
+        self.render = render
+        self.handle_events = handle_events
+        self.step_dt = 1.0 / sim_hz
+        self.render_fps = render_fps  # 0 = uncapped
+        self.max_steps = max_steps
+        self.clock = pygame.time.Clock()
+        self.profiler = profiler  # optional shared.profiler.FrameProfiler
+
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.steps_last_frame = 0
+        self.dropped_time = 0.0  # simulation time skipped because of the step cap
+
+    def reset(self):
+        """Forget accumulated time, e.g. after loading or unpausing"""
+        self.accumulator = 0.0
+        self.clock.tick()
+
+    def tick(self) -> float:
+        """Run one rendered frame; returns the interpolation factor used"""
+        frame_dt = self.clock.tick(self.render_fps) / 1000.0
+
+        prof = self.profiler
+        profiling = prof is not None and prof.enabled
+        scope = prof.scope if profiling else _no_scope
+        if profiling:
+            prof.begin_frame()
+
+        if self.handle_events:
+            with scope("events"):
+                self.handle_events()
+
+        self.accumulator += frame_dt
+        step = self.step_dt
+        steps = 0
+        while self.accumulator >= step and steps < self.max_steps:
+            with scope("update"):
+                self.update(step)
+            self.accumulator -= step
+            steps += 1
+
+        if self.accumulator >= step:
+            # Hit the cap: drop the backlog instead of spiralling
+            kept = self.accumulator % step
+            self.dropped_time += self.accumulator - kept
+            self.accumulator = kept
+
+        self.steps_last_frame = steps
+        self.alpha = self.accumulator / step
+        with scope("render"):
+            self.render(self.alpha)
+        if profiling:
+            prof.count("sim_steps", steps)
+            prof.end_frame()
+        return self.alpha
+
+    def run(self, keep_running: Callable[[], bool]):
+        """Tick until keep_running() returns False"""
+        while keep_running():
+            self.tick()
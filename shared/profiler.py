@@ -0,0 +1,275 @@
+"""
+Frame Profiler
+
+Named timing scopes, rolling per-frame percentiles, entity counters and GC /
+allocation tracking, with a toggleable on-screen overlay and Chrome trace-event
+export (open the JSON in chrome://tracing or https://ui.perfetto.dev). A
+trace keeps at most ``max_trace_events`` events, dropping the oldest, so a
+capture left running holds the last few minutes rather than growing forever.
+
+When the profiler is disabled, scope() returns one shared no-op context
+manager and callers skip the probes and counters completely.
+"""
+
+import gc
+import json
+import sys
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional
+
+import pygame
+
+_NULL_SCOPE = nullcontext()
+
+
+class _Scope:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class FrameProfiler:
+    """Per-frame timing scopes with rolling stats and optional trace capture"""
+
+    def __init__(self, window: int = 240, stats_interval: int = 15, max_trace_events: int = 500_000):
+        self.enabled = False
+        self.window = window
+        self.stats_interval = stats_interval
+        self.max_trace_events = max_trace_events
+
+        self.samples: Dict[str, deque] = {}
+        self.counters: Dict[str, int] = {}
+        self._frame: Dict[str, float] = {}
+        self._frame_start = 0.0
+        self._frames = 0
+        self._stats_cache: List[str] = []
+        self._panel = None
+
+        # GC / allocation tracking
+        self.gc_collections = 0
+        self.gc_ms_frame = 0.0
+        self._gc_start = 0.0
+        self._blocks_at_frame_start = 0
+
+        # Chrome trace capture
+        self._trace: Optional[deque] = None
+        self._trace_origin = 0.0
+        self._trace_dropped = 0
+        self._trace_frames = 0
+        self._on_trace_saved: Optional[Callable[[str], None]] = None
+        self._font = None
+
+    # ------------------------------------------------------------------
+    # Switching
+    # ------------------------------------------------------------------
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        gc.callbacks.append(self._on_gc)
+
+    def disable(self):
+        if not self.enabled:
+            return
+        if self._trace is not None:
+            # write the capture out rather than losing it with the overlay
+            try:
+                self.stop_trace()
+            except OSError as e:
+                print(f"Could not write trace: {e}")
+                self._trace = None
+        self.enabled = False
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def scope(self, name: str):
+        """Context manager timing ``name``; a shared no-op while disabled"""
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Scope(self, name)
+
+    def record(self, name: str, start: float, end: float):
+        """Record a finished span (perf_counter seconds). Usable as a phase probe."""
+        self._frame[name] = self._frame.get(name, 0.0) + (end - start)
+        if self._trace is not None:
+            self._emit({
+                "name": name, "ph": "X", "pid": 1, "tid": 1,
+                "ts": (start - self._trace_origin) * 1e6,
+                "dur": (end - start) * 1e6,
+            })
+
+    def count(self, name: str, value: int):
+        """Set a per-frame counter such as an entity count"""
+        self.counters[name] = value
+
+    def begin_frame(self):
+        self._frame.clear()
+        self.gc_ms_frame = 0.0
+        self._frame_start = time.perf_counter()
+        self._blocks_at_frame_start = sys.getallocatedblocks()
+
+    def end_frame(self):
+        end = time.perf_counter()
+        self._frame["frame"] = end - self._frame_start
+        self.counters["alloc_blocks"] = sys.getallocatedblocks() - self._blocks_at_frame_start
+        self.counters["gc_total"] = self.gc_collections
+
+        for name, seconds in self._frame.items():
+            buf = self.samples.get(name)
+            if buf is None:
+                buf = self.samples[name] = deque(maxlen=self.window)
+            buf.append(seconds * 1000.0)
+        gc_buf = self.samples.get("gc")
+        if gc_buf is None:
+            gc_buf = self.samples["gc"] = deque(maxlen=self.window)
+        gc_buf.append(self.gc_ms_frame)
+
+        if self._trace is not None:
+            ts = (end - self._trace_origin) * 1e6
+            self._emit({"name": "counters", "ph": "C", "pid": 1, "tid": 1,
+                        "ts": ts, "args": dict(self.counters)})
+            self._trace_frames += 1
+
+        self._frames += 1
+        if self._frames % self.stats_interval == 0:
+            self._stats_cache = self._format_stats()
+            self._panel = None
+
+    def _on_gc(self, phase, info):
+        now = time.perf_counter()
+        if phase == "start":
+            self._gc_start = now
+            return
+        self.gc_collections += 1
+        self.gc_ms_frame += (now - self._gc_start) * 1000.0
+        if self._trace is not None:
+            self._emit({
+                "name": f"gc gen{info.get('generation', '?')}", "ph": "X", "pid": 1, "tid": 1,
+                "ts": (self._gc_start - self._trace_origin) * 1e6,
+                "dur": (now - self._gc_start) * 1e6,
+            })
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+    def percentiles(self, name: str, qs=(0.5, 0.95, 0.99)) -> List[float]:
+        buf = self.samples.get(name)
+        if not buf:
+            return [0.0 for _ in qs]
+        ordered = sorted(buf)
+        last = len(ordered) - 1
+        return [ordered[min(last, int(q * last + 0.5))] for q in qs]
+
+    def _format_stats(self) -> List[str]:
+        lines = [f"{'scope':<20} {'p50':>6} {'p95':>6} {'p99':>6} ms"]
+        names = ["frame"] + sorted(n for n in self.samples if n not in ("frame", "gc")) + ["gc"]
+        for name in names:
+            if name in self.samples:
+                p50, p95, p99 = self.percentiles(name)
+                lines.append(f"{name[:20]:<20} {p50:6.2f} {p95:6.2f} {p99:6.2f}")
+        if self.counters:
+            lines.append("")
+            lines.extend(f"{k:<20} {v}" for k, v in sorted(self.counters.items()))
+        if self._trace is not None:
+            dropped = f", {self._trace_dropped} dropped" if self._trace_dropped else ""
+            lines.append(f"TRACING ({len(self._trace)} events{dropped})")
+        return lines
+
+    # ------------------------------------------------------------------
+    # Overlay
+    # ------------------------------------------------------------------
+    def draw_overlay(self, surface, font=None, pos=(10, 80)):
+        """Blit the stats panel; returns the rect touched, or None if nothing was drawn"""
+        if not self.enabled or not self._stats_cache:
+            return None
+        if self._panel is None:
+            # rebuilt only when the stats text refreshes
+            if font is None:
+                font = self._overlay_font()
+            rows = [font.render(line, True, (200, 255, 200)) for line in self._stats_cache]
+            w = max(r.get_width() for r in rows) + 12
+            h = sum(r.get_height() for r in rows) + 10
+            self._panel = pygame.Surface((w, h), pygame.SRCALPHA)
+            self._panel.fill((0, 0, 0, 170))
+            y = 5
+            for r in rows:
+                self._panel.blit(r, (6, y))
+                y += r.get_height()
+        return surface.blit(self._panel, pos)
+
+    def _overlay_font(self):
+        if self._font is None:
+            self._font = pygame.font.Font(None, 18)
+        return self._font
+
+    # ------------------------------------------------------------------
+    # Chrome trace export
+    # ------------------------------------------------------------------
+    @property
+    def tracing(self) -> bool:
+        return self._trace is not None
+
+    def start_trace(self, on_saved: Optional[Callable[[str], None]] = None):
+        """Begin capturing; ``on_saved`` is called with the path however the trace ends"""
+        self.enable()
+        self._trace = deque(maxlen=self.max_trace_events)
+        self._trace_origin = time.perf_counter()
+        self._trace_dropped = 0
+        self._trace_frames = 0
+        self._on_trace_saved = on_saved
+
+    def _emit(self, event: dict):
+        if len(self._trace) == self.max_trace_events:
+            self._trace_dropped += 1
+        self._trace.append(event)
+
+    def stop_trace(self, path: Optional[str] = None) -> Optional[str]:
+        """Stop capturing and write the trace JSON; returns the path written.
+
+        The capture is kept if the write fails, so it can be retried.
+        """
+        if self._trace is None:
+            return None
+        if path is None:
+            path = time.strftime("trace_%Y%m%d_%H%M%S.json")
+        summary = {
+            "frames": self._trace_frames,
+            "dropped_events": self._trace_dropped,
+            "percentiles_ms": {name: self.percentiles(name) for name in self.samples},
+        }
+        with open(path, "w") as f:
+            json.dump({"traceEvents": list(self._trace), "displayTimeUnit": "ms", "otherData": summary}, f)
+        self._trace = None
+        on_saved, self._on_trace_saved = self._on_trace_saved, None
+        if on_saved:
+            on_saved(path)
+        return path
+
+    def toggle_trace(self, on_saved: Optional[Callable[[str], None]] = None):
+        if self._trace is None:
+            self.start_trace(on_saved)
+        else:
+            if on_saved:
+                self._on_trace_saved = on_saved
+            self.stop_trace()
@@ -0,0 +1,98 @@
+"""
+Sprite Cache
+
+Renders small alpha sprites (particle dots, star glows) once and hands back the
+same Surface on every later request, so render loops only blit. Entries are
+keyed by (kind, radius, color, alpha bucket) and evicted least-recently-used
+once the cache is full.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Hashable, Tuple
+
+import pygame
+
+Color = Tuple[int, int, int]
+
+
+class SpriteCache:
+    """Bounded LRU cache of pre-rendered SRCALPHA sprites"""
+
+    def __init__(self, max_entries: int = 1024, alpha_step: int = 16, alpha: bool = True):
+        self.max_entries = max_entries
+        self.alpha_step = alpha_step
+        # False for opaque images (e.g. background tiles): convert() keeps them fast to blit
+        self.alpha = alpha
+        self._sprites: "OrderedDict[Hashable, pygame.Surface]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def clear(self):
+        """Drop every cached sprite (counters are kept)"""
+        self._sprites.clear()
+
+    def stats(self) -> dict:
+        """Snapshot of the cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._sprites),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def alpha_bucket(self, alpha: int) -> int:
+        """Quantize alpha so nearby values share a sprite"""
+        step = self.alpha_step
+        return min(255, max(0, int(alpha) // step * step + step // 2))
+
+    def get(self, key: Hashable, render: Callable[[], pygame.Surface]) -> pygame.Surface:
+        """Return the sprite for ``key``, calling ``render`` only on a miss"""
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = render()
+        # convert needs a display mode; headless callers keep the raw surface
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha() if self.alpha else sprite.convert()
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.max_entries:
+            self._sprites.popitem(last=False)
+            self.evictions += 1
+        return sprite
+
+    def circle(self, radius: int, color: Color, alpha: int = 255) -> pygame.Surface:
+        """Filled circle with 1px padding; blit at (x - radius - 1, y - radius - 1)"""
+        alpha = self.alpha_bucket(alpha)
+        key = ("circle", radius, tuple(color), alpha)
+
+        def render():
+            surf = pygame.Surface((radius * 2 + 2, radius * 2 + 2), pygame.SRCALPHA)
+            pygame.draw.circle(surf, (*color, alpha), (radius + 1, radius + 1), radius)
+            return surf
+
+        return self.get(key, render)
+
+    def glow(self, radius: int, color: Color, layers: int = 5, max_alpha: int = 30) -> pygame.Surface:
+        """Layered soft glow with 5px padding; blit at (x - radius - 5, y - radius - 5)"""
+        key = ("glow", radius, tuple(color), layers, max_alpha)
+
+        def render():
+            surf = pygame.Surface((radius * 2 + 10, radius * 2 + 10), pygame.SRCALPHA)
+            for i in range(layers):
+                layer_radius = radius * (1 - i / layers)
+                alpha = int(max_alpha * (1 - i / layers))
+                if layer_radius > 0:
+                    pygame.draw.circle(surf, (*color, alpha), (radius + 5, radius + 5), int(layer_radius))
+            return surf
+
+        return self.get(key, render)
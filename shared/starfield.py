@@ -0,0 +1,147 @@
+"""
+Parallax Starfield
+
+Stars live in flat NumPy arrays (position, speed, size, brightness, twinkle
+phase) grouped into layers, and scroll and wrap as one vectorized step. Small
+fields are drawn by blitting cached star sprites, which also reports the rects
+touched for dirty-rect renderers. Large fields (thousands of stars) are
+written straight into the surface's pixels with surfarray instead.
+
+Stars use their own NumPy generator, so the starfield never touches ``random``
+or any gameplay RNG, and no random numbers are drawn once it has been built,
+apart from new x positions for stars that wrap.
+"""
+
+import math
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pygame
+
+from shared.sprite_cache import SpriteCache
+
+Color = Tuple[int, int, int]
+
+
+class StarLayer(NamedTuple):
+    """One parallax band: how many stars, how fast (px/s), how big and how bright"""
+    count: int
+    speed: Tuple[float, float] = (0.0, 0.0)
+    sizes: Tuple[int, ...] = (1,)
+    brightness: Tuple[float, float] = (1.0, 1.0)
+
+
+class Starfield:
+    """Vectorized multi-layer starfield with sprite or surfarray rendering"""
+
+    def __init__(self, size: Tuple[int, int], layers: Sequence[StarLayer],
+                 color: Color = (255, 255, 255), seed: Optional[int] = None,
+                 twinkle_rate: float = 0.0, sprites: Optional[SpriteCache] = None,
+                 pixel_threshold: int = 2000):
+        self.size = (int(size[0]), int(size[1]))
+        self.layers = tuple(layers)
+        self.color = np.array(color, dtype=np.float32)
+        self.twinkle_rate = twinkle_rate  # degrees per second; 0 disables twinkling
+        self.sprites = sprites if sprites is not None else SpriteCache()
+        self.rng = np.random.default_rng(seed)
+        self.time = 0.0
+
+        w, h = self.size
+        rng = self.rng
+        xs, ys, speeds, sizes, bright = [], [], [], [], []
+        for layer in self.layers:
+            n = layer.count
+            xs.append(rng.uniform(0, w, n))
+            ys.append(rng.uniform(0, h, n))
+            speeds.append(rng.uniform(layer.speed[0], layer.speed[1], n))
+            sizes.append(rng.choice(np.asarray(layer.sizes), n))
+            bright.append(rng.uniform(layer.brightness[0], layer.brightness[1], n))
+        self.x = np.concatenate(xs) if xs else np.zeros(0)
+        self.y = np.concatenate(ys) if ys else np.zeros(0)
+        self.speed = np.concatenate(speeds) if speeds else np.zeros(0)
+        self.star_size = (np.concatenate(sizes) if sizes else np.zeros(0)).astype(np.int32)
+        self.brightness = (np.concatenate(bright) if bright else np.zeros(0)).astype(np.float32)
+        # fixed per-star twinkle offset, in degrees
+        self.phase = (self.x + self.y).astype(np.float32)
+        self.pixel_mode = len(self.x) > pixel_threshold
+
+        self._by_size = {int(s): np.flatnonzero(self.star_size == s) for s in np.unique(self.star_size)}
+        self._sprite_row = None  # per-star sprites, reused while nothing twinkles
+
+    def __len__(self):
+        return len(self.x)
+
+    def resize(self, w: int, h: int):
+        """Stretch the existing stars over the new area; nothing is regenerated"""
+        ow, oh = self.size
+        if (w, h) == (ow, oh):
+            return
+        if ow and oh:
+            self.x *= w / ow
+            self.y *= h / oh
+        self.size = (int(w), int(h))
+
+    def update(self, dt: float):
+        self.time += dt
+        if not self.speed.any():
+            return
+        y = self.y
+        y += self.speed * dt
+        w, h = self.size
+        wrapped = np.flatnonzero(y > h)
+        if wrapped.size:
+            y[wrapped] = -5
+            self.x[wrapped] = self.rng.uniform(0, w, wrapped.size)
+
+    def _levels(self) -> np.ndarray:
+        """Per-star brightness for this instant, 0..1"""
+        if not self.twinkle_rate:
+            return self.brightness
+        angle = np.radians(self.time * self.twinkle_rate + self.phase)
+        return self.brightness * (0.3 + 0.7 * np.abs(np.cos(angle)))
+
+    def draw(self, surface: pygame.Surface) -> Optional[List[pygame.Rect]]:
+        """Draw every star; returns the rects touched, or None in pixel mode"""
+        if self.pixel_mode:
+            self._draw_pixels(surface)
+            return None
+        return self._draw_sprites(surface)
+
+    def _draw_sprites(self, surface):
+        if self.twinkle_rate or self._sprite_row is None:
+            circle = self.sprites.circle
+            color = tuple(int(c) for c in self.color)
+            alphas = (self._levels() * 255).astype(np.int32).tolist()
+            row = [circle(s, color, a) for s, a in zip(self.star_size.tolist(), alphas)]
+            if not self.twinkle_rate:
+                self._sprite_row = row
+        else:
+            row = self._sprite_row
+        pad = self.star_size + 1
+        xs = (self.x.astype(np.int32) - pad).tolist()
+        ys = (self.y.astype(np.int32) - pad).tolist()
+        return surface.blits(list(zip(row, zip(xs, ys))))
+
+    def _draw_pixels(self, surface):
+        w, h = surface.get_size()
+        colors = (self._levels()[:, None] * self.color).astype(np.uint8)
+        xs = self.x.astype(np.intp)
+        ys = self.y.astype(np.intp)
+        pixels = pygame.surfarray.pixels3d(surface)
+        try:
+            for radius, idx in self._by_size.items():
+                sx, sy, sc = xs[idx], ys[idx], colors[idx]
+                for dx, dy in _disc(radius):
+                    px = sx + dx
+                    py = sy + dy
+                    ok = (px >= 0) & (px < w) & (py >= 0) & (py < h)
+                    pixels[px[ok], py[ok]] = sc[ok]
+        finally:
+            del pixels  # releases the surface lock
+
+
+def _disc(radius: int) -> List[Tuple[int, int]]:
+    """Pixel offsets covered by a filled dot of ``radius`` (1 = single pixel)"""
+    r = max(1, radius) - 1
+    return [(dx, dy) for dx in range(-r, r + 1) for dy in range(-r, r + 1)
+            if math.hypot(dx, dy) <= r + 0.5]